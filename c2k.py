@@ -6,14 +6,12 @@ import sys
 from cameratokeyboard.config import Config
 from cameratokeyboard.args import parse_args
 from cameratokeyboard.app import App
-from cameratokeyboard.model.model_downloader import ModelDownloader
 
 args = parse_args(sys.argv[1:])
 
 
 async def async_main():
     config = Config.from_args(args)
-    ModelDownloader(config).run()
     await App(config).run()
 
 
@@ -23,6 +21,6 @@ def main():
 
 if __name__ == "__main__":
     if args.get("command") is not None:
-        args.get("command")().run()
+        args.get("command")(Config.from_args(args)).run()
     else:
         main()
@@ -1,61 +1,388 @@
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import time
-
-import cv2
+from typing import Callable, Dict, List
 
 from cameratokeyboard.app.detector import Detector
-from cameratokeyboard.app.ui import UI
+from cameratokeyboard.app.frame_source import create_frame_sources
+from cameratokeyboard.app.headless import HeadlessUI
+from cameratokeyboard.app.latency import (
+    FrameTrace,
+    LatencyTracker,
+    STAGE_DETECTED_FRAME,
+    STAGE_DISPATCH,
+    STAGE_INFERENCE,
+    STAGE_OUTPUT,
+    STAGE_THROTTLER,
+)
+from cameratokeyboard.app.pipeline import Pipeline
+from cameratokeyboard.benchmark.detections import DetectionRecorder
 from cameratokeyboard.config import Config
+from cameratokeyboard.logger import get_logger
+from cameratokeyboard.model.model_downloader import ModelDownloader
+from cameratokeyboard.types import (
+    CameraStats,
+    CapturedFrame,
+    DropPolicy,
+    FramePacing,
+    LatencySummary,
+)
+from cameratokeyboard.utils.profiler import get_profiler
+
+LOGGER = get_logger()
+PROFILER = get_profiler()
+PIPELINE_STATS_INTERVAL = 10.0
 
 
-class App:
+class App:  # pylint: disable=too-many-instance-attributes
     """
     Runs the app and takes care of inter-module communication
+
+    With several cameras, a frame of each one goes through the pipeline together and
+    their inference is batched. Each camera keeps its own detected frame and all of
+    them type, but only the first one is shown.
     """
 
     def __init__(self, config: Config) -> None:
+        self._started_at = time.perf_counter()
         self._config = config
-        self._cap = cv2.VideoCapture(config.video_input_device)
-        self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, self._config.resolution[0])
-        self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self._config.resolution[1])
-
-        self._detector = Detector(config)
+        if config.profile:
+            PROFILER.enable()
 
-        self._ui = UI(window_size=config.resolution, fps=config.app_fps)
+        # The model, the camera and the UI don't depend on each other, so they're
+        # loaded concurrently. The UI stays on the main thread, as pygame requires.
+        self._startup_timings = {}
+        with ThreadPoolExecutor(thread_name_prefix="c2k-startup") as executor:
+            detector = executor.submit(self._load_detector)
+            frame_sources = executor.submit(
+                self._timed, "camera", create_frame_sources, config
+            )
+            self._ui = self._timed("ui", self._create_ui)
+            self._frame_sources = frame_sources.result()
+            self._detector = detector.result()
+        self._log_startup_timings()
 
         self._throttler = RepeatingKeysThrottler(delay=config.repeating_keys_delay)
 
+        # Capture, inference and post processing each run on their own thread so
+        # they overlap. Waiting for their output is blocking too, hence the executor
+        # that keeps the UI loop responsive.
+        self._pipeline = Pipeline(
+            source=self._capture,
+            stages=[
+                ("inference", self._infer),
+                ("post_processing", self._post_process),
+            ],
+            queue_size=config.pipeline_queue_size,
+            drop_policy=self._pipeline_drop_policy(),
+        )
+        self._detection_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="c2k-detection"
+        )
+        self._pipeline_stats_logged_at = time.monotonic()
+        self._latency_tracker = LatencyTracker()
+        self._camera_latency_trackers = [LatencyTracker() for _ in self._frame_sources]
+        self._camera_frames = [0] * len(self._frame_sources)
+        self._detection_recorder = (
+            DetectionRecorder(config.record_detections_path)
+            if config.record_detections_path
+            else None
+        )
+
         self._detected_frame = None
+        self._detected_frames = {}
+        self._first_frame_logged = False
+        self._running_since = None
 
         self._app_is_running = True
 
+    def _pipeline_drop_policy(self) -> DropPolicy:
+        drop_policy = DropPolicy(self._config.pipeline_drop_policy)
+
+        # Replaying as fast as possible must not lose any frame: the capture waits for
+        # the slower stages instead.
+        if (
+            self._config.video_input_path
+            and FramePacing(self._config.replay_pacing) == FramePacing.MAX_SPEED
+            and drop_policy != DropPolicy.BLOCK
+        ):
+            LOGGER.info(
+                "Replaying at max speed, the pipeline blocks instead of %s",
+                drop_policy.value,
+            )
+            return DropPolicy.BLOCK
+
+        return drop_policy
+
     async def run(self):
         """
         The main run loop
         """
+        self._running_since = time.perf_counter()
+        for frame_source in self._frame_sources:
+            frame_source.start()
+        self._pipeline.start()
         detect_task = asyncio.create_task(self._detect())
         await self._ui.run()
 
         self._app_is_running = False
         detect_task.cancel()
+        for frame_source in self._frame_sources:
+            frame_source.stop()
+        self._pipeline.stop()
+        self._detector.close()
+        if self._detection_recorder:
+            self._detection_recorder.close()
+        self._detection_executor.shutdown(wait=False)
+        self._log_pipeline_stats()
+
+        if self._config.latency_report_path:
+            self._latency_tracker.dump(self._config.latency_report_path)
+
+        if self._config.profile:
+            PROFILER.disable()
+            PROFILER.save(self._config.profile)
+            LOGGER.info("Trace written to %s", self._config.profile)
+
+    @property
+    def startup_timings(self) -> Dict[str, float]:
+        """
+        The time each startup phase took, in seconds: model download, model load,
+        warm-up, camera and UI. The phases run concurrently, see `__init__`.
+        """
+        return dict(self._startup_timings)
+
+    def latency_summary(self) -> List[LatencySummary]:
+        """
+        Returns the latencies from the capture of the frames to the end of each stage
+        so far: inference, detected frame update, dispatch to the UI loop, the repeating
+        keys throttler and the output of the keys.
+
+        Returns:
+            List[LatencySummary]: The p50, p95 and p99 latencies of each stage.
+        """
+        return self._latency_tracker.summary()
+
+    def camera_stats(self) -> List[CameraStats]:
+        """
+        Returns the frame rate of each camera, i.e. how many of its frames are detected
+        per second, and the latencies from their capture to their dispatch to the UI
+        loop.
+
+        Returns:
+            List[CameraStats]: The stats of each camera, in the configured order.
+        """
+        elapsed = (
+            time.perf_counter() - self._running_since if self._running_since else 0
+        )
+        stats = []
+
+        for camera, tracker in enumerate(self._camera_latency_trackers):
+            dispatch = next(
+                (s for s in tracker.summary() if s.stage == STAGE_DISPATCH), None
+            )
+            stats.append(
+                CameraStats(
+                    camera=camera,
+                    frames=self._camera_frames[camera],
+                    fps=self._camera_frames[camera] / elapsed if elapsed else 0.0,
+                    p50=dispatch.p50 if dispatch else float("nan"),
+                    p95=dispatch.p95 if dispatch else float("nan"),
+                )
+            )
+
+        return stats
 
     async def _detect(self):
+        loop = asyncio.get_running_loop()
+
         while self._app_is_running:
-            success, frame = self._cap.read()
+            detected = await loop.run_in_executor(
+                self._detection_executor, self._pipeline.get
+            )
 
-            if not success:
+            if detected is None:
                 break
 
-            frame = cv2.flip(frame, 1)
+            for camera, detected_frame, trace in detected:
+                trace.mark(STAGE_DISPATCH)
+                self._detected_frames[camera] = detected_frame
+                if camera == 0:
+                    self._detected_frame = detected_frame
+                    self._log_first_frame()
+                    self._broadcast_new_data()
+                else:
+                    self._follow_calibration(detected_frame)
+
+                for key in detected_frame.down_keys:
+                    self._on_key_down(key, trace)
+
+                self._latency_tracker.record(trace)
+                self._camera_latency_trackers[camera].record(trace)
+                self._camera_frames[camera] += 1
 
-            self._detected_frame = self._detector.detect(frame)
-            self._broadcast_new_data()
+            if (
+                time.monotonic() - self._pipeline_stats_logged_at
+                > PIPELINE_STATS_INTERVAL
+            ):
+                self._log_pipeline_stats()
 
-            if self._detected_frame.down_keys:
-                for key in self._detected_frame.down_keys:
-                    self._on_key_down(key)
+        # Without a window to close, the end of the input is the end of the app.
+        if self._config.headless:
+            self._ui.stop()
 
-            await asyncio.sleep(0.01)
+    def _load_detector(self) -> Detector:
+        # With an inference server, the model is on the server's side.
+        if not self._config.inference_server:
+            self._timed("model_download", ModelDownloader(self._config).run)
+        detector = self._timed("model_load", Detector, self._config)
+
+        width, height = self._config.resolution
+        self._timed("warm_up", detector.warm_up, (height, width, 3))
+
+        return detector
+
+    def _timed(self, phase: str, function: Callable, *args):
+        started_at = time.perf_counter()
+        with PROFILER.span(phase, "startup"):
+            result = function(*args)
+        self._startup_timings[phase] = time.perf_counter() - started_at
+
+        return result
+
+    def _log_startup_timings(self):
+        LOGGER.info(
+            "Started in %.2fs (%s)",
+            time.perf_counter() - self._started_at,
+            ", ".join(
+                f"{phase}: {seconds:.2f}s"
+                for phase, seconds in self._startup_timings.items()
+            ),
+        )
+
+    def _create_ui(self):
+        if self._config.headless:
+            return HeadlessUI(output=self._config.headless_output)
+
+        # Imported here so that headless runs don't load pygame at all.
+        from cameratokeyboard.app.ui import (  # pylint: disable=import-outside-toplevel
+            UI,
+        )
+
+        return UI(window_size=self._config.resolution, fps=self._config.app_fps)
+
+    def _capture(self) -> List[CapturedFrame]:
+        captured_frames = []
+        for frame_source in self._frame_sources:
+            captured_frame = frame_source.read()
+            if captured_frame is None:
+                return None
+            captured_frames.append(captured_frame)
+
+        return captured_frames
+
+    def _infer(self, captured_frames: List[CapturedFrame]):
+        if len(captured_frames) == 1:
+            inferred = self._detector.infer_captured(captured_frames[0])
+            if inferred is None:
+                return None
+
+            # With inference workers, the results can belong to an earlier frame.
+            inferred = [inferred]
+        else:
+            inferred = zip(
+                captured_frames,
+                self._detector.infer_batch([f.image for f in captured_frames]),
+            )
+
+        detections = []
+        for camera, (captured_frame, results) in enumerate(inferred):
+            trace = FrameTrace(captured_frame.timestamp, captured_frame.sequence)
+            trace.mark(STAGE_INFERENCE)
+            detections.append((camera, results, trace))
+
+        return detections
+
+    def _post_process(self, detections):
+        processed = []
+        for camera, results, trace in detections:
+            # A recording is replayed as a single camera, the first one.
+            if self._detection_recorder and camera == 0:
+                self._detection_recorder.write(results)
+
+            snapshot = self._detector.process(
+                results, camera, trace.capture_timestamp
+            ).snapshot()
+            trace.mark(STAGE_DETECTED_FRAME)
+            processed.append((camera, snapshot, trace))
+
+        return processed
+
+    def _follow_calibration(self, detected_frame):
+        # Only the first camera is shown, so the others calibrate along with it.
+        if (
+            self._detected_frame
+            and self._detected_frame.is_calibration_in_progress
+            and detected_frame.requires_calibration
+            and not detected_frame.is_calibration_in_progress
+        ):
+            detected_frame.start_calibration(None)
+
+    def _log_first_frame(self):
+        if self._first_frame_logged:
+            return
+
+        self._first_frame_logged = True
+        LOGGER.info(
+            "First frame detected %.2fs after startup",
+            time.perf_counter() - self._started_at,
+        )
+
+    def _log_pipeline_stats(self):
+        self._pipeline_stats_logged_at = time.monotonic()
+
+        for stats in self._pipeline.stats():
+            LOGGER.debug(
+                "[%s] queue: %d/%d, dropped: %d, processed: %d, service time: %.1fms",
+                stats.name,
+                stats.queue_depth,
+                stats.queue_size,
+                stats.dropped,
+                stats.processed,
+                stats.service_time * 1000,
+            )
+        LOGGER.debug(
+            "[capture] dropped by the frame source: %d",
+            sum(frame_source.dropped_frames for frame_source in self._frame_sources),
+        )
+        LOGGER.debug(
+            "[inference] skipped on static frames: %d", self._detector.inferences_saved
+        )
+        LOGGER.debug(
+            "[inference] replaced by tracking: %d", self._detector.frames_tracked
+        )
+
+        for summary in self.latency_summary():
+            LOGGER.debug(
+                "[latency] capture -> %s: p50: %.1fms, p95: %.1fms, p99: %.1fms (%d)",
+                summary.stage,
+                summary.p50 * 1000,
+                summary.p95 * 1000,
+                summary.p99 * 1000,
+                summary.count,
+            )
+
+        if len(self._frame_sources) > 1:
+            for stats in self.camera_stats():
+                LOGGER.debug(
+                    "[camera %d] %.1f FPS, capture -> dispatch: p50: %.1fms, "
+                    "p95: %.1fms (%d)",
+                    stats.camera,
+                    stats.fps,
+                    stats.p50 * 1000,
+                    stats.p95 * 1000,
+                    stats.frames,
+                )
 
     def _broadcast_new_data(self):
         self._ui.update_data(detected_frame_data=self._detected_frame)
@@ -65,11 +392,15 @@ class App:
             return
         self._detected_frame.start_calibration(on_calibration_complete)
 
-    def _on_key_down(self, key: str) -> None:
-        if not self._throttler.key_press_allowed(key):
+    def _on_key_down(self, key: str, trace: FrameTrace) -> None:
+        allowed = self._throttler.key_press_allowed(key)
+        trace.mark(STAGE_THROTTLER)
+
+        if not allowed:
             return
 
         self._ui.update_text(key)
+        trace.mark(STAGE_OUTPUT)
 
 
 class RepeatingKeysThrottler:
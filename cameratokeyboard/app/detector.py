@@ -1,29 +1,75 @@
+import copy
 import logging
+import os
+from typing import List, Tuple
 
+import numpy as np
 import ultralytics
 
+from cameratokeyboard.app import roi
+from cameratokeyboard.app.fingertip_tracker import FingertipTracker
+from cameratokeyboard.app.inference_pool import InferencePool
+from cameratokeyboard.app.onnx_backend import (
+    OnnxModel,
+    export_to_onnx,
+    quantized_model_path,
+)
+from cameratokeyboard.app.motion_gate import MotionGate
+from cameratokeyboard.app.remote_model import RemoteModel
 from cameratokeyboard.config import Config
 from cameratokeyboard.core.detected_frame import DetectedFrame
 from cameratokeyboard.model.model_downloader import ModelDownloader
+from cameratokeyboard.types import CapturedFrame, InferenceBackend, Point, RawImage
+from cameratokeyboard.utils.profiler import get_profiler
 
+PROFILER = get_profiler()
 
-class Detector:
+
+class Detector:  # pylint: disable=too-many-instance-attributes
     """
     Class for detecting fingers in a frame.
 
+    The frames of several cameras can be detected in one batch, see `infer_batch`.
+    Each camera has its own `DetectedFrame`. The motion gate, the tracking and the ROI
+    inference only apply to the frames detected one at a time.
+
     Args:
         config(Config): The application configuration.
     """
 
     def __init__(self, config: Config) -> None:
         logging.getLogger("ultralytics").setLevel(logging.ERROR)
-        model_path = ModelDownloader(config).local_path_to_latest_model
 
         self._config = config
-        self._model = ultralytics.YOLO(model_path)
         self._device = config.processing_device
         self._iou = config.iou
-        self._detected_frame = None
+        self._detected_frames = {}
+        # A copy of the markers of the first camera, for the inference, which runs on
+        # another thread than the processing that keeps updating the detected frames.
+        self._marker_coordinates = []
+        self._last_results = None
+        self._markers_locked = False
+
+        self._motion_gate = None
+        if config.motion_threshold > 0:
+            self._motion_gate = MotionGate(
+                threshold=config.motion_threshold,
+                max_skipped_frames=config.motion_max_skipped_frames,
+            )
+
+        self._model = None
+        self._pool = None
+        self._tracker = None
+        if config.inference_server:
+            self._model = RemoteModel(config.inference_server)
+        else:
+            self._load_model()
+
+        if self._model and config.tracking_interval > 1:
+            self._tracker = FingertipTracker(
+                interval=config.tracking_interval,
+                max_error=config.tracking_max_error,
+            )
 
     def detect(self, frame):
         """
@@ -35,16 +81,289 @@ class Detector:
         Returns:
             DetectedFrame: An object representing the detected objects in the frame.
         """
-        try:
-            device = int(self._device)
-        except ValueError:
-            device = self._device
+        return self.process(self.infer(frame))
+
+    def infer(self, frame) -> ultralytics.engine.results.Results:
+        """
+        Runs the model on the given frame. This is the expensive part of `detect`.
+
+        Args:
+            frame: The frame to detect objects in.
 
-        results = self._model(frame, device, iou=self._iou)[0]
+        Returns:
+            ultralytics.engine.results.Results: The raw detection results.
+        """
+        with PROFILER.span("preprocessing", "inference"):
+            reused_results = self._reuse_results_if_static(frame)
+        if reused_results is not None:
+            return reused_results
 
-        if not self._detected_frame:
-            self._detected_frame = DetectedFrame(results, config=self._config)
+        if self._pool:
+            with PROFILER.span("inference", "inference"):
+                self._pool.submit(frame)
+                result = None
+                while self._pool.in_flight:
+                    result = self._pool.next_result()
+            self._last_results = result[1]
         else:
-            self._detected_frame.update(results)
+            self._last_results = self._track_or_run_model(frame)
+
+        return self._last_results
 
-        return self._detected_frame
+    def infer_captured(
+        self, captured_frame: CapturedFrame
+    ) -> Tuple[CapturedFrame, ultralytics.engine.results.Results]:
+        """
+        Runs the model on a captured frame. With inference workers, the frame is only
+        queued and the results of the oldest frame in flight are returned instead, once
+        available. So results lag behind by up to `inference_workers` frames, but the
+        workers are kept busy.
+
+        Args:
+            captured_frame (CapturedFrame): The frame to detect objects in.
+
+        Returns:
+            Tuple[CapturedFrame, Results]: The frame the results belong to along with
+                the raw detection results, or None if no results are ready yet.
+        """
+        if not self._pool:
+            return captured_frame, self.infer(captured_frame.image)
+
+        # Reused results can't overtake the frames already in flight.
+        if not self._pool.in_flight:
+            with PROFILER.span("preprocessing", "inference"):
+                reused_results = self._reuse_results_if_static(captured_frame.image)
+            if reused_results is not None:
+                return captured_frame, reused_results
+
+        with PROFILER.span("inference", "inference"):
+            self._pool.submit(captured_frame.image, context=captured_frame)
+            result = self._pool.next_result(block=self._pool.is_busy)
+
+        if result is None or result[1] is None:
+            return None
+
+        self._last_results = result[1]
+        return result
+
+    def infer_batch(
+        self, frames: List[RawImage]
+    ) -> List[ultralytics.engine.results.Results]:
+        """
+        Runs the model on the frames of several cameras at once: in one call of the
+        model, or with inference workers, on all of them in parallel.
+
+        Args:
+            frames (List[RawImage]): The frames to detect objects in.
+
+        Returns:
+            List[ultralytics.engine.results.Results]: The raw detection results of
+                each frame.
+        """
+        with PROFILER.span("inference", "inference"):
+            if not self._pool:
+                return self._model(frames, self._parsed_device, iou=self._iou)
+
+            for frame in frames:
+                self._pool.submit(frame)
+            return [self._pool.next_result()[1] for _ in frames]
+
+    def process(
+        self,
+        results: ultralytics.engine.results.Results,
+        camera: int = 0,
+        timestamp: float = None,
+    ) -> DetectedFrame:
+        """
+        Feeds the raw detection results to the detected frame, i.e. calculates the
+        coordinates, handles the calibration and maps the down fingers to keys.
+
+        Args:
+            results (ultralytics.engine.results.Results): The output of `infer`.
+            camera (int, optional): The index of the camera the results belong to.
+            timestamp (float, optional): When the frame was captured, from
+                `time.monotonic`. Defaults to now.
+
+        Returns:
+            DetectedFrame: An object representing the detected objects in the frame.
+        """
+        detected_frame = self._detected_frames.get(camera)
+        if not detected_frame:
+            detected_frame = DetectedFrame(
+                results, config=self._config, timestamp=timestamp
+            )
+            self._detected_frames[camera] = detected_frame
+        else:
+            detected_frame.update(results, timestamp)
+
+        if camera == 0:
+            self._marker_coordinates = [
+                Point(p.x, p.y) if p is not None else None
+                for p in detected_frame.marker_coordinates
+            ]
+
+        return detected_frame
+
+    def warm_up(self, frame_shape: Tuple[int, int, int]) -> None:
+        """
+        Runs the model on a blank frame, so that the first real frame doesn't pay for
+        its lazy initialization. The inference workers warm themselves up instead.
+
+        Args:
+            frame_shape (Tuple[int, int, int]): The (height, width, channels) of the
+                frames that will be detected.
+        """
+        if not self._model:
+            return
+
+        frame = np.zeros(frame_shape, dtype=np.uint8)
+        self._model(frame, self._parsed_device, iou=self._iou)
+        if self._config.roi_inference:
+            self._model(
+                frame,
+                self._parsed_device,
+                iou=self._iou,
+                imgsz=self._config.roi_image_size,
+            )
+
+    @property
+    def inferences_saved(self) -> int:
+        """
+        The number of frames the model didn't have to run on because they were
+        static.
+        """
+        return self._motion_gate.inferences_saved if self._motion_gate else 0
+
+    @property
+    def frames_tracked(self) -> int:
+        """
+        The number of frames the model didn't have to run on because the fingertips
+        were tracked instead.
+        """
+        return self._tracker.frames_tracked if self._tracker else 0
+
+    def close(self) -> None:
+        """
+        Releases the resources held by the detector, i.e. the inference workers or the
+        connection to the inference server.
+        """
+        if self._pool:
+            self._pool.close()
+            self._pool = None
+
+        if self._config.inference_server:
+            self._model.close()
+
+    def _load_model(self) -> None:
+        backend = InferenceBackend(self._config.inference_backend)
+        model_path = self._backend_model_path(
+            ModelDownloader(self._config).local_path_to_latest_model, backend
+        )
+
+        if self._config.inference_workers > 0:
+            self._pool = InferencePool(
+                model_path,
+                device=self._parsed_device,
+                iou=self._iou,
+                workers=self._config.inference_workers,
+            )
+        elif backend != InferenceBackend.ULTRALYTICS:
+            self._model = OnnxModel(model_path)
+        else:
+            self._model = ultralytics.YOLO(model_path)
+
+    def _track_or_run_model(self, frame):
+        if self._tracker:
+            with PROFILER.span("tracking", "inference"):
+                tracked_results = self._tracker.track(frame)
+            if tracked_results is not None:
+                return tracked_results
+
+        results = self._run_model(frame)
+        if self._tracker:
+            self._tracker.reset(frame, results)
+
+        return results
+
+    def _run_model(self, frame):
+        with PROFILER.span("preprocessing", "inference"):
+            region = self._keyboard_region(frame)
+
+        if region is not None:
+            with PROFILER.span("ultralytics_inference", "inference"):
+                roi_results = self._model(
+                    roi.crop(frame, region),
+                    self._parsed_device,
+                    iou=self._iou,
+                    imgsz=self._config.roi_image_size,
+                )[0]
+            results = roi.to_full_frame_results(roi_results, frame, region)
+
+            if self._count_markers(results) >= 4:
+                return results
+
+        # Either the markers aren't locked yet, or they've left the region.
+        with PROFILER.span("ultralytics_inference", "inference"):
+            results = self._model(frame, self._parsed_device, iou=self._iou)[0]
+        self._markers_locked = self._count_markers(results) >= 4
+
+        return results
+
+    def _keyboard_region(self, frame):
+        if (
+            not self._config.roi_inference
+            or not self._markers_locked
+            or not self._marker_coordinates
+        ):
+            return None
+
+        return roi.keyboard_region(
+            self._marker_coordinates,
+            frame.shape,
+            margin=self._config.roi_margin,
+        )
+
+    def _count_markers(self, results) -> int:
+        if not self._config.roi_inference:
+            return 0
+
+        return roi.count_confident_detections(
+            results, "marker", self._config.markers_min_confidence
+        )
+
+    def _reuse_results_if_static(self, frame):
+        if not self._motion_gate:
+            return None
+
+        if (
+            self._motion_gate.has_motion(frame, self._marker_coordinates)
+            or self._last_results is None
+        ):
+            return None
+
+        results = copy.copy(self._last_results)
+        results.orig_img = frame
+        return results
+
+    @staticmethod
+    def _backend_model_path(model_path: str, backend: InferenceBackend) -> str:
+        if backend == InferenceBackend.ULTRALYTICS:
+            return model_path
+
+        onnx_path = export_to_onnx(model_path)
+        if backend == InferenceBackend.ONNX:
+            return onnx_path
+
+        int8_path = quantized_model_path(onnx_path)
+        if not os.path.exists(int8_path):
+            raise FileNotFoundError(
+                f"{int8_path} not found. Run `c2k.py quantize` to create it."
+            )
+        return int8_path
+
+    @property
+    def _parsed_device(self):
+        try:
+            return int(self._device)
+        except ValueError:
+            return self._device
@@ -0,0 +1,152 @@
+import cv2
+import numpy as np
+from ultralytics.engine.results import Results
+
+from cameratokeyboard.types import RawImage
+
+TRACKED_CLASSES = ("finger", "thumb")
+WINDOW_SIZE = (21, 21)
+PYRAMID_LEVELS = 2
+# The flow is computed on a patch this far around each point, rather than on the whole
+# frame, which would mostly be spent building the image pyramids. With 2 pyramid
+# levels, points can move up to about half of it between two frames.
+PATCH_RADIUS = 48
+LK_PARAMETERS = {
+    "winSize": WINDOW_SIZE,
+    "maxLevel": PYRAMID_LEVELS,
+    "criteria": (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03),
+}
+
+
+class FingertipTracker:
+    """
+    Tracks the fingers and thumbs between two runs of the model with pyramidal
+    Lucas-Kanade optical flow, so the model only has to run every few frames.
+
+    One point per box is tracked, a third of the way down from its center, i.e. on the
+    fingertip (see `DetectedFingersAndThumbs`), and the whole box moves along with it.
+    The markers don't move. The flow of each point is computed on a small patch around
+    it. Each point is also tracked back to the previous frame: if it doesn't land where
+    it started, or any point is lost, the tracking can't be trusted and the model has
+    to run again.
+
+    Args:
+        interval (int): The model runs every this many frames at most.
+        max_error (float): The maximum forward-backward error of a point, in pixels.
+    """
+
+    def __init__(self, interval: int, max_error: float) -> None:
+        self._interval = interval
+        self._max_error = max_error
+        self._previous_frame = None
+        self._results = None
+        self._frames_since_detection = 0
+
+        self.frames_tracked = 0
+
+    def reset(self, frame: RawImage, results: Results) -> None:
+        """
+        Starts tracking from the detection results of the model.
+
+        Args:
+            frame (RawImage): The BGR frame the model ran on.
+            results (Results): The detection results of the frame.
+        """
+        self._previous_frame = frame
+        self._results = results
+        self._frames_since_detection = 0
+
+    def track(self, frame: RawImage) -> Results:
+        """
+        Moves the fingers and thumbs of the last results to where they are in the
+        given frame.
+
+        Args:
+            frame (RawImage): The BGR frame following the last tracked (or detected)
+                one.
+
+        Returns:
+            Results: The detection results of the frame, or None if the model should
+                run on it instead.
+        """
+        if self._results is None or self._frames_since_detection + 1 >= self._interval:
+            return None
+
+        data = self._results.boxes.cpu().numpy().data.copy()
+        tracked = np.isin(data[:, 5], self._tracked_class_indices())
+        if not tracked.any():
+            return None
+
+        displacements = self._flow(data[tracked], frame)
+        if displacements is None:
+            return None
+
+        data[tracked, 0:4] += np.tile(displacements, 2)
+        data[:, [0, 2]] = data[:, [0, 2]].clip(0, frame.shape[1])
+        data[:, [1, 3]] = data[:, [1, 3]].clip(0, frame.shape[0])
+
+        self._results = Results(
+            orig_img=frame,
+            path=self._results.path,
+            names=self._results.names,
+            boxes=data,
+        )
+        self._previous_frame = frame
+        self._frames_since_detection += 1
+        self.frames_tracked += 1
+
+        return self._results
+
+    def _flow(self, boxes: np.ndarray, frame: RawImage) -> np.ndarray:
+        tips = np.stack(
+            [
+                (boxes[:, 0] + boxes[:, 2]) / 2,
+                (boxes[:, 1] + boxes[:, 3]) / 2 + (boxes[:, 3] - boxes[:, 1]) / 3,
+            ],
+            axis=1,
+        )
+        displacements = np.empty_like(tips)
+
+        for i, (x, y) in enumerate(tips):
+            displacement = self._point_flow(x, y, frame)
+            if displacement is None:
+                return None
+            displacements[i] = displacement
+
+        return displacements
+
+    def _point_flow(self, x: float, y: float, frame: RawImage) -> np.ndarray:
+        x1, y1 = max(0, int(x) - PATCH_RADIUS), max(0, int(y) - PATCH_RADIUS)
+        x2, y2 = int(x) + PATCH_RADIUS + 1, int(y) + PATCH_RADIUS + 1
+        previous = _gray(self._previous_frame[y1:y2, x1:x2])
+        current = _gray(frame[y1:y2, x1:x2])
+        if min(previous.shape) < WINDOW_SIZE[0]:
+            return None
+
+        point = np.array([[[x - x1, y - y1]]], dtype=np.float32)
+        forward, forward_status, _ = cv2.calcOpticalFlowPyrLK(
+            previous, current, point, None, **LK_PARAMETERS
+        )
+        backward, backward_status, _ = cv2.calcOpticalFlowPyrLK(
+            current, previous, forward, None, **LK_PARAMETERS
+        )
+
+        if (
+            not forward_status[0, 0]
+            or not backward_status[0, 0]
+            or np.linalg.norm(backward - point) > self._max_error
+        ):
+            return None
+
+        return (forward - point).reshape(2)
+
+    def _tracked_class_indices(self):
+        return [
+            index
+            for index, name in self._results.names.items()
+            if name in TRACKED_CLASSES
+        ]
+
+
+def _gray(image: RawImage) -> np.ndarray:
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
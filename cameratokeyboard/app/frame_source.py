@@ -0,0 +1,349 @@
+from abc import ABC, abstractmethod
+from collections import deque
+import os
+import threading
+import time
+from typing import List, Tuple
+
+import cv2
+
+from cameratokeyboard.config import Config
+from cameratokeyboard.types import CapturedFrame, FramePacing, RawImage
+from cameratokeyboard.utils.profiler import get_profiler
+
+DEFAULT_BUFFER_SIZE = 2
+PROFILER = get_profiler()
+
+
+class FrameSource(ABC):  # pylint: disable=too-many-instance-attributes
+    """
+    Grabs frames continuously on its own thread and keeps the most recent ones in a
+    small ring buffer.
+
+    With realtime pacing, consumers always get the newest frame, so when they are
+    slower than the source, the frames in between are dropped rather than queued up.
+    With max speed pacing, frames are produced as fast as they are consumed and none
+    of them are dropped, which is what offline benchmarks need.
+
+    Args:
+        buffer_size (int, optional): The capacity of the ring buffer. Defaults to 2.
+        pacing (FramePacing, optional): Defaults to realtime.
+        fps (float, optional): With realtime pacing, frames are produced at this rate.
+            If None, the source is assumed to pace itself (e.g. a camera).
+        mirror (bool, optional): Whether to flip the frames horizontally. Defaults to
+            False.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        pacing: FramePacing = FramePacing.REALTIME,
+        fps: float = None,
+        mirror: bool = False,
+    ) -> None:
+        self._pacing = pacing
+        self._fps = fps
+        self._mirror = mirror
+
+        self._buffer = deque(maxlen=buffer_size)
+        self._condition = threading.Condition()
+        self._thread = None
+        self._is_running = False
+        self._is_exhausted = False
+
+        self._next_sequence = 0
+        self._last_read_sequence = -1
+        self._dropped_frames = 0
+
+    @property
+    def dropped_frames(self) -> int:
+        """
+        The number of grabbed frames that were never handed to a consumer.
+        """
+        return self._dropped_frames
+
+    @property
+    def is_running(self) -> bool:
+        """
+        Whether the grabbing thread is running or not.
+        """
+        return self._is_running
+
+    def start(self) -> None:
+        """
+        Starts grabbing frames on a background thread.
+        """
+        if self._is_running:
+            return
+
+        self._is_running = True
+        self._is_exhausted = False
+        self._thread = threading.Thread(
+            target=self._run, name="c2k-frame-source", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops the grabbing thread and releases the underlying source.
+        """
+        self._is_running = False
+
+        with self._condition:
+            self._condition.notify_all()
+
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+        self._thread = None
+        self._release()
+
+    def read(self, timeout: float = None) -> CapturedFrame:
+        """
+        Returns the newest frame (or with max speed pacing, the next frame) that hasn't
+        been read yet, blocking until one is available.
+
+        Args:
+            timeout (float, optional): The maximum number of seconds to wait. Waits
+                indefinitely if None.
+
+        Returns:
+            CapturedFrame: The frame along with its capture timestamp (from
+                `time.monotonic`) and sequence number, or None if the source has stopped
+                or the timeout expired.
+        """
+        with self._condition:
+            self._condition.wait_for(self._has_unread_frame_or_ended, timeout)
+
+            if not self._has_unread_frame():
+                return None
+
+            if self._pacing == FramePacing.MAX_SPEED:
+                frame = next(
+                    f for f in self._buffer if f.sequence > self._last_read_sequence
+                )
+            else:
+                frame = self._buffer[-1]
+
+            self._dropped_frames += frame.sequence - self._last_read_sequence - 1
+            self._last_read_sequence = frame.sequence
+            self._condition.notify_all()
+
+            return frame
+
+    @abstractmethod
+    def _grab(self) -> Tuple[bool, RawImage]:
+        """
+        Grabs the next frame, blocking if needed. Returns (False, None) once there are
+        no more frames.
+        """
+
+    @abstractmethod
+    def _release(self) -> None:
+        """
+        Releases the underlying source.
+        """
+
+    def _has_unread_frame(self) -> bool:
+        return (
+            bool(self._buffer) and self._buffer[-1].sequence > self._last_read_sequence
+        )
+
+    def _has_unread_frame_or_ended(self) -> bool:
+        return self._has_unread_frame() or self._is_exhausted or not self._is_running
+
+    def _has_room_or_stopped(self) -> bool:
+        unread = self._next_sequence - self._last_read_sequence - 1
+        return unread < self._buffer.maxlen or not self._is_running
+
+    def _run(self) -> None:
+        started_at = time.monotonic()
+
+        while self._is_running:
+            if self._pacing == FramePacing.MAX_SPEED:
+                with self._condition:
+                    self._condition.wait_for(self._has_room_or_stopped)
+            elif self._fps:
+                delay = started_at + self._next_sequence / self._fps - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+            with PROFILER.span("capture", "capture"):
+                success, image = self._grab()
+                timestamp = time.monotonic()
+
+                if success and self._mirror:
+                    image = cv2.flip(image, 1)
+
+            if not success:
+                break
+
+            with self._condition:
+                self._buffer.append(
+                    CapturedFrame(
+                        image=image, timestamp=timestamp, sequence=self._next_sequence
+                    )
+                )
+                self._next_sequence += 1
+                self._condition.notify_all()
+
+        with self._condition:
+            self._is_exhausted = True
+            self._condition.notify_all()
+
+
+class CameraFrameSource(FrameSource):
+    """
+    Grabs frames from a camera. The frames are mirrored so that the preview matches
+    the user's point of view.
+
+    Args:
+        device (int): The device number of the camera.
+        resolution (Tuple[int, int]): The requested frame size.
+        buffer_size (int, optional): The capacity of the ring buffer. Defaults to 2.
+    """
+
+    def __init__(
+        self,
+        device: int,
+        resolution: Tuple[int, int],
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ) -> None:
+        super().__init__(buffer_size=buffer_size, mirror=True)
+
+        self._cap = cv2.VideoCapture(device)
+        self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, resolution[0])
+        self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution[1])
+
+    def _grab(self) -> Tuple[bool, RawImage]:
+        return self._cap.read()
+
+    def _release(self) -> None:
+        self._cap.release()
+
+
+class VideoFileFrameSource(FrameSource):
+    """
+    Replays a recorded video file. The frames are expected to be already mirrored,
+    i.e. recorded the way the app sees them.
+
+    Args:
+        path (str): The path to the video file.
+        pacing (FramePacing, optional): Defaults to realtime, at the video's frame rate.
+        buffer_size (int, optional): The capacity of the ring buffer. Defaults to 2.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        pacing: FramePacing = FramePacing.REALTIME,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ) -> None:
+        self._cap = cv2.VideoCapture(path)
+        if not self._cap.isOpened():
+            raise ValueError(f"Could not open video file {path}.")
+
+        super().__init__(
+            buffer_size=buffer_size,
+            pacing=pacing,
+            fps=self._cap.get(cv2.CAP_PROP_FPS) or None,
+        )
+
+    def _grab(self) -> Tuple[bool, RawImage]:
+        return self._cap.read()
+
+    def _release(self) -> None:
+        self._cap.release()
+
+
+class ImageDirectoryFrameSource(FrameSource):
+    """
+    Replays a directory of images (e.g. the raw dataset) in file name order. The
+    images are expected to be already mirrored.
+
+    Args:
+        path (str): The path to the directory.
+        extension (str): The extension of the images, other files are ignored.
+        pacing (FramePacing, optional): Defaults to realtime.
+        fps (float, optional): The frame rate for realtime pacing. Defaults to 30.
+        buffer_size (int, optional): The capacity of the ring buffer. Defaults to 2.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        path: str,
+        extension: str,
+        pacing: FramePacing = FramePacing.REALTIME,
+        fps: float = 30.0,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ) -> None:
+        super().__init__(buffer_size=buffer_size, pacing=pacing, fps=fps)
+
+        self._paths = [
+            os.path.join(path, file)
+            for file in sorted(os.listdir(path))
+            if file.lower().endswith(f".{extension.lower()}")
+        ]
+        if not self._paths:
+            raise ValueError(f"No .{extension} images found in {path}.")
+
+        self._next_index = 0
+
+    def _grab(self) -> Tuple[bool, RawImage]:
+        if self._next_index >= len(self._paths):
+            return False, None
+
+        image = cv2.imread(self._paths[self._next_index])
+        self._next_index += 1
+
+        return image is not None, image
+
+    def _release(self) -> None:
+        self._next_index = len(self._paths)
+
+
+def create_frame_source(config: Config) -> FrameSource:
+    """
+    Creates the frame source described by the configuration: the camera, or if
+    `video_input_path` is set, a video file or a directory of images.
+
+    Args:
+        config (Config): The application configuration.
+
+    Returns:
+        FrameSource: The (not yet started) frame source.
+    """
+    if not config.video_input_path:
+        return CameraFrameSource(config.video_input_device, config.resolution)
+
+    pacing = FramePacing(config.replay_pacing)
+
+    if os.path.isdir(config.video_input_path):
+        return ImageDirectoryFrameSource(
+            config.video_input_path,
+            extension=config.image_extension,
+            pacing=pacing,
+            fps=config.replay_fps,
+        )
+
+    return VideoFileFrameSource(config.video_input_path, pacing=pacing)
+
+
+def create_frame_sources(config: Config) -> List[FrameSource]:
+    """
+    Creates a frame source per camera if `video_input_devices` is set, or else the
+    single frame source described by the configuration (see `create_frame_source`).
+
+    Args:
+        config (Config): The application configuration.
+
+    Returns:
+        List[FrameSource]: The (not yet started) frame sources.
+    """
+    if not config.video_input_devices:
+        return [create_frame_source(config)]
+
+    return [
+        CameraFrameSource(device, config.resolution)
+        for device in config.video_input_devices
+    ]
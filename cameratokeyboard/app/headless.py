@@ -0,0 +1,135 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+from typing import List, TextIO
+
+from cameratokeyboard.interfaces import IDetectedFrameData
+from cameratokeyboard.types import FrameState, Point
+
+STDOUT = "-"
+CALIBRATION_DELAY = 5.0
+
+
+class HeadlessUI:
+    """
+    A drop-in replacement for `UI` that doesn't render anything. Emitted keys and the
+    state of every frame are written to a stream (stdout, a file or a named pipe) as
+    JSON lines, e.g.:
+
+        {"event": "frame", "state": "valid", "down_keys": [], ...}
+        {"event": "key", "key": "a"}
+
+    Calibration starts on its own once the hands have been in view for a few seconds.
+
+    Args:
+        output (str, optional): The path to write to, or "-" for stdout. Defaults to
+            stdout.
+        calibration_delay (float, optional): How long the frame has to be valid before
+            calibration starts, in seconds. Defaults to 5.
+    """
+
+    def __init__(
+        self, output: str = STDOUT, calibration_delay: float = CALIBRATION_DELAY
+    ) -> None:
+        self._output_path = output
+        self._stream: TextIO = None
+        self._stream_lock = threading.Lock()
+        self._calibration_delay = calibration_delay
+        self._calibration_ready_since = None
+        self._stopped = asyncio.Event()
+
+        self._detected_frame_data: IDetectedFrameData = None
+
+    async def run(self):
+        """
+        Waits until `stop` is called.
+        """
+        await self._stopped.wait()
+
+        if self._stream and self._stream is not sys.stdout:
+            self._stream.close()
+
+    def stop(self):
+        """
+        Makes `run` return.
+        """
+        self._stopped.set()
+
+    def update_data(self, detected_frame_data: IDetectedFrameData):
+        """
+        Writes the state of the frame and handles the calibration.
+        """
+        self._detected_frame_data = detected_frame_data
+
+        self._write(
+            {
+                "event": "frame",
+                "timestamp": time.time(),
+                "state": detected_frame_data.state.value,
+                "down_keys": list(detected_frame_data.down_keys),
+                "markers": self._serialize_points(
+                    detected_frame_data.marker_coordinates
+                ),
+                "fingers": self._serialize_points(
+                    detected_frame_data.finger_coordinates
+                ),
+                "thumbs": self._serialize_points(detected_frame_data.thumb_coordinates),
+                "down_fingers": self._serialize_points(
+                    detected_frame_data.down_finger_coordinates
+                ),
+            }
+        )
+
+        self._handle_calibration()
+
+    def update_text(self, text: str):
+        """
+        Writes an emitted key.
+        """
+        self._write({"event": "key", "key": text})
+
+    def _handle_calibration(self):
+        data = self._detected_frame_data
+
+        if not data.requires_calibration or data.is_calibration_in_progress:
+            self._calibration_ready_since = None
+            return
+
+        if data.state != FrameState.VALID:
+            self._calibration_ready_since = None
+            return
+
+        if self._calibration_ready_since is None:
+            self._calibration_ready_since = time.monotonic()
+
+        if time.monotonic() - self._calibration_ready_since < self._calibration_delay:
+            return
+
+        self._calibration_ready_since = None
+        data.start_calibration(self._on_calibration_complete)
+        self._write({"event": "calibration", "status": "started"})
+
+    def _on_calibration_complete(self):
+        self._write({"event": "calibration", "status": "done"})
+
+    def _write(self, record: dict):
+        with self._stream_lock:
+            if self._stream is None:
+                self._stream = (
+                    sys.stdout
+                    if self._output_path == STDOUT
+                    else open(  # pylint: disable=consider-using-with
+                        self._output_path, "w", encoding="utf-8", buffering=1
+                    )
+                )
+
+            self._stream.write(json.dumps(record) + "\n")
+            self._stream.flush()
+
+    @staticmethod
+    def _serialize_points(points: List[Point]) -> List[List[float]]:
+        return [
+            [float(p.x), float(p.y)] if p is not None else None for p in points or []
+        ]
@@ -0,0 +1,303 @@
+import logging
+import multiprocessing
+from multiprocessing import shared_memory
+import queue
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+import ultralytics
+from ultralytics.engine.results import Results
+
+from cameratokeyboard.app.onnx_backend import OnnxModel
+from cameratokeyboard.logger import get_logger
+
+LOGGER = get_logger()
+STOP_WORKER = None
+WARM_UP_FRAME_SHAPE = (640, 640, 3)
+# How often the workers are checked while waiting for results, in seconds.
+POLL_INTERVAL = 0.5
+
+
+def run_inference_worker(  # pylint: disable=too-many-arguments,too-many-locals
+    model_path: str,
+    device: Any,
+    iou: float,
+    task_queue: multiprocessing.Queue,
+    result_queue: multiprocessing.Queue,
+) -> None:
+    """
+    The entry point of the inference worker processes. Loads and warms up the model,
+    then reads frames from shared memory and sends back the raw detection arrays.
+
+    Tasks are (sequence, shared memory name, shape, dtype) tuples and results are
+    (sequence, names, boxes data) tuples, boxes data being an (n, 6) array of
+    (x1, y1, x2, y2, confidence, class) rows or None if inference failed.
+    """
+    logging.getLogger("ultralytics").setLevel(logging.ERROR)
+    if model_path.endswith(".onnx"):
+        model = OnnxModel(model_path)
+    else:
+        model = ultralytics.YOLO(model_path)
+    model(np.zeros(WARM_UP_FRAME_SHAPE, dtype=np.uint8), device=device, verbose=False)
+    attached = {}
+
+    try:
+        while (task := task_queue.get()) is not STOP_WORKER:
+            sequence, shm_name, shape, dtype = task
+
+            if shm_name not in attached:
+                attached[shm_name] = shared_memory.SharedMemory(name=shm_name)
+            frame = np.ndarray(shape, dtype=dtype, buffer=attached[shm_name].buf)
+
+            try:
+                results = model(frame, device=device, iou=iou, verbose=False)[0]
+                data = results.boxes.cpu().numpy().data
+                result_queue.put((sequence, results.names, data))
+            except Exception:  # pylint: disable=broad-exception-caught
+                LOGGER.exception("Inference failed for frame %d", sequence)
+                result_queue.put((sequence, None, None))
+    finally:
+        for shm in attached.values():
+            shm.close()
+
+
+class ReorderBuffer:
+    """
+    Releases items strictly in sequence order, holding back the ones that arrive
+    early.
+    """
+
+    def __init__(self) -> None:
+        self._pending: Dict[int, Any] = {}
+        self._next_sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, sequence: int, item: Any) -> None:
+        """
+        Adds an item that may have arrived out of order.
+        """
+        self._pending[sequence] = item
+
+    def pop(self) -> Tuple[bool, Any]:
+        """
+        Returns (True, item) if the next item in sequence has arrived, (False, None)
+        otherwise.
+        """
+        if self._next_sequence not in self._pending:
+            return False, None
+
+        item = self._pending.pop(self._next_sequence)
+        self._next_sequence += 1
+        return True, item
+
+
+class InferencePool:  # pylint: disable=too-many-instance-attributes
+    """
+    Runs the model in a pool of worker processes so that inference can use all the
+    cores and isn't serialized against the rest of the app by the GIL.
+
+    Frames are handed over through shared memory, so they are never pickled. Each
+    in-flight frame gets its own slot, and there are as many slots as workers plus one,
+    which also bounds the number of frames in flight. Results are released in the
+    order the frames were submitted.
+
+    A worker that dies is restarted. The frames it was processing are lost and there
+    is no telling which ones they were, so all the frames in flight are returned as
+    failed.
+
+    Args:
+        model_path (str): The path to the model, loaded by each worker. `.onnx`
+            models are run with ONNX Runtime.
+        device: The device to run the inference on.
+        iou (float): The IoU threshold for NMS.
+        workers (int): The number of worker processes.
+        worker_target (Callable, optional): The worker entry point. Defaults to
+            `run_inference_worker`.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        model_path: str,
+        device: Any,
+        iou: float,
+        workers: int,
+        worker_target: Callable = run_inference_worker,
+    ) -> None:
+        self._context = multiprocessing.get_context("spawn")
+        self._task_queue = self._context.Queue()
+        self._result_queue = self._context.Queue()
+        self._worker_target = worker_target
+        self._worker_args = (
+            model_path,
+            device,
+            iou,
+            self._task_queue,
+            self._result_queue,
+        )
+        self._processes = [self._create_worker(i) for i in range(workers)]
+
+        self._slot_count = workers + 1
+        self._slots = []
+        self._free_slots = []
+        self._in_flight: Dict[int, Tuple[int, np.ndarray, Any]] = {}
+        self._reorder_buffer = ReorderBuffer()
+        self._next_sequence = 0
+
+        for process in self._processes:
+            process.start()
+
+    @property
+    def in_flight(self) -> int:
+        """
+        The number of frames submitted whose results haven't been returned yet.
+        """
+        return len(self._in_flight) + len(self._reorder_buffer)
+
+    @property
+    def is_busy(self) -> bool:
+        """
+        Whether there are at least as many frames being processed as workers.
+        """
+        return len(self._in_flight) >= len(self._processes)
+
+    def submit(self, frame: np.ndarray, context: Any = None) -> int:
+        """
+        Copies the frame into a free shared memory slot and queues it for inference.
+        Blocks until a slot is available if all of them are in use.
+
+        Args:
+            frame (np.ndarray): The frame to run the inference on.
+            context (Any, optional): Returned along with the results of this frame.
+
+        Returns:
+            int: The sequence number of the frame.
+        """
+        if not self._slots:
+            self._allocate_slots(frame)
+
+        if self._slots[0].size < frame.nbytes:
+            raise ValueError(
+                f"Frame of {frame.nbytes} bytes doesn't fit in a "
+                f"{self._slots[0].size} bytes slot."
+            )
+
+        while not self._free_slots:
+            self._receive(block=True)
+
+        slot_index = self._free_slots.pop()
+        slot = self._slots[slot_index]
+
+        np.ndarray(frame.shape, dtype=frame.dtype, buffer=slot.buf)[:] = frame
+
+        sequence = self._next_sequence
+        self._next_sequence += 1
+        self._in_flight[sequence] = (slot_index, frame, context)
+        self._task_queue.put((sequence, slot.name, frame.shape, frame.dtype.str))
+
+        return sequence
+
+    def next_result(self, block: bool = True) -> Tuple[Any, Results]:
+        """
+        Returns the results of the oldest submitted frame.
+
+        Args:
+            block (bool, optional): Whether to wait for the results or not. Defaults
+                to True.
+
+        Returns:
+            Tuple[Any, Results]: The context passed to `submit` and the detection
+                results (None if the inference failed). None if the results aren't
+                available yet, or if nothing is in flight.
+        """
+        while True:
+            available, item = self._reorder_buffer.pop()
+            if available:
+                return item
+
+            if not self._in_flight or not self._receive(block=block):
+                return None
+
+    def close(self) -> None:
+        """
+        Stops the workers and frees the shared memory.
+        """
+        for _ in self._processes:
+            self._task_queue.put(STOP_WORKER)
+
+        for process in self._processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+
+        for slot in self._slots:
+            slot.close()
+            slot.unlink()
+
+        self._slots = []
+        self._free_slots = []
+
+    def _allocate_slots(self, frame: np.ndarray) -> None:
+        self._slots = [
+            shared_memory.SharedMemory(create=True, size=frame.nbytes)
+            for _ in range(self._slot_count)
+        ]
+        self._free_slots = list(range(self._slot_count))
+
+    def _create_worker(self, index: int) -> multiprocessing.Process:
+        return self._context.Process(
+            target=self._worker_target,
+            args=self._worker_args,
+            name=f"c2k-inference-{index}",
+            daemon=True,
+        )
+
+    def _receive(self, block: bool) -> bool:
+        while True:
+            try:
+                sequence, names, data = self._result_queue.get(
+                    block=block, timeout=POLL_INTERVAL
+                )
+            except queue.Empty:
+                if not block:
+                    return False
+                if self._restart_dead_workers():
+                    return True
+                continue
+
+            # The frame was already failed when a worker died.
+            if sequence not in self._in_flight:
+                continue
+
+            results = None
+            if data is not None:
+                _, frame, _ = self._in_flight[sequence]
+                results = Results(orig_img=frame, path=None, names=names, boxes=data)
+
+            self._complete(sequence, results)
+            return True
+
+    def _complete(self, sequence: int, results: Results) -> None:
+        slot_index, _, context = self._in_flight.pop(sequence)
+        self._free_slots.append(slot_index)
+        self._reorder_buffer.add(sequence, (context, results))
+
+    def _restart_dead_workers(self) -> bool:
+        dead = [i for i, p in enumerate(self._processes) if not p.is_alive()]
+        if not dead:
+            return False
+
+        for i in dead:
+            LOGGER.error(
+                "Inference worker %s died with exit code %s, restarting it",
+                self._processes[i].name,
+                self._processes[i].exitcode,
+            )
+            self._processes[i] = self._create_worker(i)
+            self._processes[i].start()
+
+        for sequence in list(self._in_flight):
+            self._complete(sequence, None)
+
+        return True
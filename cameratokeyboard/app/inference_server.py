@@ -0,0 +1,288 @@
+from collections import Counter
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Dict, List, Tuple, Union
+
+import numpy as np
+
+from cameratokeyboard.app.detector import Detector
+from cameratokeyboard.app.remote_model import (
+    parse_address,
+    receive_message,
+    send_message,
+)
+from cameratokeyboard.config import Config
+from cameratokeyboard.logger import get_logger
+from cameratokeyboard.model.model_downloader import ModelDownloader
+from cameratokeyboard.types import RawImage, ServerStats
+
+LOGGER = get_logger()
+POLL_INTERVAL = 0.1
+STATS_INTERVAL = 10.0
+
+
+class _PendingRequest:  # pylint: disable=too-few-public-methods
+    __slots__ = ["frame", "names", "boxes", "error", "done"]
+
+    def __init__(self, frame: RawImage) -> None:
+        self.frame = frame
+        self.names = None
+        self.boxes = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while (message := receive_message(self.request)) is not None:
+            send_message(self.request, *self.server.inference_server.handle(*message))
+
+
+class _ServerMixin:  # pylint: disable=too-few-public-methods
+    daemon_threads = True
+
+    def __init__(self, address, inference_server: "InferenceServer") -> None:
+        self.inference_server = inference_server
+        super().__init__(address, _RequestHandler)
+
+
+class _ThreadingTCPServer(_ServerMixin, socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+
+
+class _ThreadingUnixStreamServer(_ServerMixin, socketserver.ThreadingUnixStreamServer):
+    pass
+
+
+class InferenceServer:  # pylint: disable=too-many-instance-attributes
+    """
+    Loads the detector once and runs it for many clients on the same host (see
+    `RemoteModel`), which then only capture the frames and process the detections.
+
+    Each connection is served on its own thread. Requests from all connections are
+    queued and batched: a batch is run as soon as it's full, or when the oldest request
+    in it has waited for `serve_max_wait_ms`.
+
+    Every message is a JSON header followed by a binary body (see `send_message`):
+
+    - `{"type": "detect", "shapes": [[height, width, 3], ...]}` with the BGR uint8
+      frames one after the other as the body, e.g. one per camera. They are queued
+      together, so they end up in the same batch. Answered with
+      `{"names": {...}, "shapes": [[n, 6], ...]}` and the float32
+      (x1, y1, x2, y2, confidence, class) rows of every frame as the body, or
+      `{"error": "..."}`.
+    - `{"type": "stats"}`, answered with the `ServerStats` as the header.
+
+    Args:
+        config (Config): The application configuration.
+    """
+
+    def __init__(self, config: Config) -> None:
+        self._config = config
+        self._max_batch_size = config.serve_max_batch_size
+        self._max_wait = config.serve_max_wait_ms / 1000
+        self._requests = queue.Queue()
+        self._stopped = threading.Event()
+
+        self._detector = None
+        self._server = None
+        self._threads = []
+
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._inference_time = 0.0
+        self._started_at = None
+
+    def run(self) -> None:
+        """
+        Loads the detector and serves until interrupted.
+        """
+        ModelDownloader(self._config).run()
+        detector = Detector(self._config)
+        width, height = self._config.resolution
+        detector.warm_up((height, width, 3))
+
+        self.start(detector)
+        LOGGER.info("Serving on %s", self._config.serve_address)
+
+        try:
+            while not self._stopped.wait(STATS_INTERVAL):
+                self._log_stats()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+            detector.close()
+            self._log_stats()
+
+    def start(self, detector: Detector) -> None:
+        """
+        Starts batching the requests and accepting connections, on background threads.
+
+        Args:
+            detector (Detector): Runs the batches, see `Detector.infer_batch`.
+        """
+        self._detector = detector
+        self._started_at = time.monotonic()
+        self._stopped.clear()
+
+        family, address = parse_address(self._config.serve_address)
+        if family == socket.AF_UNIX:
+            if os.path.exists(address):
+                os.remove(address)
+            self._server = _ThreadingUnixStreamServer(address, self)
+        else:
+            self._server = _ThreadingTCPServer(address, self)
+
+        self._threads = [
+            threading.Thread(target=self._batch_loop, name="c2k-batcher", daemon=True),
+            threading.Thread(
+                target=self._server.serve_forever, name="c2k-server", daemon=True
+            ),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops accepting connections and batching the requests.
+        """
+        self._stopped.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+            family, address = parse_address(self._config.serve_address)
+            if family == socket.AF_UNIX and os.path.exists(address):
+                os.remove(address)
+            self._server = None
+
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    @property
+    def address(self) -> Union[str, Tuple[str, int]]:
+        """
+        The address the server is bound to, e.g. with the actual port if it was 0.
+        """
+        return self._server.server_address if self._server else None
+
+    def stats(self) -> ServerStats:
+        """
+        Returns:
+            ServerStats: The number of frames detected and batches run so far, the
+                distribution of the batch sizes and the throughput.
+        """
+        with self._stats_lock:
+            frames = sum(size * count for size, count in self._batch_sizes.items())
+            batches = sum(self._batch_sizes.values())
+            elapsed = time.monotonic() - self._started_at if self._started_at else 0
+
+            return ServerStats(
+                frames=frames,
+                batches=batches,
+                mean_batch_size=frames / batches if batches else 0.0,
+                batch_sizes=dict(sorted(self._batch_sizes.items())),
+                throughput=frames / elapsed if elapsed else 0.0,
+                mean_inference_ms=(
+                    self._inference_time / batches * 1000 if batches else 0.0
+                ),
+            )
+
+    def handle(
+        self, header: Dict[str, Any], body: bytes
+    ) -> Tuple[Dict[str, Any], bytes]:
+        """
+        Answers a request, blocking until its frames have been detected if it's a
+        detection.
+
+        Args:
+            header (Dict[str, Any]): The header of the request.
+            body (bytes): The body of the request.
+
+        Returns:
+            Tuple[Dict[str, Any], bytes]: The header and the body of the response.
+        """
+        if header.get("type") == "stats":
+            return self.stats()._asdict(), b""
+
+        if header.get("type") != "detect":
+            return {"error": f"Unknown request type {header.get('type')}."}, b""
+
+        requests = []
+        offset = 0
+        for shape in header["shapes"]:
+            size = int(np.prod(shape))
+            frame = np.frombuffer(body, dtype=np.uint8, count=size, offset=offset)
+            requests.append(_PendingRequest(frame.reshape(shape)))
+            offset += size
+
+        for request in requests:
+            self._requests.put(request)
+        for request in requests:
+            request.done.wait()
+
+        errors = [request.error for request in requests if request.error]
+        if errors:
+            return {"error": errors[0]}, b""
+
+        boxes = [np.ascontiguousarray(r.boxes, dtype="<f4") for r in requests]
+        return {
+            "names": requests[0].names,
+            "shapes": [frame_boxes.shape for frame_boxes in boxes],
+        }, b"".join(frame_boxes.tobytes() for frame_boxes in boxes)
+
+    def _batch_loop(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                batch = [self._requests.get(timeout=POLL_INTERVAL)]
+            except queue.Empty:
+                continue
+
+            deadline = time.monotonic() + self._max_wait
+            while len(batch) < self._max_batch_size:
+                try:
+                    batch.append(
+                        self._requests.get(timeout=max(deadline - time.monotonic(), 0))
+                    )
+                except queue.Empty:
+                    break
+
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[_PendingRequest]) -> None:
+        started_at = time.perf_counter()
+        try:
+            results = self._detector.infer_batch([request.frame for request in batch])
+            for request, result in zip(batch, results):
+                request.names = result.names
+                request.boxes = result.boxes.cpu().numpy().data
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            LOGGER.exception("Inference failed for a batch of %d frames", len(batch))
+            for request in batch:
+                request.error = str(e)
+
+        with self._stats_lock:
+            self._batch_sizes[len(batch)] += 1
+            self._inference_time += time.perf_counter() - started_at
+
+        for request in batch:
+            request.done.set()
+
+    def _log_stats(self) -> None:
+        stats = self.stats()
+        LOGGER.info(
+            "Detected %d frames in %d batches (mean size: %.1f, sizes: %s), "
+            "%.1f FPS, %.1fms per batch",
+            stats.frames,
+            stats.batches,
+            stats.mean_batch_size,
+            stats.batch_sizes,
+            stats.throughput,
+            stats.mean_inference_ms,
+        )
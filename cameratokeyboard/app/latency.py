@@ -0,0 +1,144 @@
+from collections import deque
+import json
+import threading
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from cameratokeyboard.types import LatencySummary
+
+DEFAULT_WINDOW_SIZE = 10000
+STAGE_CAPTURE = "capture"
+STAGE_INFERENCE = "inference"
+STAGE_DETECTED_FRAME = "detected_frame"
+STAGE_DISPATCH = "dispatch"
+STAGE_THROTTLER = "throttler"
+STAGE_OUTPUT = "output"
+
+
+class FrameTrace:
+    """
+    Follows a frame through the app, recording when it leaves each stage. All the
+    timestamps come from `time.monotonic`, the same clock the frame sources use for the
+    capture timestamp.
+
+    Args:
+        capture_timestamp (float): When the frame was captured.
+        sequence (int): The sequence number of the frame.
+    """
+
+    def __init__(self, capture_timestamp: float, sequence: int) -> None:
+        self.capture_timestamp = capture_timestamp
+        self.sequence = sequence
+        self.marks: Dict[str, float] = {STAGE_CAPTURE: capture_timestamp}
+
+    def __repr__(self) -> str:
+        return f"FrameTrace(sequence={self.sequence}, latencies={self.latencies()})"
+
+    def mark(self, stage: str) -> None:
+        """
+        Records that the frame is done with the given stage, now.
+        """
+        self.marks[stage] = time.monotonic()
+
+    def latencies(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: The time from the capture to the end of each recorded
+                stage, in seconds.
+        """
+        return {
+            stage: timestamp - self.capture_timestamp
+            for stage, timestamp in self.marks.items()
+            if stage != STAGE_CAPTURE
+        }
+
+
+class LatencyHistogram:
+    """
+    Keeps the most recent latency samples of a stage and calculates their percentiles.
+
+    Args:
+        window_size (int, optional): The number of samples to keep.
+    """
+
+    def __init__(self, window_size: int = DEFAULT_WINDOW_SIZE) -> None:
+        self._samples = deque(maxlen=window_size)
+        self.count = 0
+
+    def add(self, latency: float) -> None:
+        """
+        Adds a sample, in seconds.
+        """
+        self._samples.append(latency)
+        self.count += 1
+
+    def percentiles(self, *percentiles: float) -> List[float]:
+        """
+        Returns the requested percentiles (0-100) of the samples in the window, in
+        seconds, or NaNs if there are no samples yet.
+        """
+        if not self._samples:
+            return [float("nan")] * len(percentiles)
+
+        return [float(p) for p in np.percentile(self._samples, percentiles)]
+
+
+class LatencyTracker:
+    """
+    Collects the traces of the frames and keeps a latency histogram per stage. Safe to
+    be used from multiple threads.
+
+    Args:
+        window_size (int, optional): The number of samples kept per stage.
+    """
+
+    def __init__(self, window_size: int = DEFAULT_WINDOW_SIZE) -> None:
+        self._window_size = window_size
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, trace: FrameTrace) -> None:
+        """
+        Adds the latencies of all the stages the frame went through.
+        """
+        with self._lock:
+            for stage, latency in trace.latencies().items():
+                if stage not in self._histograms:
+                    self._histograms[stage] = LatencyHistogram(self._window_size)
+                self._histograms[stage].add(latency)
+
+    def summary(self) -> List[LatencySummary]:
+        """
+        Returns:
+            List[LatencySummary]: The p50, p95 and p99 latencies from the capture to
+                the end of each stage, in seconds, in the order the stages were first
+                seen.
+        """
+        with self._lock:
+            return [
+                LatencySummary(
+                    stage, histogram.count, *histogram.percentiles(50, 95, 99)
+                )
+                for stage, histogram in self._histograms.items()
+            ]
+
+    def dump(self, path: str) -> None:
+        """
+        Writes the summary to a JSON file, latencies in milliseconds.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    s.stage: {
+                        "count": s.count,
+                        "p50_ms": s.p50 * 1000,
+                        "p95_ms": s.p95 * 1000,
+                        "p99_ms": s.p99 * 1000,
+                    }
+                    for s in self.summary()
+                },
+                file,
+                indent=2,
+            )
@@ -0,0 +1,111 @@
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from cameratokeyboard.types import Point, RawImage
+
+DOWNSCALED_SIZE = (160, 90)
+REGION_MARGIN = 0.15
+
+
+class MotionGate:
+    """
+    Decides whether a frame is different enough from the last one the model has seen
+    to be worth running the model on. The comparison is done on a small grayscale copy
+    of the frames, so it costs a fraction of a millisecond.
+
+    Only the keyboard area is compared when the markers are known, so movements
+    elsewhere (e.g. the user's face) don't trigger the model.
+
+    Args:
+        threshold (float): The minimum mean absolute difference of the grayscale
+            pixel values (0-255) that counts as motion.
+        max_skipped_frames (int): Forces the model to run after this many skipped
+            frames in a row, so slow drifts are caught eventually.
+        size (Tuple[int, int], optional): The size of the downscaled frames.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        max_skipped_frames: int,
+        size: Tuple[int, int] = DOWNSCALED_SIZE,
+    ) -> None:
+        self._threshold = threshold
+        self._max_skipped_frames = max_skipped_frames
+        self._size = size
+        self._reference = None
+        self._skipped_in_a_row = 0
+
+        self.frames_checked = 0
+        self.inferences_saved = 0
+
+    def has_motion(self, frame: RawImage, markers: List[Point] = None) -> bool:
+        """
+        Compares the frame with the last frame that had motion. If it has motion, it
+        becomes the new reference.
+
+        Args:
+            frame (RawImage): The BGR frame.
+            markers (List[Point], optional): The coordinates of the markers, in full
+                frame pixels. The whole frame is compared if any of them is missing.
+
+        Returns:
+            bool: True if the model should be run on this frame.
+        """
+        self.frames_checked += 1
+        small = cv2.cvtColor(
+            cv2.resize(frame, self._size, interpolation=cv2.INTER_AREA),
+            cv2.COLOR_BGR2GRAY,
+        )
+
+        if (
+            self._reference is None
+            or self._skipped_in_a_row >= self._max_skipped_frames
+            or self._difference(small, frame.shape, markers) >= self._threshold
+        ):
+            self._reference = small
+            self._skipped_in_a_row = 0
+            return True
+
+        self._skipped_in_a_row += 1
+        self.inferences_saved += 1
+        return False
+
+    def _difference(
+        self, small: np.ndarray, frame_shape: tuple, markers: List[Point]
+    ) -> float:
+        x1, y1, x2, y2 = self._region(frame_shape, markers)
+
+        return float(
+            np.mean(
+                cv2.absdiff(small[y1:y2, x1:x2], self._reference[y1:y2, x1:x2]),
+            )
+        )
+
+    def _region(
+        self, frame_shape: tuple, markers: List[Point]
+    ) -> Tuple[int, int, int, int]:
+        width, height = self._size
+
+        if not markers or not all(markers):
+            return 0, 0, width, height
+
+        scale_x = width / frame_shape[1]
+        scale_y = height / frame_shape[0]
+        xs = [m.x * scale_x for m in markers]
+        ys = [m.y * scale_y for m in markers]
+        margin_x = (max(xs) - min(xs)) * REGION_MARGIN
+        margin_y = (max(ys) - min(ys)) * REGION_MARGIN
+
+        x1 = int(max(0, min(xs) - margin_x))
+        x2 = int(min(width, max(xs) + margin_x))
+        # The fingers hover above the keyboard, hence the generous top margin.
+        y1 = int(max(0, min(ys) - (max(ys) - min(ys)) - margin_y))
+        y2 = int(min(height, max(ys) + margin_y))
+
+        if x2 <= x1 or y2 <= y1:
+            return 0, 0, width, height
+
+        return x1, y1, x2, y2
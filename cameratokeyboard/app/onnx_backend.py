@@ -0,0 +1,259 @@
+import ast
+import os
+from typing import Dict, List, Tuple, Union
+
+import cv2
+import numpy as np
+from ultralytics.engine.results import Results
+
+from cameratokeyboard.logger import get_logger
+from cameratokeyboard.types import RawImage
+
+LOGGER = get_logger()
+DEFAULT_IMAGE_SIZE = 640
+DEFAULT_CONFIDENCE = 0.25
+STRIDE = 32
+LETTERBOX_COLOR = (114, 114, 114)
+CLASS_OFFSET = 10000
+
+
+def export_to_onnx(model_path: str) -> str:
+    """
+    Exports a PyTorch model to ONNX, next to it. The export is done only once, it's
+    reused as long as it's newer than the model.
+
+    Args:
+        model_path (str): The path to the `.pt` model.
+
+    Returns:
+        str: The path to the `.onnx` model.
+    """
+    onnx_path = f"{os.path.splitext(model_path)[0]}.onnx"
+
+    if os.path.exists(onnx_path) and os.path.getmtime(onnx_path) >= os.path.getmtime(
+        model_path
+    ):
+        return onnx_path
+
+    LOGGER.info("Exporting %s to ONNX...", model_path)
+
+    # Imported here, as it's only needed once per model.
+    import ultralytics  # pylint: disable=import-outside-toplevel
+
+    exported_path = ultralytics.YOLO(model_path).export(
+        format="onnx", dynamic=True, simplify=False
+    )
+    if os.path.abspath(exported_path) != os.path.abspath(onnx_path):
+        os.replace(exported_path, onnx_path)
+
+    return onnx_path
+
+
+def quantized_model_path(onnx_path: str) -> str:
+    """
+    Returns the path of the INT8 variant of an ONNX model, see `Quantizer`.
+    """
+    return f"{os.path.splitext(onnx_path)[0]}.int8.onnx"
+
+
+def letterbox(
+    image: RawImage, size: int
+) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """
+    Resizes the image to fit in a square of the given size, keeping its aspect ratio,
+    and pads it to the next multiple of the model's stride, the same way ultralytics
+    does. The model is exported with dynamic axes, so the input needn't be square.
+
+    Args:
+        image (RawImage): The BGR image.
+        size (int): The size of the square.
+
+    Returns:
+        Tuple: The letterboxed image, the scale and the (x, y) padding.
+    """
+    height, width = image.shape[:2]
+    scale = min(size / height, size / width)
+    new_width, new_height = round(width * scale), round(height * scale)
+    pad_x = (-new_width % STRIDE) / 2
+    pad_y = (-new_height % STRIDE) / 2
+
+    if (new_width, new_height) != (width, height):
+        image = cv2.resize(
+            image, (new_width, new_height), interpolation=cv2.INTER_LINEAR
+        )
+
+    top, bottom = round(pad_y - 0.1), round(pad_y + 0.1)
+    left, right = round(pad_x - 0.1), round(pad_x + 0.1)
+    image = cv2.copyMakeBorder(
+        image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR
+    )
+
+    return image, scale, (left, top)
+
+
+def to_input_tensor(image: np.ndarray) -> np.ndarray:
+    """
+    Converts a letterboxed BGR image to the (1, 3, height, width) float RGB tensor the
+    model expects.
+    """
+    tensor = image[:, :, ::-1].transpose(2, 0, 1)
+    return np.ascontiguousarray(tensor, dtype=np.float32)[None] / 255.0
+
+
+def postprocess(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    output: np.ndarray,
+    scale: float,
+    padding: Tuple[float, float],
+    image_shape: Tuple[int, int],
+    confidence: float,
+    iou: float,
+) -> np.ndarray:
+    """
+    Turns the raw output of a YOLOv8 detection model into boxes in image coordinates.
+
+    Args:
+        output (np.ndarray): The (1, 4 + classes, anchors) output of the model.
+        scale (float): The scale of the letterbox.
+        padding (Tuple[float, float]): The (x, y) padding of the letterbox.
+        image_shape (Tuple[int, int]): The (height, width) of the original image.
+        confidence (float): The minimum confidence of the boxes.
+        iou (float): The IoU threshold for NMS.
+
+    Returns:
+        np.ndarray: An (n, 6) array of (x1, y1, x2, y2, confidence, class) rows, the
+            same as `Results.boxes.data`.
+    """
+    predictions = output[0].T
+    classes = predictions[:, 4:].argmax(axis=1)
+    confidences = predictions[np.arange(len(predictions)), 4 + classes]
+
+    keep = confidences > confidence
+    boxes, classes, confidences = (
+        predictions[keep, :4],
+        classes[keep],
+        confidences[keep],
+    )
+    if len(boxes) == 0:
+        return np.zeros((0, 6), dtype=np.float32)
+
+    xyxy = np.empty_like(boxes)
+    xyxy[:, :2] = boxes[:, :2] - boxes[:, 2:] / 2
+    xyxy[:, 2:] = boxes[:, :2] + boxes[:, 2:] / 2
+
+    indices = _non_max_suppression(boxes, classes, confidences, confidence, iou)
+
+    xyxy = xyxy[indices]
+    xyxy[:, [0, 2]] = ((xyxy[:, [0, 2]] - padding[0]) / scale).clip(0, image_shape[1])
+    xyxy[:, [1, 3]] = ((xyxy[:, [1, 3]] - padding[1]) / scale).clip(0, image_shape[0])
+
+    return np.concatenate(
+        [xyxy, confidences[indices, None], classes[indices, None]], axis=1
+    ).astype(np.float32)
+
+
+def _non_max_suppression(
+    boxes: np.ndarray,
+    classes: np.ndarray,
+    confidences: np.ndarray,
+    confidence: float,
+    iou: float,
+) -> np.ndarray:
+    # Offsetting the boxes of each class keeps them from suppressing each other.
+    xywh = boxes.copy()
+    xywh[:, :2] += (classes * CLASS_OFFSET)[:, None] - boxes[:, 2:] / 2
+    indices = cv2.dnn.NMSBoxes(xywh.tolist(), confidences.tolist(), confidence, iou)
+    indices = np.array(indices, dtype=int).reshape(-1)
+
+    return indices[np.argsort(-confidences[indices], kind="stable")]
+
+
+class OnnxModel:
+    """
+    Runs a YOLOv8 detection model exported to ONNX with ONNX Runtime on the CPU, with
+    our own pre and post processing. Can be called like `ultralytics.YOLO`.
+
+    Args:
+        path (str): The path to the `.onnx` model exported by ultralytics.
+        confidence (float, optional): The minimum confidence of the detections.
+    """
+
+    def __init__(self, path: str, confidence: float = DEFAULT_CONFIDENCE) -> None:
+        try:
+            import onnxruntime  # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            raise ImportError(
+                "The onnx inference backend requires onnxruntime: "
+                "pip install onnxruntime"
+            ) from e
+
+        self._session = onnxruntime.InferenceSession(
+            path, providers=["CPUExecutionProvider"]
+        )
+        self.input_name: str = self._session.get_inputs()[0].name
+        self._confidence = confidence
+
+        metadata = self._session.get_modelmeta().custom_metadata_map
+        self.names: Dict[int, str] = ast.literal_eval(metadata["names"])
+        self._image_size = max(
+            ast.literal_eval(metadata.get("imgsz", str([DEFAULT_IMAGE_SIZE])))
+        )
+
+    def __call__(
+        self,
+        frames: Union[RawImage, List[RawImage]],
+        device=None,  # pylint: disable=unused-argument
+        iou: float = 0.7,
+        imgsz: int = None,
+        **_,
+    ) -> List[Results]:
+        """
+        Detects the objects in a frame, or in a batch of frames with one run of the
+        model.
+
+        Args:
+            frames (Union[RawImage, List[RawImage]]): The BGR frame or frames.
+            device: Ignored, the inference always runs on the CPU.
+            iou (float, optional): The IoU threshold for NMS.
+            imgsz (int, optional): The input size. Defaults to the export's.
+
+        Returns:
+            List[Results]: The detection results of each frame.
+        """
+        if not isinstance(frames, list):
+            frames = [frames]
+
+        letterboxed = [letterbox(frame, imgsz or self._image_size) for frame in frames]
+        outputs = self._run_batches([image for image, _, _ in letterboxed])
+
+        return [
+            Results(
+                orig_img=frame,
+                path=None,
+                names=self.names,
+                boxes=postprocess(
+                    output,
+                    scale,
+                    padding,
+                    frame.shape[:2],
+                    self._confidence,
+                    iou,
+                ),
+            )
+            for frame, output, (_, scale, padding) in zip(frames, outputs, letterboxed)
+        ]
+
+    def _run_batches(self, images: List[np.ndarray]) -> List[np.ndarray]:
+        # Images of different sizes can't be stacked, so there's a batch per size.
+        # Padding them to the same size would change their detections.
+        batches = {}
+        for i, image in enumerate(images):
+            batches.setdefault(image.shape, []).append(i)
+
+        outputs = [None] * len(images)
+        for indices in batches.values():
+            batch = np.concatenate([to_input_tensor(images[i]) for i in indices])
+            output = self._session.run(None, {self.input_name: batch})[0]
+            for j, i in enumerate(indices):
+                outputs[i] = output[j : j + 1]
+
+        return outputs
@@ -0,0 +1,298 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, List, Tuple
+
+from cameratokeyboard.logger import get_logger
+from cameratokeyboard.types import DropPolicy, StageStats
+
+LOGGER = get_logger()
+END_OF_STREAM = object()
+POLL_INTERVAL = 0.1
+
+
+class StageQueue:
+    """
+    A bounded queue between two pipeline stages that applies a drop policy when full.
+
+    Args:
+        maxsize (int): The capacity of the queue.
+        drop_policy (DropPolicy): What to do when an item is put on a full queue.
+        stop_event (threading.Event): Interrupts blocking puts when set.
+    """
+
+    def __init__(
+        self, maxsize: int, drop_policy: DropPolicy, stop_event: threading.Event
+    ) -> None:
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._drop_policy = drop_policy
+        self._stop_event = stop_event
+
+    @property
+    def depth(self) -> int:
+        """
+        The number of items currently waiting in the queue.
+        """
+        return self._queue.qsize()
+
+    def put(self, item: Any) -> None:
+        """
+        Puts an item on the queue, applying the drop policy if the queue is full.
+        """
+        if self._drop_policy == DropPolicy.BLOCK:
+            self._put_blocking(item)
+        elif self._drop_policy == DropPolicy.DROP_NEWEST:
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                self.dropped += 1
+        else:
+            self._put_dropping_oldest(item)
+
+    def put_end_of_stream(self) -> None:
+        """
+        Signals the downstream stage that no more items will come. The marker is never
+        dropped: with `DropPolicy.BLOCK` it waits for room like any other item, with
+        the drop policies older items are evicted to make room for it if needed.
+        """
+        if self._drop_policy == DropPolicy.BLOCK:
+            self._put_blocking(END_OF_STREAM)
+        else:
+            self._put_dropping_oldest(END_OF_STREAM)
+
+    def get(self, timeout: float = None) -> Any:
+        """
+        Takes the next item from the queue.
+
+        Raises:
+            queue.Empty: If no item was available within `timeout` seconds.
+        """
+        return self._queue.get(timeout=timeout)
+
+    def _put_blocking(self, item: Any) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    def _put_dropping_oldest(self, item: Any) -> None:
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    evicted = self._queue.get_nowait()
+                    if evicted is not END_OF_STREAM:
+                        self.dropped += 1
+                except queue.Empty:
+                    pass
+
+
+class PipelineStage:  # pylint: disable=too-many-instance-attributes
+    """
+    A single step of the pipeline that runs on its own thread, takes items from its
+    input queue, processes them with `handler` and hands the results to the next
+    stage. A handler returning None drops the item.
+
+    Args:
+        name (str): The name of the stage, used for reporting.
+        handler (Callable): Processes one item. For the source stage (no input queue),
+            it's called without arguments and returning None ends the stream.
+        input_queue (StageQueue): Where the items come from. None for the source.
+        output_queue (StageQueue): Where the processed items go.
+        stop_event (threading.Event): Stops the stage when set.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        name: str,
+        handler: Callable,
+        input_queue: StageQueue,
+        output_queue: StageQueue,
+        stop_event: threading.Event,
+    ) -> None:
+        self.name = name
+        self._handler = handler
+        self._input_queue = input_queue
+        self._output_queue = output_queue
+        self._stop_event = stop_event
+        self._thread = None
+
+        self._processed = 0
+        self._total_service_time = 0.0
+
+    @property
+    def stats(self) -> StageStats:
+        """
+        The input queue depth, drop count and mean service time of this stage.
+        """
+        return StageStats(
+            name=self.name,
+            queue_depth=self._input_queue.depth if self._input_queue else 0,
+            queue_size=self._input_queue.maxsize if self._input_queue else 0,
+            processed=self._processed,
+            dropped=self._input_queue.dropped if self._input_queue else 0,
+            service_time=(
+                self._total_service_time / self._processed if self._processed else 0.0
+            ),
+        )
+
+    def start(self) -> None:
+        """
+        Starts the stage thread.
+        """
+        self._thread = threading.Thread(
+            target=self._run, name=f"c2k-{self.name}", daemon=True
+        )
+        self._thread.start()
+
+    def join(self, timeout: float = None) -> None:
+        """
+        Waits for the stage thread to finish.
+        """
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            if self._input_queue is None:
+                item = None
+            else:
+                try:
+                    item = self._input_queue.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+
+                if item is END_OF_STREAM:
+                    break
+
+            started_at = time.perf_counter()
+            try:
+                if self._input_queue is None:
+                    result = self._handler()
+                else:
+                    result = self._handler(item)
+            except Exception:  # pylint: disable=broad-exception-caught
+                LOGGER.exception("Pipeline stage %s failed", self.name)
+                continue
+
+            if self._input_queue is None and result is None:
+                break
+
+            self._total_service_time += time.perf_counter() - started_at
+            self._processed += 1
+
+            if result is not None:
+                self._output_queue.put(result)
+
+        self._output_queue.put_end_of_stream()
+
+
+class Pipeline:
+    """
+    Runs a chain of stages, each on its own thread, connected by bounded queues. The
+    stages overlap, e.g. while frame N is being post processed, frame N+1 is already
+    being fed to the model.
+
+    Args:
+        source (Callable[[], Any]): Produces the items, e.g. captured frames. Must
+            return None once there are no more items (or the source has been stopped).
+        stages (List[Tuple[str, Callable]]): The (name, handler) of each processing
+            stage, in order. Each handler receives the output of the previous one.
+        queue_size (int, optional): The capacity of each queue. Defaults to 2.
+        drop_policy (DropPolicy, optional): What to do when a queue is full. Defaults
+            to dropping the oldest item.
+        source_name (str, optional): The name of the source stage. Defaults to
+            "capture".
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        source: Callable[[], Any],
+        stages: List[Tuple[str, Callable]],
+        queue_size: int = 2,
+        drop_policy: DropPolicy = DropPolicy.DROP_OLDEST,
+        source_name: str = "capture",
+    ) -> None:
+        self._stop_event = threading.Event()
+        self._stages = []
+
+        input_queue = None
+        for name, handler in [(source_name, source), *stages]:
+            output_queue = StageQueue(queue_size, drop_policy, self._stop_event)
+            self._stages.append(
+                PipelineStage(
+                    name, handler, input_queue, output_queue, self._stop_event
+                )
+            )
+            input_queue = output_queue
+
+        self._output_queue = input_queue
+
+    def start(self) -> None:
+        """
+        Starts all the stages.
+        """
+        for stage in self._stages:
+            stage.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """
+        Stops all the stages. The source should be stopped first so it doesn't keep
+        the capture stage blocked.
+        """
+        self._stop_event.set()
+
+        for stage in self._stages:
+            stage.join(timeout)
+
+    def get(self, timeout: float = None) -> Any:
+        """
+        Takes the next fully processed item, blocking until one is available.
+
+        Args:
+            timeout (float, optional): The maximum number of seconds to wait. Waits
+                until the pipeline ends if None.
+
+        Returns:
+            The output of the last stage, or None if the pipeline has ended or the
+            timeout expired.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while not self._stop_event.is_set():
+            wait = POLL_INTERVAL
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    return None
+
+            try:
+                item = self._output_queue.get(timeout=wait)
+            except queue.Empty:
+                continue
+
+            return None if item is END_OF_STREAM else item
+
+        return None
+
+    def stats(self) -> List[StageStats]:
+        """
+        Returns the statistics of each stage, plus the output queue (named "output")
+        which reveals whether the consumer is keeping up.
+        """
+        return [stage.stats for stage in self._stages] + [
+            StageStats(
+                name="output",
+                queue_depth=self._output_queue.depth,
+                queue_size=self._output_queue.maxsize,
+                processed=0,
+                dropped=self._output_queue.dropped,
+                service_time=0.0,
+            )
+        ]
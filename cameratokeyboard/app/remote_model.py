@@ -0,0 +1,174 @@
+import json
+import socket
+import struct
+from typing import Any, Dict, List, Tuple, Union
+
+import numpy as np
+from ultralytics.engine.results import Results
+
+from cameratokeyboard.types import RawImage, ServerStats
+
+UNIX_PREFIX = "unix:"
+LENGTH = struct.Struct("!I")
+
+
+def parse_address(address: str) -> Tuple[int, Union[str, Tuple[str, int]]]:
+    """
+    Parses the address of the inference server: `unix:<path>` for a Unix domain
+    socket, or `<host>:<port>` for TCP.
+
+    Returns:
+        Tuple: The socket family and the address to bind or connect to.
+
+    Raises:
+        ValueError: If the address is neither.
+    """
+    if address.startswith(UNIX_PREFIX):
+        return socket.AF_UNIX, address[len(UNIX_PREFIX) :]
+
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(
+            f"Invalid address {address}, expected <host>:<port> or unix:<path>."
+        )
+
+    return socket.AF_INET, (host, int(port))
+
+
+def send_message(sock: socket.socket, header: Dict[str, Any], body: bytes = b""):
+    """
+    Sends a message: a JSON header and a binary body, each prefixed with its length.
+    """
+    encoded_header = json.dumps(header).encode("utf-8")
+    sock.sendall(
+        LENGTH.pack(len(encoded_header))
+        + encoded_header
+        + LENGTH.pack(len(body))
+        + body
+    )
+
+
+def receive_message(sock: socket.socket) -> Tuple[Dict[str, Any], bytes]:
+    """
+    Receives a message sent with `send_message`.
+
+    Returns:
+        Tuple[Dict[str, Any], bytes]: The header and the body, or None if the
+            connection was closed.
+    """
+    header = _receive_chunk(sock)
+    if header is None:
+        return None
+
+    body = _receive_chunk(sock)
+    if body is None:
+        return None
+
+    return json.loads(header), body
+
+
+def _receive_chunk(sock: socket.socket) -> bytes:
+    length = _receive_exactly(sock, LENGTH.size)
+    if length is None:
+        return None
+
+    return _receive_exactly(sock, LENGTH.unpack(length)[0])
+
+
+def _receive_exactly(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            return None
+        received += count
+
+    return bytes(buffer)
+
+
+class RemoteModel:
+    """
+    Runs the detections on an `InferenceServer` instead of a local model. Can be
+    called like `ultralytics.YOLO`.
+
+    Args:
+        address (str): The address of the server, `<host>:<port>` or `unix:<path>`.
+    """
+
+    def __init__(self, address: str) -> None:
+        family, parsed_address = parse_address(address)
+        self._socket = socket.socket(family, socket.SOCK_STREAM)
+        self._socket.connect(parsed_address)
+        self.names: Dict[int, str] = None
+
+    def __call__(
+        self,
+        frames: Union[RawImage, List[RawImage]],
+        device=None,  # pylint: disable=unused-argument
+        **_,
+    ) -> List[Results]:
+        """
+        Detects the objects in a frame, or in each of a list of frames.
+
+        Args:
+            frames (Union[RawImage, List[RawImage]]): The BGR frame or frames.
+            device: Ignored, the server decides where the inference runs. So do the
+                other arguments of `ultralytics.YOLO`, e.g. the IoU threshold.
+
+        Returns:
+            List[Results]: The detection results of each frame.
+
+        Raises:
+            ConnectionError: If the server has closed the connection.
+            RuntimeError: If the inference failed on the server.
+        """
+        if not isinstance(frames, list):
+            frames = [frames]
+
+        # All the frames go in one request, so the server batches them together.
+        header, body = self._request(
+            {"type": "detect", "shapes": [frame.shape for frame in frames]},
+            b"".join(
+                np.ascontiguousarray(frame, dtype=np.uint8).tobytes()
+                for frame in frames
+            ),
+        )
+        if "error" in header:
+            raise RuntimeError(f"Inference failed on the server: {header['error']}")
+
+        self.names = {int(k): v for k, v in header["names"].items()}
+        all_boxes = np.frombuffer(body, dtype="<f4").reshape(-1, 6)
+        counts = [shape[0] for shape in header["shapes"]]
+        boxes = np.split(all_boxes, np.cumsum(counts)[:-1])
+
+        return [
+            Results(orig_img=frame, path=None, names=self.names, boxes=frame_boxes)
+            for frame, frame_boxes in zip(frames, boxes)
+        ]
+
+    def stats(self) -> ServerStats:
+        """
+        Returns the stats of the server, see `InferenceServer.stats`.
+        """
+        header, _ = self._request({"type": "stats"})
+        header["batch_sizes"] = {int(k): v for k, v in header["batch_sizes"].items()}
+        return ServerStats(**header)
+
+    def close(self) -> None:
+        """
+        Closes the connection to the server.
+        """
+        self._socket.close()
+
+    def _request(
+        self, header: Dict[str, Any], body: bytes = b""
+    ) -> Tuple[Dict[str, Any], bytes]:
+        send_message(self._socket, header, body)
+        response = receive_message(self._socket)
+        if response is None:
+            raise ConnectionError("The inference server closed the connection.")
+
+        return response
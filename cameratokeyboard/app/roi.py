@@ -0,0 +1,93 @@
+from typing import List, Tuple
+
+import numpy as np
+from ultralytics.engine.results import Results
+
+from cameratokeyboard.types import Point, RawImage
+
+Region = Tuple[int, int, int, int]
+
+
+def keyboard_region(markers: List[Point], frame_shape: tuple, margin: float) -> Region:
+    """
+    Calculates the region of the frame that contains everything the detection cares
+    about: the keyboard (i.e. the marker quadrilateral) and the hands above it.
+
+    Args:
+        markers (List[Point]): The 4 marker coordinates, in pixels.
+        frame_shape (tuple): The shape of the frame (height, width, ...).
+        margin (float): The margin around the markers, as a fraction of the width of
+            the keyboard. The fingers hover above the keyboard, so it should be
+            generous.
+
+    Returns:
+        Region: (x1, y1, x2, y2) clipped to the frame, or None if any marker is
+            missing or the region is empty.
+    """
+    if not markers or len(markers) < 4 or not all(markers):
+        return None
+
+    xs = [m.x for m in markers]
+    ys = [m.y for m in markers]
+    padding = (max(xs) - min(xs)) * margin
+
+    x1 = int(max(0, min(xs) - padding))
+    y1 = int(max(0, min(ys) - padding))
+    x2 = int(min(frame_shape[1], max(xs) + padding))
+    y2 = int(min(frame_shape[0], max(ys) + padding))
+
+    if x2 <= x1 or y2 <= y1:
+        return None
+
+    return x1, y1, x2, y2
+
+
+def crop(frame: RawImage, region: Region) -> RawImage:
+    """
+    Crops the frame to the region, without copying.
+    """
+    x1, y1, x2, y2 = region
+    return frame[y1:y2, x1:x2]
+
+
+def to_full_frame_results(
+    roi_results: Results, frame: RawImage, region: Region
+) -> Results:
+    """
+    Maps the results of a detection on a cropped region back to the full frame.
+
+    Args:
+        roi_results (Results): The detection results of the cropped region.
+        frame (RawImage): The full frame.
+        region (Region): The region that was cropped.
+
+    Returns:
+        Results: The same detections, in full frame coordinates.
+    """
+    x1, y1, _, _ = region
+    data = np.array(roi_results.boxes.cpu().numpy().data, dtype=np.float32)
+    data[:, [0, 2]] += x1
+    data[:, [1, 3]] += y1
+
+    return Results(
+        orig_img=frame, path=roi_results.path, names=roi_results.names, boxes=data
+    )
+
+
+def count_confident_detections(
+    results: Results, class_name: str, min_confidence: float
+) -> int:
+    """
+    Counts the detections of a class above a confidence threshold.
+    """
+    class_indices = [k for k, v in results.names.items() if v == class_name]
+    if not class_indices:
+        return 0
+
+    boxes = results.boxes.cpu().numpy()
+    return int(
+        np.count_nonzero(
+            (np.asarray(boxes.cls) == class_indices[0])
+            & (np.asarray(boxes.conf) > min_confidence)
+        )
+    )
@@ -1,5 +1,6 @@
 import asyncio
 import os
+import threading
 import time
 from typing import Tuple
 
@@ -8,6 +9,7 @@ import pygame_gui
 
 from cameratokeyboard.types import FrameState
 from cameratokeyboard.interfaces import IDetectedFrameData
+from cameratokeyboard.utils.profiler import get_profiler
 
 DEFAULT_IMAGE = pygame.image.load(
     os.path.join(os.path.dirname(__file__), "..", "assets", "nocam.png")
@@ -29,6 +31,7 @@ CROP_MARGIN = 0.1
 ASYNC_SLEEP = 0.01
 MESSAGE_TIMEOUT = 5.0
 STATE_BOX_BORDER_WIDTH = 8
+PROFILER = get_profiler()
 
 
 class UI:  # pylint: disable=too-many-instance-attributes
@@ -83,6 +86,9 @@ class UI:  # pylint: disable=too-many-instance-attributes
         )
 
         self._task_scheduler = TaskScheduler()
+        # Set from the thread processing the frames when the calibration completes, and
+        # handled on the UI loop, which owns the task scheduler and the message.
+        self._calibration_done = threading.Event()
         self._countdown_ends_at = None
         self._message = None
 
@@ -104,13 +110,15 @@ class UI:  # pylint: disable=too-many-instance-attributes
             self._task_scheduler.tick()
             self._handle_calibration()
 
-            self._update_image()
+            with PROFILER.span("ui_draw", "ui"):
+                self._update_image()
 
-            self._ui_manager.update(time_delta)
-            self._ui_window_surface.blit(self._ui_background, (0, 0))
-            self._ui_manager.draw_ui(self._ui_window_surface)
+                self._ui_manager.update(time_delta)
+                self._ui_window_surface.blit(self._ui_background, (0, 0))
+                self._ui_manager.draw_ui(self._ui_window_surface)
 
-            pygame.display.update()
+            with PROFILER.span("display_update", "ui"):
+                pygame.display.update()
             await asyncio.sleep(ASYNC_SLEEP)
 
     def update_data(self, detected_frame_data: IDetectedFrameData):
@@ -222,6 +230,10 @@ class UI:  # pylint: disable=too-many-instance-attributes
             self._ui_manager.process_events(event)
 
     def _handle_calibration(self):
+        if self._calibration_done.is_set():
+            self._calibration_done.clear()
+            self._show_calibration_done_message()
+
         if (
             not self._detected_frame_data
             or self._task_scheduler.task_exists(self._start_calibration)
@@ -248,7 +260,7 @@ class UI:  # pylint: disable=too-many-instance-attributes
         ):
             return
 
-        self._detected_frame_data.start_calibration(self._show_calibration_done_message)
+        self._detected_frame_data.start_calibration(self._calibration_done.set)
         self._message = "Calibrating..."  # TODO: I18n
         self._countdown_ends_at = None
 
@@ -1,16 +1,28 @@
 import argparse
 import os
 
+from cameratokeyboard.app.inference_server import InferenceServer
+from cameratokeyboard.benchmark import Benchmark, LoadTest
+from cameratokeyboard.model.quantize import Quantizer
 from cameratokeyboard.model.train import Trainer
+from cameratokeyboard.types import DropPolicy, FramePacing, InferenceBackend
 
 CMD_TRAIN = "train"
+CMD_QUANTIZE = "quantize"
+CMD_BENCHMARK = "benchmark"
+CMD_LOAD_TEST = "load_test"
+CMD_SERVE = "serve"
 
 COMMANDS = {
     CMD_TRAIN: Trainer,
+    CMD_QUANTIZE: Quantizer,
+    CMD_BENCHMARK: Benchmark,
+    CMD_LOAD_TEST: LoadTest,
+    CMD_SERVE: InferenceServer,
 }
 
 
-def parse_args(argv) -> dict:
+def parse_args(argv) -> dict:  # pylint: disable=too-many-statements
     """
     Parses all the command line arguments and returns them as a dictionary.
     """
@@ -93,6 +105,17 @@ def parse_args(argv) -> dict:
         help="The extension of the images in the dataset. Default: jpg",
     )
 
+    parser.add_argument(
+        "-qc",
+        "--quantization_calibration_images",
+        type=int,
+        default=200,
+        help=(
+            "The number of train split images to calibrate the INT8 quantization on. "
+            "Default: 200"
+        ),
+    )
+
     parser.add_argument(
         "-p",
         "--model_path",
@@ -119,6 +142,24 @@ def parse_args(argv) -> dict:
         help="The refresh rate of the app. Default: 30",
     )
 
+    parser.add_argument(
+        "-hl",
+        "--headless",
+        action="store_true",
+        help=(
+            "Run without a window, writing the emitted keys and the state of each "
+            "frame as JSON lines to --headless_output."
+        ),
+    )
+
+    parser.add_argument(
+        "-ho",
+        "--headless_output",
+        type=str,
+        default="-",
+        help="Where to write in headless mode, a file, a pipe or - for stdout. Default: -",
+    )
+
     parser.add_argument(
         "-i",
         "--video_input_device",
@@ -127,6 +168,49 @@ def parse_args(argv) -> dict:
         help="The device number of the input camera. Default: 0",
     )
 
+    parser.add_argument(
+        "-is",
+        "--video_input_devices",
+        type=int,
+        nargs="+",
+        default=(),
+        help=(
+            "The device numbers of several cameras to type with at once. Their frames "
+            "are detected in one batch. Overrides --video_input_device. Default: None"
+        ),
+    )
+
+    parser.add_argument(
+        "-vp",
+        "--video_input_path",
+        type=str,
+        default=None,
+        help=(
+            "Replay a video file or a directory of images (e.g. raw_dataset) instead "
+            "of using the camera. Default: None"
+        ),
+    )
+
+    parser.add_argument(
+        "-rpc",
+        "--replay_pacing",
+        type=str,
+        choices=[pacing.value for pacing in FramePacing],
+        default=FramePacing.REALTIME.value,
+        help=(
+            "Replay the video input at its frame rate (realtime) or as fast as it's "
+            "processed, without dropping frames (max). Default: realtime"
+        ),
+    )
+
+    parser.add_argument(
+        "-rf",
+        "--replay_fps",
+        type=float,
+        default=30.0,
+        help="The frame rate for replaying a directory of images. Default: 30",
+    )
+
     parser.add_argument(
         "-d",
         "--processing_device",
@@ -138,6 +222,200 @@ def parse_args(argv) -> dict:
         ),
     )
 
+    parser.add_argument(
+        "-ib",
+        "--inference_backend",
+        type=str,
+        choices=[backend.value for backend in InferenceBackend],
+        default=InferenceBackend.ULTRALYTICS.value,
+        help=(
+            "What runs the model. onnx exports the model to ONNX once and runs it "
+            "with ONNX Runtime on the CPU (pip install onnxruntime). onnx_int8 runs "
+            "the model made by the quantize command. Default: ultralytics"
+        ),
+    )
+
+    parser.add_argument(
+        "-w",
+        "--inference_workers",
+        type=int,
+        default=0,
+        help=(
+            "The number of processes to run the inference in. 0 runs it in the app's "
+            "process. Default: 0"
+        ),
+    )
+
+    parser.add_argument(
+        "-sv",
+        "--inference_server",
+        type=str,
+        default=None,
+        help=(
+            "Run the inference on a server started with the serve command, at "
+            "<host>:<port> or unix:<path>, instead of loading the model. Default: None"
+        ),
+    )
+
+    parser.add_argument(
+        "-sa",
+        "--serve_address",
+        type=str,
+        default="127.0.0.1:8765",
+        help=(
+            "Where the serve command listens, <host>:<port> or unix:<path>. "
+            "Default: 127.0.0.1:8765"
+        ),
+    )
+
+    parser.add_argument(
+        "-sb",
+        "--serve_max_batch_size",
+        type=int,
+        default=8,
+        help="The maximum number of frames the server detects at once. Default: 8",
+    )
+
+    parser.add_argument(
+        "-sw",
+        "--serve_max_wait_ms",
+        type=float,
+        default=5.0,
+        help=(
+            "How long the server waits for more frames to fill a batch, in "
+            "milliseconds. Default: 5"
+        ),
+    )
+
+    parser.add_argument(
+        "-mt",
+        "--motion_threshold",
+        type=float,
+        default=0.0,
+        help=(
+            "Skip the model and reuse the last detections when the mean grayscale "
+            "difference (0-255) of the keyboard area is below this value. 2.0 is a "
+            "good start. Default: 0 (disabled)"
+        ),
+    )
+
+    parser.add_argument(
+        "-ms",
+        "--motion_max_skipped_frames",
+        type=int,
+        default=15,
+        help="Run the model after this many skipped frames in a row. Default: 15",
+    )
+
+    parser.add_argument(
+        "-roi",
+        "--roi_inference",
+        action="store_true",
+        help=(
+            "Once all the markers are detected, run the model only on the keyboard "
+            "region, at a smaller input size. Not used with --inference_workers."
+        ),
+    )
+
+    parser.add_argument(
+        "-rs",
+        "--roi_image_size",
+        type=int,
+        default=320,
+        help="The input size of the model for the keyboard region. Default: 320",
+    )
+
+    parser.add_argument(
+        "-rm",
+        "--roi_margin",
+        type=float,
+        default=0.25,
+        help=(
+            "The margin around the markers, as a fraction of the keyboard width, "
+            "included in the keyboard region. Default: 0.25"
+        ),
+    )
+
+    parser.add_argument(
+        "-ti",
+        "--tracking_interval",
+        type=int,
+        default=0,
+        help=(
+            "Run the model only every this many frames, or when the tracking is "
+            "lost, and track the fingertips with optical flow in between. Not used "
+            "with --inference_workers. Default: 0 (disabled)"
+        ),
+    )
+
+    parser.add_argument(
+        "-te",
+        "--tracking_max_error",
+        type=float,
+        default=1.0,
+        help=(
+            "The tracking is lost when a fingertip tracked forwards then backwards "
+            "lands further than this many pixels from where it started. Default: 1"
+        ),
+    )
+
+    parser.add_argument(
+        "-pq",
+        "--pipeline_queue_size",
+        type=int,
+        default=2,
+        help="The capacity of the queues between the processing stages. Default: 2",
+    )
+
+    parser.add_argument(
+        "-pd",
+        "--pipeline_drop_policy",
+        type=str,
+        choices=[policy.value for policy in DropPolicy],
+        default=DropPolicy.DROP_OLDEST.value,
+        help=(
+            "What to do when a processing stage can't keep up and its queue is full. "
+            "Always block when replaying with --replay_pacing max. Default: drop_oldest"
+        ),
+    )
+
+    parser.add_argument(
+        "-lr",
+        "--latency_report_path",
+        type=str,
+        default=None,
+        help=(
+            "Write the p50/p95/p99 latencies from the capture of the frames to the "
+            "end of each processing stage to this JSON file on exit. Default: None"
+        ),
+    )
+
+    parser.add_argument(
+        "-pf",
+        "--profile",
+        type=str,
+        nargs="?",
+        const="c2k_trace.json",
+        default=None,
+        metavar="TRACE_PATH",
+        help=(
+            "Record where the time goes (capture, inference, post processing, UI) "
+            "and write it as a Chrome trace, viewable in https://ui.perfetto.dev. "
+            "Default path: c2k_trace.json"
+        ),
+    )
+
+    parser.add_argument(
+        "-rdp",
+        "--record_detections_path",
+        type=str,
+        default=None,
+        help=(
+            "Write the raw detection results to this JSON lines file, to replay them "
+            "with the benchmark command. Default: None"
+        ),
+    )
+
     parser.add_argument(
         "-mc",
         "--markers_min_confidence",
@@ -170,6 +448,15 @@ def parse_args(argv) -> dict:
         help="The sensitivity for the key down action. Default: 0.75",
     )
 
+    parser.add_argument(
+        "-kp",
+        "--key_down_prediction_frames",
+        type=int,
+        default=1,
+        help="How many frames ahead a finger landing on a key can be predicted, to "
+        "detect the key down earlier. 0 disables it. Default: 1",
+    )
+
     parser.add_argument(
         "-l",
         "--keyboard_layout",
@@ -186,6 +473,98 @@ def parse_args(argv) -> dict:
         help="The delay for repeating keys. Default: 0.4",
     )
 
+    parser.add_argument(
+        "-bi",
+        "--benchmark_iterations",
+        type=int,
+        default=2000,
+        help="The number of calls per benchmark. Default: 2000",
+    )
+
+    parser.add_argument(
+        "-bd",
+        "--benchmark_detections_path",
+        type=str,
+        default=None,
+        help=(
+            "Benchmark with detection results recorded with --record_detections_path "
+            "instead of synthetic ones. Default: None"
+        ),
+    )
+
+    parser.add_argument(
+        "-bo",
+        "--benchmark_output_path",
+        type=str,
+        default=None,
+        help="Save the benchmark results to this JSON file. Default: None",
+    )
+
+    parser.add_argument(
+        "-bb",
+        "--benchmark_baseline_path",
+        type=str,
+        default=None,
+        help=(
+            "Compare the benchmark results with the ones saved to this JSON file. "
+            "Default: None"
+        ),
+    )
+
+    parser.add_argument(
+        "-bt",
+        "--benchmark_tolerance",
+        type=float,
+        default=0.1,
+        help=(
+            "How much slower than the baseline a benchmark can be before it's "
+            "reported, as a fraction. Default: 0.1"
+        ),
+    )
+
+    parser.add_argument(
+        "-ltt",
+        "--load_test_text",
+        type=str,
+        default="the quick brown fox jumps over the lazy dog",
+        help="The text the load test types. Default: the quick brown fox...",
+    )
+
+    parser.add_argument(
+        "-ltr",
+        "--load_test_repeat",
+        type=int,
+        default=10,
+        help="How many times the load test types the text. Default: 10",
+    )
+
+    parser.add_argument(
+        "-ltj",
+        "--load_test_jitter",
+        type=float,
+        default=1.0,
+        help="The jitter of the simulated detections, in pixels. Default: 1",
+    )
+
+    parser.add_argument(
+        "-ltm",
+        "--load_test_miss_rate",
+        type=float,
+        default=0.0,
+        help="The probability of each simulated detection to be missed. Default: 0",
+    )
+
+    parser.add_argument(
+        "-ltf",
+        "--load_test_false_positive_rate",
+        type=float,
+        default=0.0,
+        help=(
+            "The probability of each simulated frame to have a false positive. "
+            "Default: 0"
+        ),
+    )
+
     args = parser.parse_args(argv)
 
     args_dict = args.__dict__
@@ -0,0 +1,3 @@
+from .load_test import LoadTest
+from .runner import Benchmark
+from .typing_simulator import TypingSimulator
@@ -0,0 +1,168 @@
+import copy
+from typing import Callable, List, Tuple
+
+import numpy as np
+from ultralytics.engine.results import Results
+
+from cameratokeyboard.config import Config
+from cameratokeyboard.core.calibration import AdjacentNeighborCalibrationStrategy
+from cameratokeyboard.core.detected_frame import DetectedFrame, detections_to_arrays
+from cameratokeyboard.core.detected_objects import (
+    DetectedFingersAndThumbs,
+    DetectedMarkers,
+)
+from cameratokeyboard.core.finger_down_detector import FingerDownDetector
+from cameratokeyboard.core.keyboard_layouts import KeyboardLayout
+from cameratokeyboard.types import Fingers
+
+CALIBRATION_HISTORY_SIZE = 100
+KEYBOARD_COORDINATES = 1000
+
+# A case takes the detections and the configuration, does whatever preparation it needs
+# and returns the function to benchmark. The function is called with the number of
+# the call, so it can cycle through the detections.
+BenchmarkCase = Callable[[List[Results], Config], Callable[[int], None]]
+
+
+def split_boxes(
+    results: Results, config: Config
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Splits the confident boxes of the detection results into markers, fingers and
+    thumbs, the way `DetectedFrame` does.
+
+    Returns:
+        Tuple: The marker, finger and thumb boxes (center_x, center_y, width, height).
+    """
+    indices = {v: k for k, v in results.names.items()}
+    classes, confidences, boxes = detections_to_arrays(results)
+
+    def boxes_of(name, min_confidence):
+        return boxes[
+            (classes == indices.get(name, -1)) & (confidences > min_confidence)
+        ]
+
+    return (
+        boxes_of("marker", config.markers_min_confidence),
+        boxes_of("finger", config.fingers_min_confidence),
+        boxes_of("thumb", config.thumbs_min_confidence),
+    )
+
+
+def detected_frame_update(detections: List[Results], config: Config):
+    """
+    `DetectedFrame.update` on a calibrated frame, i.e. the whole post processing.
+    """
+    detected_frame = DetectedFrame(detections[0], config)
+    detected_frame.start_calibration(None)
+
+    for i in range(CALIBRATION_HISTORY_SIZE * 2):
+        if not detected_frame.is_calibration_in_progress:
+            break
+        detected_frame.update(detections[i % len(detections)])
+
+    return lambda i: detected_frame.update(detections[i % len(detections)])
+
+
+def detected_markers_update(detections: List[Results], config: Config):
+    """
+    `DetectedMarkers.update`.
+    """
+    marker_boxes = [split_boxes(results, config)[0] for results in detections]
+    markers = DetectedMarkers(marker_boxes[0])
+
+    return lambda i: markers.update(marker_boxes[i % len(marker_boxes)])
+
+
+def fingers_and_thumbs_update(detections: List[Results], config: Config):
+    """
+    `DetectedFingersAndThumbs.update`.
+    """
+    boxes = [split_boxes(results, config)[1:] for results in detections]
+    fingers_and_thumbs = DetectedFingersAndThumbs(*boxes[0])
+
+    return lambda i: fingers_and_thumbs.update(*boxes[i % len(boxes)])
+
+
+def _calibrated_down_detector(detections: List[Results], config: Config):
+    """
+    A `FingerDownDetector` calibrated with the detections, and the fingers and thumbs
+    of every detection.
+    """
+    fingers_and_thumbs = DetectedFingersAndThumbs([], [])
+    states = []
+    for results in detections:
+        fingers_and_thumbs.update(*split_boxes(results, config)[1:])
+        states.append(copy.deepcopy(fingers_and_thumbs))
+
+    calibration = AdjacentNeighborCalibrationStrategy(
+        history_size=CALIBRATION_HISTORY_SIZE
+    )
+    for i in range(CALIBRATION_HISTORY_SIZE):
+        calibration.append(states[i % len(states)])
+
+    detector = FingerDownDetector(
+        calibration,
+        sensitivity=config.key_down_sensitivity,
+        prediction_frames=config.key_down_prediction_frames,
+    )
+
+    return detector, states
+
+
+def finger_down_detector(detections: List[Results], config: Config):
+    """
+    `FingerDownDetector.is_finger_down`, one finger per call, with calibration.
+    """
+    detector, states = _calibrated_down_detector(detections, config)
+    fingers = Fingers.values()
+
+    return lambda i: detector.is_finger_down(
+        states[i % len(states)], fingers[i % len(fingers)]
+    )
+
+
+def down_fingers(detections: List[Results], config: Config):
+    """
+    `FingerDownDetector.down_fingers`, all of the fingers per call, with calibration.
+    """
+    detector, states = _calibrated_down_detector(detections, config)
+
+    return lambda i: detector.down_fingers(states[i % len(states)])
+
+
+def keyboard_layout_lookup(_: List[Results], config: Config):
+    """
+    `KeyboardLayout.convert_coordinates_to_key` on random coordinates, some of them
+    off the keyboard.
+    """
+    layout = KeyboardLayout(layout=config.keyboard_layout)
+    coordinates = (
+        np.random.default_rng(0).uniform(-0.1, 1.1, (KEYBOARD_COORDINATES, 2)).tolist()
+    )
+
+    return lambda i: layout.convert_coordinates_to_key(
+        *coordinates[i % len(coordinates)]
+    )
+
+
+def keyboard_layout_batch_lookup(_: List[Results], config: Config):
+    """
+    `KeyboardLayout.convert_coordinates_to_keys` on all of the random coordinates of
+    `keyboard_layout_lookup` per call.
+    """
+    layout = KeyboardLayout(layout=config.keyboard_layout)
+    coordinates = np.random.default_rng(0).uniform(-0.1, 1.1, (KEYBOARD_COORDINATES, 2))
+
+    return lambda i: layout.convert_coordinates_to_keys(coordinates)
+
+
+CASES = {
+    "detected_frame_update": detected_frame_update,
+    "detected_markers_update": detected_markers_update,
+    "fingers_and_thumbs_update": fingers_and_thumbs_update,
+    "finger_down_detector": finger_down_detector,
+    "down_fingers": down_fingers,
+    "keyboard_layout_lookup": keyboard_layout_lookup,
+    "keyboard_layout_batch_lookup": keyboard_layout_batch_lookup,
+}
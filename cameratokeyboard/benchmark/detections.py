@@ -0,0 +1,89 @@
+import json
+from typing import List, TextIO
+
+import numpy as np
+from ultralytics.engine.results import Results
+
+NAMES = {0: "finger", 1: "thumb", 2: "marker"}
+FRAME_SHAPE = (720, 1280, 3)
+
+# center_x, center_y, width, height; as detected on an actual keyboard printout.
+MARKER_BOXES = [
+    [959.914, 489.477, 55.909, 28.441],
+    [348.181, 489.098, 54.278, 27.114],
+    [244.469, 619.291, 69.304, 46.269],
+    [1075.732, 619.730, 74.218, 40.922],
+]
+
+
+def load_detections(path: str) -> List[Results]:
+    """
+    Loads the detection results saved by `DetectionRecorder`.
+
+    Args:
+        path (str): The path to the JSON lines file.
+
+    Returns:
+        List[Results]: The detection results, one per frame.
+    """
+    detections = []
+    images = {}
+
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+
+            record = json.loads(line)
+            shape = tuple(record["shape"])
+            if shape not in images:
+                images[shape] = np.zeros(shape, dtype=np.uint8)
+
+            detections.append(
+                Results(
+                    orig_img=images[shape],
+                    path=None,
+                    names={int(k): v for k, v in record["names"].items()},
+                    boxes=np.array(record["boxes"], dtype=np.float32).reshape(-1, 6),
+                )
+            )
+
+    return detections
+
+
+class DetectionRecorder:
+    """
+    Writes the raw detection results to a JSON lines file, so that they can be replayed
+    by the benchmarks without a model or a camera. The frames themselves aren't saved.
+
+    Args:
+        path (str): The path to the JSON lines file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._file: TextIO = None
+
+    def write(self, results: Results) -> None:
+        """
+        Appends the detection results of a frame.
+        """
+        if self._file is None:
+            self._file = open(  # pylint: disable=consider-using-with
+                self._path, "w", encoding="utf-8"
+            )
+
+        record = {
+            "shape": list(results.orig_img.shape),
+            "names": results.names,
+            "boxes": np.asarray(results.boxes.cpu().numpy().data).tolist(),
+        }
+        self._file.write(json.dumps(record) + "\n")
+
+    def close(self) -> None:
+        """
+        Closes the file.
+        """
+        if self._file:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,86 @@
+import difflib
+import time
+
+import numpy as np
+
+from cameratokeyboard.benchmark.typing_simulator import TypingSimulator
+from cameratokeyboard.config import Config
+from cameratokeyboard.core.detected_frame import DetectedFrame
+from cameratokeyboard.logger import get_logger
+from cameratokeyboard.types import LoadTestResult
+
+LOGGER = get_logger()
+
+
+class LoadTest:
+    """
+    Types a text with `TypingSimulator` and feeds the frames to `DetectedFrame.update`
+    as fast as it can, to find out how many frames per second the core can handle and
+    whether the typed keys match the text.
+
+    The frames are generated up front, so only `DetectedFrame.update` is timed. A key
+    counts as typed in the frame it first shows up in `down_keys`.
+
+    Args:
+        config (Config): The application configuration.
+    """
+
+    def __init__(self, config: Config) -> None:
+        self._config = config
+
+    def run(self) -> LoadTestResult:
+        """
+        Runs the load test and logs the results.
+
+        Returns:
+            LoadTestResult: The throughput and the accuracy of the typed text.
+        """
+        simulator = TypingSimulator(
+            text=" ".join(
+                [self._config.load_test_text] * self._config.load_test_repeat
+            ),
+            jitter=self._config.load_test_jitter,
+            miss_rate=self._config.load_test_miss_rate,
+            false_positive_rate=self._config.load_test_false_positive_rate,
+            keyboard_layout=self._config.keyboard_layout,
+        )
+        frames = list(simulator.frames())
+        LOGGER.info("Feeding %d frames to DetectedFrame.update...", len(frames))
+
+        detected_frame = DetectedFrame(frames[0].results, self._config)
+        detected_frame.start_calibration(None)
+
+        typed = []
+        previous_down_keys = set()
+        times = np.empty(len(frames))
+
+        for i, frame in enumerate(frames):
+            started_at = time.perf_counter()
+            detected_frame.update(frame.results)
+            times[i] = time.perf_counter() - started_at
+
+            down_keys = detected_frame.down_keys
+            typed += [key for key in down_keys if key not in previous_down_keys]
+            previous_down_keys = set(down_keys)
+
+        typed_text = "".join(typed)
+        result = LoadTestResult(
+            frames=len(frames),
+            frames_per_second=len(frames) / times.sum(),
+            p99_us=float(np.percentile(times, 99) * 1e6),
+            expected_text=simulator.text,
+            typed_text=typed_text,
+            accuracy=difflib.SequenceMatcher(None, simulator.text, typed_text).ratio(),
+        )
+
+        LOGGER.info(
+            "%d frames at %.0f frames/s (p99: %.1fus per frame)",
+            result.frames,
+            result.frames_per_second,
+            result.p99_us,
+        )
+        LOGGER.info("Expected: %r", result.expected_text)
+        LOGGER.info("Typed:    %r", result.typed_text)
+        LOGGER.info("Accuracy: %.1f%%", result.accuracy * 100)
+
+        return result
@@ -0,0 +1,170 @@
+import gc
+import json
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from cameratokeyboard.benchmark.cases import CASES
+from cameratokeyboard.benchmark.detections import load_detections
+from cameratokeyboard.benchmark.typing_simulator import synthetic_detections
+from cameratokeyboard.config import Config
+from cameratokeyboard.logger import get_logger
+from cameratokeyboard.types import BenchmarkResult
+
+LOGGER = get_logger()
+SYNTHETIC_FRAMES = 300
+WARMUP_CALLS = 100
+MEMORY_CALLS = 200
+
+
+class Benchmark:
+    """
+    Benchmarks the post processing hot path (`DetectedFrame.update` and the modules it
+    relies on) with synthetic or recorded detection results, so no model or camera is
+    needed.
+
+    For each case, reports the time per call and the memory allocated per call. The
+    memory is measured in a separate pass, as tracing the allocations slows everything
+    down. The results can be saved and later used as the baseline to compare against.
+
+    Args:
+        config (Config): The application configuration.
+        cases (Dict[str, Callable], optional): The cases to run. Defaults to all.
+    """
+
+    def __init__(self, config: Config, cases: Dict[str, Callable] = None) -> None:
+        self._config = config
+        self._cases = cases or CASES
+        self._iterations = config.benchmark_iterations
+
+    def run(self) -> List[BenchmarkResult]:
+        """
+        Runs the benchmarks, logs the results and compares them with the baseline.
+
+        Returns:
+            List[BenchmarkResult]: The results of each case.
+        """
+        detections = self._load_detections()
+        LOGGER.info(
+            "Running %d benchmarks, %d calls each, on %d frames of detections...",
+            len(self._cases),
+            self._iterations,
+            len(detections),
+        )
+
+        results = [
+            self._run_case(name, case, detections) for name, case in self._cases.items()
+        ]
+
+        baseline = self._load_baseline()
+        regressions = self._report(results, baseline)
+
+        if self._config.benchmark_output_path:
+            save_results(results, self._config.benchmark_output_path)
+            LOGGER.info("Results saved to %s", self._config.benchmark_output_path)
+
+        if regressions:
+            LOGGER.warning(
+                "Slower than the baseline by more than %d%%: %s",
+                self._config.benchmark_tolerance * 100,
+                ", ".join(regressions),
+            )
+
+        return results
+
+    def _load_detections(self):
+        if self._config.benchmark_detections_path:
+            return load_detections(self._config.benchmark_detections_path)
+
+        return synthetic_detections(SYNTHETIC_FRAMES)
+
+    def _load_baseline(self) -> Dict[str, BenchmarkResult]:
+        if not self._config.benchmark_baseline_path:
+            return {}
+
+        return {r.name: r for r in load_results(self._config.benchmark_baseline_path)}
+
+    def _run_case(self, name: str, case: Callable, detections) -> BenchmarkResult:
+        function = case(detections, self._config)
+
+        for i in range(min(WARMUP_CALLS, self._iterations)):
+            function(i)
+
+        times = np.empty(self._iterations)
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for i in range(self._iterations):
+                started_at = time.perf_counter_ns()
+                function(i)
+                times[i] = time.perf_counter_ns() - started_at
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        memory_calls = min(MEMORY_CALLS, self._iterations)
+        peak_bytes = np.empty(memory_calls)
+        tracemalloc.start()
+        try:
+            for i in range(memory_calls):
+                tracemalloc.reset_peak()
+                before, _ = tracemalloc.get_traced_memory()
+                function(self._iterations + i)
+                _, peak = tracemalloc.get_traced_memory()
+                peak_bytes[i] = peak - before
+        finally:
+            tracemalloc.stop()
+
+        times /= 1000
+        return BenchmarkResult(
+            name=name,
+            calls=self._iterations,
+            mean_us=float(np.mean(times)),
+            median_us=float(np.median(times)),
+            p95_us=float(np.percentile(times, 95)),
+            peak_bytes=float(np.mean(peak_bytes)),
+        )
+
+    def _report(
+        self, results: List[BenchmarkResult], baseline: Dict[str, BenchmarkResult]
+    ) -> List[str]:
+        regressions = []
+
+        for result in results:
+            comparison = ""
+            if result.name in baseline and baseline[result.name].median_us > 0:
+                change = result.median_us / baseline[result.name].median_us - 1
+                comparison = f" ({change:+.1%} vs baseline)"
+                if change > self._config.benchmark_tolerance:
+                    regressions.append(result.name)
+
+            LOGGER.info(
+                "%-28s median: %9.2fus  mean: %9.2fus  p95: %9.2fus  "
+                "allocated: %8.1fKiB/call%s",
+                result.name,
+                result.median_us,
+                result.mean_us,
+                result.p95_us,
+                result.peak_bytes / 1024,
+                comparison,
+            )
+
+        return regressions
+
+
+def save_results(results: List[BenchmarkResult], path: str) -> None:
+    """
+    Saves the benchmark results to a JSON file, to be used as a baseline.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({r.name: r._asdict() for r in results}, file, indent=2)
+
+
+def load_results(path: str) -> List[BenchmarkResult]:
+    """
+    Loads the benchmark results saved by `save_results`.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        return [BenchmarkResult(**r) for r in json.load(file).values()]
@@ -0,0 +1,253 @@
+import itertools
+from typing import Iterator, List
+
+import numpy as np
+from ultralytics.engine.results import Results
+
+from cameratokeyboard.benchmark.detections import FRAME_SHAPE, MARKER_BOXES, NAMES
+from cameratokeyboard.core.detected_objects import DetectedMarkers
+from cameratokeyboard.core.keyboard_layouts import KeyboardLayout
+from cameratokeyboard.core.keyboard_layouts.keyboard_layout import KEY_MAPS
+from cameratokeyboard.types import SimulatedFrame
+
+DEFAULT_TEXT = "the quick brown fox jumps over the lazy dog"
+CLASS_FINGER = 0
+CLASS_THUMB = 1
+CLASS_MARKER = 2
+
+# The keys the fingers rest above, from the left pinky to the right pinky.
+HOME_KEYS = ["a", "s", "d", "f", "j", "k", "l", "semicolon"]
+LEFT_THUMB = 8
+RIGHT_THUMB = 9
+FINGER_SIZE = (58.0, 52.0)
+THUMB_SIZE = (55.0, 100.0)
+THUMBS_SPREAD = 45.0
+HOVER_HEIGHT = 60.0
+
+REST_FRAMES = 120
+MOVE_FRAMES = 4
+PRESS_FRAMES = 3
+HOLD_FRAMES = 4
+FALSE_POSITIVE_CONFIDENCE = (0.3, 0.9)
+
+
+class TypingSimulator:  # pylint: disable=too-many-instance-attributes
+    """
+    Generates the detection results of a pair of hands typing the given text, without
+    a model or a camera.
+
+    The hands first rest above the home row for a while (long enough to calibrate),
+    then each character is typed by the finger closest to its key: the finger moves
+    above the key, goes down, holds the key for a few frames, goes back up and returns
+    to its resting position. Space is typed with the left thumb.
+
+    The detections can be degraded with jitter, missed detections and false positives,
+    all seeded so the same simulator always produces the same frames.
+
+    Args:
+        text (str, optional): The text to type. Only characters that are on the
+            keyboard layout without modifiers are supported.
+        jitter (float, optional): The standard deviation of the noise added to the
+            positions and sizes of the boxes, in pixels.
+        miss_rate (float, optional): The probability of each box to go undetected.
+        false_positive_rate (float, optional): The probability of each frame to have a
+            spurious box of a random class somewhere.
+        seed (int, optional): The seed of the random number generator.
+        keyboard_layout (str, optional): The name of the keyboard layout.
+        rest_frames (int, optional): The number of frames the hands rest before typing.
+
+    Raises:
+        ValueError: If the text contains a character that isn't on the layout.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        text: str = DEFAULT_TEXT,
+        jitter: float = 1.0,
+        miss_rate: float = 0.0,
+        false_positive_rate: float = 0.0,
+        seed: int = 0,
+        keyboard_layout: str = "qwerty",
+        rest_frames: int = REST_FRAMES,
+    ) -> None:
+        self.text = text
+        self._jitter = jitter
+        self._miss_rate = miss_rate
+        self._false_positive_rate = false_positive_rate
+        self._seed = seed
+        self._rest_frames = rest_frames
+
+        self._layout = KeyboardLayout(layout=keyboard_layout)
+        self._key_names = {value: name for name, value in KEY_MAPS.items()}
+        self._to_pixels = np.linalg.inv(
+            DetectedMarkers(MARKER_BOXES).perspective_matrix
+        )
+        self._image = np.zeros(FRAME_SHAPE, dtype=np.uint8)
+        self._rest = self._rest_positions()
+
+        unsupported = sorted({c for c in text if self._key_center(c) is None})
+        if unsupported:
+            raise ValueError(f"Can't type {unsupported} on {keyboard_layout}.")
+
+    def frames(self) -> Iterator[SimulatedFrame]:
+        """
+        Generates the frames, lazily.
+
+        Yields:
+            SimulatedFrame: The detection results of each frame and the character
+                whose key is fully pressed in it, if any.
+        """
+        rng = np.random.default_rng(self._seed)
+
+        for _ in range(self._rest_frames):
+            yield self._frame(self._rest, None, rng)
+
+        for character in self.text:
+            yield from self._keystroke(character, rng)
+
+    def _keystroke(self, character: str, rng: np.random.Generator):
+        finger = self._finger_for(character)
+        rest = self._rest[finger]
+
+        if finger in (LEFT_THUMB, RIGHT_THUMB):
+            above_key = rest
+            on_key = rest + [0, HOVER_HEIGHT]
+        else:
+            on_key = self._to_frame_coordinates(self._key_center(character))
+            above_key = on_key - [0, HOVER_HEIGHT]
+
+        path = [
+            (rest, above_key, MOVE_FRAMES, None),
+            (above_key, on_key, PRESS_FRAMES, None),
+            (on_key, on_key, HOLD_FRAMES, character),
+            (on_key, above_key, PRESS_FRAMES, None),
+            (above_key, rest, MOVE_FRAMES, None),
+        ]
+
+        for start, end, frames, pressed_key in path:
+            for step in range(1, frames + 1):
+                tips = self._rest.copy()
+                tips[finger] = start + (end - start) * step / frames
+                yield self._frame(tips, pressed_key, rng)
+
+    def _frame(
+        self, tips: np.ndarray, pressed_key: str, rng: np.random.Generator
+    ) -> SimulatedFrame:
+        sizes = np.array([FINGER_SIZE] * 8 + [THUMB_SIZE] * 2)
+        hands = np.empty((len(tips), 4))
+        hands[:, 2:] = sizes
+        hands[:, 0] = tips[:, 0]
+        # The fingertip is a third of the way down a finger's box, and halfway down a
+        # thumb's, see `DetectedFingersAndThumbs`.
+        hands[:8, 1] = tips[:8, 1] - sizes[:8, 1] / 3
+        hands[8:, 1] = tips[8:, 1] - sizes[8:, 1] / 2
+
+        xywh = np.concatenate([np.array(MARKER_BOXES), hands])
+        xywh += rng.normal(0, self._jitter, xywh.shape)
+        classes = np.array([CLASS_MARKER] * 4 + [CLASS_FINGER] * 8 + [CLASS_THUMB] * 2)
+        confidences = np.full(len(xywh), 0.9)
+
+        detected = rng.random(len(xywh)) >= self._miss_rate
+        xywh, classes, confidences = (
+            xywh[detected],
+            classes[detected],
+            confidences[detected],
+        )
+
+        if rng.random() < self._false_positive_rate:
+            xywh = np.concatenate(
+                [
+                    xywh,
+                    [
+                        [
+                            rng.uniform(0, FRAME_SHAPE[1]),
+                            rng.uniform(0, FRAME_SHAPE[0]),
+                            *FINGER_SIZE,
+                        ]
+                    ],
+                ]
+            )
+            classes = np.append(classes, rng.choice(list(NAMES)))
+            confidences = np.append(
+                confidences, rng.uniform(*FALSE_POSITIVE_CONFIDENCE)
+            )
+
+        return SimulatedFrame(
+            results=to_results(xywh, classes, confidences, self._image),
+            pressed_key=pressed_key,
+        )
+
+    def _finger_for(self, character: str) -> int:
+        if character == " ":
+            return LEFT_THUMB
+
+        x, _ = self._key_center(character)
+        home_xs = [self._layout.get_key_center(key)[0] for key in HOME_KEYS]
+        hand = range(0, 4) if x < (home_xs[3] + home_xs[4]) / 2 else range(4, 8)
+
+        return min(hand, key=lambda finger: abs(home_xs[finger] - x))
+
+    def _key_center(self, character: str):
+        return self._layout.get_key_center(self._key_names.get(character, character))
+
+    def _rest_positions(self) -> np.ndarray:
+        fingers = [
+            self._to_frame_coordinates(self._layout.get_key_center(key))
+            - [0, HOVER_HEIGHT]
+            for key in HOME_KEYS
+        ]
+        space = self._to_frame_coordinates(self._layout.get_key_center("space"))
+        thumbs = [
+            space + [-THUMBS_SPREAD, -HOVER_HEIGHT],
+            space + [THUMBS_SPREAD, -HOVER_HEIGHT],
+        ]
+
+        return np.array(fingers + thumbs)
+
+    def _to_frame_coordinates(self, keyboard_coordinates) -> np.ndarray:
+        x, y, w = self._to_pixels @ [*keyboard_coordinates, 1]
+        return np.array([x / w, y / w])
+
+
+def synthetic_detections(
+    frames: int, seed: int = 0, jitter: float = 1.0
+) -> List[Results]:
+    """
+    Generates detection results by typing the default text with `TypingSimulator`,
+    over and over until there are enough frames.
+
+    Args:
+        frames (int): The number of frames to generate.
+        seed (int, optional): The seed of the jitter.
+        jitter (float, optional): The standard deviation of the jitter, in pixels.
+
+    Returns:
+        List[Results]: The detection results, one per frame.
+    """
+    simulator = TypingSimulator(jitter=jitter, seed=seed)
+    detections = []
+
+    while len(detections) < frames:
+        detections += [
+            frame.results
+            for frame in itertools.islice(simulator.frames(), frames - len(detections))
+        ]
+
+    return detections
+
+
+def to_results(
+    xywh: np.ndarray, classes: np.ndarray, confidences: np.ndarray, image: np.ndarray
+) -> Results:
+    """
+    Builds ultralytics `Results` out of (center_x, center_y, width, height) boxes.
+    """
+    data = np.empty((len(xywh), 6), dtype=np.float32)
+    data[:, 0] = xywh[:, 0] - xywh[:, 2] / 2
+    data[:, 1] = xywh[:, 1] - xywh[:, 3] / 2
+    data[:, 2] = xywh[:, 0] + xywh[:, 2] / 2
+    data[:, 3] = xywh[:, 1] + xywh[:, 3] / 2
+    data[:, 4] = confidences
+    data[:, 5] = classes
+
+    return Results(orig_img=image, path=None, names=NAMES, boxes=data)
@@ -22,17 +22,54 @@ class Config:
     split_paths: list = ("train", "test", "val")
     split_ratios: list = (0.7, 0.15, 0.15)
     image_extension: str = "jpg"
+    quantization_calibration_images: int = 200
     iou: float = 0.5
 
     resolution: tuple = (1280, 720)
     app_fps: int = 30
+    headless: bool = False
+    headless_output: str = "-"
     video_input_device: int = 0
+    video_input_devices: tuple = ()
+    video_input_path: str = None
+    replay_pacing: str = "realtime"
+    replay_fps: float = 30.0
     processing_device: str = "0"
+    inference_backend: str = "ultralytics"
+    inference_workers: int = 0
+    inference_server: str = None
+    serve_address: str = "127.0.0.1:8765"
+    serve_max_batch_size: int = 8
+    serve_max_wait_ms: float = 5.0
+    motion_threshold: float = 0.0
+    motion_max_skipped_frames: int = 15
+    roi_inference: bool = False
+    roi_image_size: int = 320
+    roi_margin: float = 0.25
+    tracking_interval: int = 0
+    tracking_max_error: float = 1.0
+    pipeline_queue_size: int = 2
+    pipeline_drop_policy: str = "drop_oldest"
+    latency_report_path: str = None
+    profile: str = None
+    record_detections_path: str = None
+
+    benchmark_iterations: int = 2000
+    benchmark_detections_path: str = None
+    benchmark_output_path: str = None
+    benchmark_baseline_path: str = None
+    benchmark_tolerance: float = 0.1
+    load_test_text: str = "the quick brown fox jumps over the lazy dog"
+    load_test_repeat: int = 10
+    load_test_jitter: float = 1.0
+    load_test_miss_rate: float = 0.0
+    load_test_false_positive_rate: float = 0.0
 
     markers_min_confidence: float = 0.3
     fingers_min_confidence: float = 0.3
     thumbs_min_confidence: float = 0.3
     key_down_sensitivity: float = 0.75
+    key_down_prediction_frames: int = 1
 
     keyboard_layout: str = "qwerty"
     repeating_keys_delay: float = 0.5
@@ -1,4 +1,9 @@
-from cameratokeyboard.core.detected_objects import DetectedFingersAndThumbs
+import numpy as np
+
+from cameratokeyboard.core.detected_objects import (
+    FINGERS_BY_INDEX,
+    DetectedFingersAndThumbs,
+)
 from cameratokeyboard.interfaces import ICalibrationStrategy
 from cameratokeyboard.types import Finger, Fingers
 
@@ -12,6 +17,7 @@ class CalibrationStrategy(ICalibrationStrategy):
         self.history_size = history_size
         self._historical_coordinates = []
         self._cache = {}
+        self._calibration_values = None
 
     @property
     def is_calibrated(self) -> bool:
@@ -35,6 +41,7 @@ class CalibrationStrategy(ICalibrationStrategy):
             -self.history_size :
         ]
         self._cache = {}
+        self._calibration_values = None
 
         if len(self._historical_coordinates) >= self.history_size:
             self._calculate_calibration_values()
@@ -52,6 +59,16 @@ class CalibrationStrategy(ICalibrationStrategy):
         """
         return self._cache_get(finger)
 
+    @property
+    def calibration_values(self) -> np.ndarray:
+        if self._calibration_values is None or not self._cache:
+            self._calibration_values = np.array(
+                [self._cache_get(finger) for finger in FINGERS_BY_INDEX],
+                dtype=np.float64,
+            )
+
+        return self._calibration_values
+
     def _cache_get(self, finger: Finger) -> float:
         if not self._cache and len(self._historical_coordinates) >= self.history_size:
             self._calculate_calibration_values()
@@ -77,6 +94,15 @@ class AdjacentNeighborCalibrationStrategy(CalibrationStrategy):
         Fingers.RIGHT_RING: Fingers.RIGHT_MIDDLE,
         Fingers.RIGHT_PINKY: Fingers.RIGHT_RING,
     }
+    # The index of the neighbor of every finger, by `Finger.index`.
+    _neighbor_rows = np.array(
+        [
+            neighbor.index
+            for neighbor in map(
+                _adjacent_neighbors_for_calibration_map.get, FINGERS_BY_INDEX
+            )
+        ]
+    )
 
     def calculate_calibration_value(
         self, fingers_and_thumbs: DetectedFingersAndThumbs, finger: Finger
@@ -90,6 +116,9 @@ class AdjacentNeighborCalibrationStrategy(CalibrationStrategy):
 
         return finger_coordinates.y - neighbor_coordinates.y
 
+    def calculate_calibration_values(self, states: np.ndarray) -> np.ndarray:
+        return states[:, 1] - states[self._neighbor_rows, 1]
+
     def _calculate_calibration_values(self) -> None:
         if not self._historical_coordinates:
             return
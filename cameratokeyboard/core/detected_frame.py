@@ -1,26 +1,57 @@
 from functools import cached_property
-from typing import List
+import threading
+from typing import List, Tuple
 
+import numpy as np
 import ultralytics
 
 from cameratokeyboard.config import Config
 from cameratokeyboard.core.calibration import AdjacentNeighborCalibrationStrategy
 from cameratokeyboard.core.detected_objects import (
+    FINGERS_BY_INDEX,
     DetectedFingersAndThumbs,
     DetectedMarkers,
 )
 from cameratokeyboard.core.finger_down_detector import FingerDownDetector
 from cameratokeyboard.core.keyboard_layouts import KeyboardLayout
-from cameratokeyboard.core.math import finger_to_keyboard_fractional_coordinates
+from cameratokeyboard.core.math import fingers_to_keyboard_fractional_coordinates
 from cameratokeyboard.interfaces import IDetectedFrameData
 from cameratokeyboard.types import Fingers, FrameState, Point, RawImage
+from cameratokeyboard.utils.profiler import get_profiler
+
+PROFILER = get_profiler()
+
+
+def detections_to_arrays(
+    detection_results: ultralytics.engine.results.Results,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Copies the boxes of the detection results to the host in one transfer.
+
+    Args:
+        detection_results (ultralytics.engine.results.Results): The detection results.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The classes, the confidences and the
+            (center_x, center_y, width, height) boxes of the detections.
+    """
+    data = detection_results.boxes.cpu().numpy().data
+    xyxy = data[:, :4]
+    xywh = np.concatenate(
+        ((xyxy[:, :2] + xyxy[:, 2:]) / 2, xyxy[:, 2:] - xyxy[:, :2]), axis=1
+    )
+
+    return data[:, 5], data[:, 4], xywh
 
 
 class DetectedFrame(
     IDetectedFrameData
 ):  # pylint: disable=missing-class-docstring, too-many-instance-attributes
     def __init__(
-        self, detection_results: ultralytics.engine.results.Results, config: Config
+        self,
+        detection_results: ultralytics.engine.results.Results,
+        config: Config,
+        timestamp: float = None,
     ):
         self._detection_results = detection_results
         self._markers_min_confidence = config.markers_min_confidence
@@ -31,10 +62,15 @@ class DetectedFrame(
             history_size=100
         )
         self._down_detector = FingerDownDetector(
-            self.calibration_strategy, sensitivity=config.key_down_sensitivity
+            self.calibration_strategy,
+            sensitivity=config.key_down_sensitivity,
+            prediction_frames=config.key_down_prediction_frames,
         )
 
         self._keyboard_layout = KeyboardLayout(layout=config.keyboard_layout)
+        # Calibration is started from the UI thread while the frames are processed on
+        # another one.
+        self._calibration_lock = threading.Lock()
         self._is_calibrating = False
         self._on_calibration_complete = None
 
@@ -49,7 +85,7 @@ class DetectedFrame(
         self._locked_keys = {}
 
         self._state = FrameState.INITIALIZING
-        self.update(detection_results)
+        self.update(detection_results, timestamp)
 
     @property
     def current_frame(self) -> RawImage:
@@ -110,28 +146,48 @@ class DetectedFrame(
     def calibration_progress(self) -> float:
         return self.calibration_strategy.calibration_progress
 
-    def update(self, detection_results: ultralytics.engine.results.Results):
+    def update(
+        self,
+        detection_results: ultralytics.engine.results.Results,
+        timestamp: float = None,
+    ):
         """
         Updates the detected frame with new detection results.
 
         Args:
             detection_results (ultralytics.engine.results.Results): The new detection results.
+            timestamp (float, optional): When the frame was captured, from
+                `time.monotonic`. Defaults to now.
 
         Returns:
             None
         """
         self._detection_results = detection_results
         self.frame = detection_results.orig_img
-        self._calculate_coordinates()
+        with PROFILER.span("calculate_coordinates", "post_processing"):
+            self._calculate_coordinates(timestamp)
         self._set_state()
         self._handle_calibration()
 
-        self._detect_down_fingers()
-        self._map_down_fingers_to_keys()
+        with PROFILER.span("detect_down_fingers", "post_processing"):
+            self._detect_down_fingers()
+        with PROFILER.span("map_down_fingers_to_keys", "post_processing"):
+            self._map_down_fingers_to_keys()
 
     def start_calibration(self, on_calibration_complete: callable):
-        self._is_calibrating = True
-        self._on_calibration_complete = on_calibration_complete
+        with self._calibration_lock:
+            self._is_calibrating = True
+            self._on_calibration_complete = on_calibration_complete
+
+    def snapshot(self) -> "DetectedFrameSnapshot":
+        """
+        Takes an immutable copy of the current detection data, safe to be read from
+        another thread while this frame keeps on being updated.
+
+        Returns:
+            DetectedFrameSnapshot: The snapshot of the current frame.
+        """
+        return DetectedFrameSnapshot(self)
 
     @cached_property
     def _finger_class_index(self) -> int:
@@ -155,51 +211,50 @@ class DetectedFrame(
         return -1
 
     def _handle_calibration(self):
-        if self.is_calibration_in_progress and self._state == FrameState.VALID:
+        if self._state != FrameState.VALID:
+            return
+
+        with self._calibration_lock:
+            if not self._is_calibrating:
+                return
+
             self.calibration_strategy.append(self._fingers_and_thumbs)
+            if not self.calibration_strategy.is_calibrated:
+                return
 
-            if self.calibration_strategy.is_calibrated:
-                self._is_calibrating = False
+            self._is_calibrating = False
+            on_calibration_complete = self._on_calibration_complete
 
-                if self._on_calibration_complete and callable(
-                    self._on_calibration_complete
-                ):
-                    self._on_calibration_complete()
+        # Called on the thread processing the frames, outside of the lock.
+        if on_calibration_complete and callable(on_calibration_complete):
+            on_calibration_complete()
 
-    def _calculate_coordinates(self):
-        classes = [int(i) for i in self._detection_results.boxes.cls]
-        confidences = [float(i) for i in self._detection_results.boxes.conf]
-        boxes = [[float(y) for y in x] for x in self._detection_results.boxes.xywh]
+    def _calculate_coordinates(self, timestamp: float):
+        classes, confidences, boxes = detections_to_arrays(self._detection_results)
 
-        marker_boxes = [
-            boxes[i]
-            for i, c in enumerate(classes)
-            if c == self._marker_class_index
-            and confidences[i] > self._markers_min_confidence
+        marker_boxes = boxes[
+            (classes == self._marker_class_index)
+            & (confidences > self._markers_min_confidence)
         ]
-        finger_boxes = [
-            boxes[i]
-            for i, c in enumerate(classes)
-            if c == self._finger_class_index
-            and confidences[i] > self._fingers_min_confidence
+        finger_boxes = boxes[
+            (classes == self._finger_class_index)
+            & (confidences > self._fingers_min_confidence)
         ]
-        thumb_boxes = [
-            boxes[i]
-            for i, c in enumerate(classes)
-            if c == self._thumb_class_index
-            and confidences[i] > self._thumbs_min_confidence
+        thumb_boxes = boxes[
+            (classes == self._thumb_class_index)
+            & (confidences > self._thumbs_min_confidence)
         ]
-        self._update_markers(marker_boxes)
+        self._update_markers(marker_boxes, timestamp)
         self._update_fingers_and_thumbs(finger_boxes, thumb_boxes)
 
-    def _update_markers(self, marker_boxes: List[List[float]]):
+    def _update_markers(self, marker_boxes: np.ndarray, timestamp: float):
         if not self._markers:
-            self._markers = DetectedMarkers(marker_boxes)
+            self._markers = DetectedMarkers(marker_boxes, timestamp=timestamp)
         else:
-            self._markers.update(marker_boxes)
+            self._markers.update(marker_boxes, timestamp)
 
     def _update_fingers_and_thumbs(
-        self, finger_boxes: List[List[float]], thumb_boxes: List[List[float]]
+        self, finger_boxes: np.ndarray, thumb_boxes: np.ndarray
     ):
         if not self._fingers_and_thumbs:
             self._fingers_and_thumbs = DetectedFingersAndThumbs(
@@ -230,11 +285,12 @@ class DetectedFrame(
         if self.requires_calibration:
             return
 
-        self._down_fingers = []
-
-        for finger in Fingers.values():
-            if self._down_detector.is_finger_down(self._fingers_and_thumbs, finger):
-                self._down_fingers.append((finger, self._fingers_and_thumbs[finger]))
+        down = self._down_detector.down_fingers(self._fingers_and_thumbs)
+        self._down_fingers = [
+            (finger, self._fingers_and_thumbs[finger])
+            for finger in FINGERS_BY_INDEX
+            if down[finger.index]
+        ]
 
         if len(self._down_fingers) > 4:
             self._down_fingers = []
@@ -244,7 +300,35 @@ class DetectedFrame(
         # module.
         self._down_keys = []
 
-        for finger, coordinates in self._down_fingers:
+        unlocked_fingers = [
+            (finger, coordinates)
+            for finger, coordinates in self._down_fingers
+            if finger not in self._locked_keys
+            and finger not in [Fingers.LEFT_THUMB, Fingers.RIGHT_THUMB]
+        ]
+        # All of the fingers are transformed and looked up on the layout in one go,
+        # with the cached homography.
+        # The keys are looked up with the positions smoothed by the trackers, so
+        # that the jitter of the detections doesn't flip a finger between keys.
+        smoothed = self._fingers_and_thumbs.smoothed_positions
+        keys = {}
+        if unlocked_fingers:
+            keys = dict(
+                zip(
+                    [finger for finger, _ in unlocked_fingers],
+                    self._keyboard_layout.convert_coordinates_to_keys(
+                        fingers_to_keyboard_fractional_coordinates(
+                            self.markers,
+                            [
+                                Point(*smoothed[finger.index])
+                                for finger, _ in unlocked_fingers
+                            ],
+                        )
+                    ),
+                )
+            )
+
+        for finger, _ in self._down_fingers:
             if finger in self._locked_keys:
                 self._down_keys.append(self._locked_keys[finger])
                 continue
@@ -254,12 +338,7 @@ class DetectedFrame(
                 self._locked_keys[finger] = " "
                 continue
 
-            relative_to_keyboard_x, relative_to_keyboard_y = (
-                finger_to_keyboard_fractional_coordinates(self.markers, coordinates)
-            )
-            key = self._keyboard_layout.convert_coordinates_to_key(
-                relative_x=relative_to_keyboard_x, relative_y=relative_to_keyboard_y
-            )
+            key = keys[finger]
 
             # TODO: Implement modifier keys
             if self._keyboard_layout.is_modifier_key(key):
@@ -274,3 +353,84 @@ class DetectedFrame(
             for finger, key in self._locked_keys.items()
             if finger in [x for x, _ in self._down_fingers]
         }
+
+
+class DetectedFrameSnapshot(
+    IDetectedFrameData
+):  # pylint: disable=too-many-instance-attributes
+    """
+    A point in time copy of a `DetectedFrame`. Detection runs on a worker thread and
+    keeps mutating the `DetectedFrame` (and its `Point`s), so consumers on other threads
+    (e.g. the UI) are handed one of these instead.
+
+    Calibration requests are forwarded to the source frame.
+
+    Args:
+        source (DetectedFrame): The frame to take the snapshot of.
+    """
+
+    def __init__(self, source: DetectedFrame):
+        self._source = source
+        self._current_frame = source.current_frame
+        self._state = source.state
+        self._marker_coordinates = self._copy_points(source.marker_coordinates)
+        self._finger_coordinates = self._copy_points(source.finger_coordinates)
+        self._thumb_coordinates = self._copy_points(source.thumb_coordinates)
+        self._down_finger_coordinates = self._copy_points(
+            source.down_finger_coordinates
+        )
+        self._down_keys = list(source.down_keys)
+        self._requires_calibration = source.requires_calibration
+        self._is_calibration_in_progress = source.is_calibration_in_progress
+        self._calibration_progress = source.calibration_progress
+
+    @property
+    def current_frame(self) -> RawImage:
+        return self._current_frame
+
+    @property
+    def state(self) -> FrameState:
+        return self._state
+
+    @property
+    def marker_coordinates(self) -> List[Point]:
+        return self._marker_coordinates
+
+    @property
+    def finger_coordinates(self) -> List[Point]:
+        return self._finger_coordinates
+
+    @property
+    def thumb_coordinates(self) -> List[Point]:
+        return self._thumb_coordinates
+
+    @property
+    def down_finger_coordinates(self) -> List[Point]:
+        return self._down_finger_coordinates
+
+    @property
+    def down_keys(self) -> List[str]:
+        """
+        Returns the keys that were down when the snapshot was taken.
+        """
+        return self._down_keys
+
+    @property
+    def requires_calibration(self) -> bool:
+        return self._requires_calibration
+
+    @property
+    def is_calibration_in_progress(self) -> bool:
+        return self._is_calibration_in_progress
+
+    @property
+    def calibration_progress(self) -> float:
+        return self._calibration_progress
+
+    def start_calibration(self, on_calibration_complete: callable) -> None:
+        self._is_calibration_in_progress = True
+        self._source.start_calibration(on_calibration_complete)
+
+    @staticmethod
+    def _copy_points(points: List[Point]) -> List[Point]:
+        return [Point(p.x, p.y) if p is not None else None for p in points or []]
@@ -1,11 +1,30 @@
-from typing import List
+from typing import List, Union
 
+import numpy as np
 
+from cameratokeyboard.core.kalman_tracker import KalmanTracker
 from cameratokeyboard.core.math import (
     calculate_box_width_without_perspective_distortion,
+    keyboard_perspective_matrix,
 )
 from cameratokeyboard.types import Point, Finger, Fingers
 
+# How far (in pixels) any of the markers can drift before the keyboard homography is
+# recalculated. The detection jitters by a pixel or two even when nothing moves.
+HOMOGRAPHY_DRIFT_TOLERANCE = 2.0
+THUMBS = (Fingers.LEFT_THUMB, Fingers.RIGHT_THUMB)
+# The indices of the fingers and of the thumbs, from left to right.
+FINGER_ROWS = np.array([f.index for f in Fingers.values() if f not in THUMBS])
+THUMB_ROWS = np.array([f.index for f in THUMBS])
+FINGERS_BY_INDEX = sorted(Fingers.values(), key=lambda finger: finger.index)
+
+Boxes = Union[np.ndarray, List[List[float]]]
+
+
+def _sorted_by_x(boxes: Boxes) -> np.ndarray:
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    return boxes[np.argsort(boxes[:, 0], kind="stable")]
+
 
 class DetectedMarkers:  # pylint: disable=too-many-instance-attributes
     """
@@ -13,9 +32,26 @@ class DetectedMarkers:  # pylint: disable=too-many-instance-attributes
     NOTE: This class assumes that the yaw and roll angles of the camera are as close
           to 0 as possible. Check out `assets/keyboard.jpg` and the marker placements
           to better understand the calculations.
+
+    Args:
+        boxes (Boxes): The marker bounding boxes (center_x, center_y, width, height),
+            as an (n, 4) array or a list of lists.
+        drift_tolerance (float, optional): How far the markers can move, in pixels,
+            before the cached perspective matrix is recalculated.
+        timestamp (float, optional): When the frame was captured, from
+            `time.monotonic`. Defaults to now.
     """
 
-    def __init__(self, boxes: List[List[float]]):
+    def __init__(
+        self,
+        boxes: Boxes,
+        drift_tolerance: float = HOMOGRAPHY_DRIFT_TOLERANCE,
+        timestamp: float = None,
+    ):
+        self._drift_tolerance = drift_tolerance
+        self._perspective_matrix = None
+        self._perspective_matrix_markers = None
+
         self._bl = None
         self._tl = None
         self._tr = None
@@ -30,7 +66,7 @@ class DetectedMarkers:  # pylint: disable=too-many-instance-attributes
         self._br_width = None
         self._br_height = None
 
-        self.update(boxes)
+        self.update(boxes, timestamp)
 
     def __repr__(self) -> str:
         return f"Markers(tl={self._tl}, bl={self._bl}, tr={self._tr}, br={self._br})"
@@ -101,31 +137,71 @@ class DetectedMarkers:  # pylint: disable=too-many-instance-attributes
         """
         return not self.any_markers_missing
 
-    def update(self, boxes: List[List[float]]):
+    @property
+    def perspective_matrix(self) -> np.ndarray:
+        """
+        The homography that maps the frame coordinates to fractional keyboard
+        coordinates. It's cached and only recalculated when any of the markers drift
+        further than the tolerance from where they were when it was calculated.
+        None if any of the markers are missing.
+        """
+        if self.any_markers_missing:
+            return None
+
+        markers = np.array([m.xy for m in self.all_marker_coordinates])
+
+        if self._perspective_matrix is None or np.any(
+            np.linalg.norm(markers - self._perspective_matrix_markers, axis=1)
+            > self._drift_tolerance
+        ):
+            self._perspective_matrix = keyboard_perspective_matrix(self)
+            self._perspective_matrix_markers = markers
+
+        return self._perspective_matrix
+
+    def update(self, boxes: Boxes, timestamp: float = None):
         """
         Updates the coordinates of the markers.
 
         Args:
-            boxes (List[List[float]]): A list of bounding box coordinates for the
-                detected objects.
+            boxes (Boxes): The (center_x, center_y, width, height) bounding boxes of
+                the detected markers.
+            timestamp (float, optional): When the frame was captured, from
+                `time.monotonic`. Defaults to now.
 
         Returns:
             None
         """
-        self.raw_boxes = sorted(boxes, key=lambda box: box[0])
-        self._identify_markers()
+        self.raw_boxes = _sorted_by_x(boxes)
+        self._identify_markers(timestamp)
 
-    def _identify_markers(self) -> None:
-        if not self.raw_boxes or len(self.raw_boxes) < 4:
+    def _identify_markers(self, timestamp: float = None) -> None:
+        if len(self.raw_boxes) < 4:
             return
 
         # The boxes are already sorted by x and the assumption is that yaw is 0.
 
         boxes = self.raw_boxes
-        self._bl = self._bl.update(*boxes[0][:2]) if self._bl else Point(*boxes[0][:2])
-        self._tl = self._tl.update(*boxes[1][:2]) if self._tl else Point(*boxes[1][:2])
-        self._tr = self._tr.update(*boxes[2][:2]) if self._tr else Point(*boxes[2][:2])
-        self._br = self._br.update(*boxes[3][:2]) if self._br else Point(*boxes[3][:2])
+        self._bl = (
+            self._bl.update(*boxes[0][:2], timestamp)
+            if self._bl
+            else Point(*boxes[0][:2], timestamp)
+        )
+        self._tl = (
+            self._tl.update(*boxes[1][:2], timestamp)
+            if self._tl
+            else Point(*boxes[1][:2], timestamp)
+        )
+        self._tr = (
+            self._tr.update(*boxes[2][:2], timestamp)
+            if self._tr
+            else Point(*boxes[2][:2], timestamp)
+        )
+        self._br = (
+            self._br.update(*boxes[3][:2], timestamp)
+            if self._br
+            else Point(*boxes[3][:2], timestamp)
+        )
 
         self._bl_width = calculate_box_width_without_perspective_distortion(
             boxes[0], self._tl.xy
@@ -145,38 +221,146 @@ class DetectedMarkers:  # pylint: disable=too-many-instance-attributes
         self._br_height = boxes[3][3] * 0.7
 
 
-class DetectedFingersAndThumbs:
+class FingerPoint(Point):
     """
-    THIS CLASS WILL BE REPLACED SOON.
+    A `Point` that is a view of the current position of a finger in a
+    `DetectedFingersAndThumbs`, so it follows the finger as it moves. It has no
+    history of its own, the motion of the finger is estimated by its tracker, see
+    `DetectedFingersAndThumbs.tracker`.
+
+    Args:
+        store (DetectedFingersAndThumbs): The coordinates of the fingers.
+        finger (Finger): The finger to view.
+    """
+
+    __slots__ = ["_store", "_finger"]
+
+    def __init__(
+        self, store: "DetectedFingersAndThumbs", finger: Finger
+    ):  # pylint: disable=super-init-not-called
+        self._store = store
+        self._finger = finger
+
+    @property
+    def x(self):
+        return float(self._store.positions[self._finger.index, 0])
+
+    @property
+    def y(self):
+        return float(self._store.positions[self._finger.index, 1])
+
+    def update(
+        self, x, y, timestamp=None
+    ) -> "Point":  # pylint: disable=unused-argument
+        self._store.move(self._finger, x, y)
+        return self
+
+    def velocity_y(self, window: float) -> float:
+        raise NotImplementedError(
+            "A finger has no history, use the velocity of its tracker instead."
+        )
 
+
+class DetectedFingersAndThumbs:  # pylint: disable=too-many-instance-attributes
+    """
     Represents the coordinates of the detected fingers and thumbs.
+
+    The coordinates are kept in arrays indexed by `Finger.index`: the current position
+    of each finger, whether it is detected and the motion estimated by its tracker. So
+    the checks across all of the fingers are array operations. Indexing by a `Finger`
+    returns a `FingerPoint` view of its current position, or None if it isn't
+    detected.
+
+    Each finger and thumb is also followed by a `KalmanTracker`, which smooths out the
+    jitter of the detections and estimates how fast they move.
+
+    Args:
+        finger_boxes (Boxes): The bounding boxes of the detected fingers.
+        thumb_boxes (Boxes): The bounding boxes of the detected thumbs.
     """
 
-    def __init__(self, finger_boxes: List[List[float]], thumb_boxes: List[List[float]]):
-        self._coordinates = {}
+    def __init__(self, finger_boxes: Boxes, thumb_boxes: Boxes):
+        count = len(FINGERS_BY_INDEX)
+        self._positions = np.zeros((count, 2), dtype=np.float32)
+        # The (velocity_y, acceleration_y) of the tracker of every finger.
+        self._motion = np.zeros((count, 2), dtype=np.float64)
+        # The (x, y) of the tracker of every finger.
+        self._smoothed = np.zeros((count, 2), dtype=np.float64)
+        self._valid = np.zeros(count, dtype=bool)
+        self._views = [FingerPoint(self, finger) for finger in FINGERS_BY_INDEX]
+        self._trackers = {}
         self.update(finger_boxes, thumb_boxes)
 
     def __getitem__(self, key: Finger):
-        return self._coordinates.get(key.name)
+        return self._views[key.index] if self._valid[key.index] else None
 
     def __setitem__(self, key: Finger, value: Point):
-        self._coordinates[key.name] = value
+        self._valid[key.index] = False
+        if value is not None:
+            self.move(key, value.x, value.y)
+
+    def tracker(self, finger: Finger) -> KalmanTracker:
+        """
+        Returns the tracker of the given finger, or None if it hasn't been detected.
+        """
+        return self._trackers.get(finger.name)
 
-    def update(self, finger_boxes: List[List[float]], thumb_boxes: List[List[float]]):
+    def update(self, finger_boxes: Boxes, thumb_boxes: Boxes):
         """
         Updates the coordinates of the fingers and carries out the required calculations.
 
         Args:
-            finger_boxes (List[List[float]]): A list of finger bounding boxes, where each
-                box is represented as a list of four float values [x_min, y_min, x_max, y_max].
-            thumb_boxes (List[List[float]]): A list of thumb bounding boxes, where each
-                box is represented as a list of four float values [x_min, y_min, x_max, y_max].
+            finger_boxes (Boxes): The (center_x, center_y, width, height) bounding boxes
+                of the detected fingers, as an (n, 4) array or a list of lists.
+            thumb_boxes (Boxes): The bounding boxes of the detected thumbs, likewise.
         """
-        self.raw_finger_boxes = sorted(finger_boxes, key=lambda box: box[0])
-        self.raw_thumb_boxes = sorted(thumb_boxes, key=lambda box: box[0])
+        self.raw_finger_boxes = _sorted_by_x(finger_boxes)
+        self.raw_thumb_boxes = _sorted_by_x(thumb_boxes)
         self._identify_fingers()
         self._identify_thumbs()
 
+    def move(self, finger: Finger, x: float, y: float) -> None:
+        """
+        Moves a finger to the given coordinates, which also marks it as detected.
+        """
+        self._write(np.array([finger.index]), np.array([[x, y]]))
+
+    @property
+    def positions(self) -> np.ndarray:
+        """
+        The current (x, y) of every finger, as a (10, 2) array indexed by
+        `Finger.index`. The rows of the fingers that aren't detected are stale, see
+        `detected`.
+        """
+        return self._positions
+
+    @property
+    def smoothed_positions(self) -> np.ndarray:
+        """
+        The (x, y) of every finger smoothed by its tracker, as a (10, 2) array indexed
+        by `Finger.index`. Like `positions`, the rows of the fingers that aren't
+        detected are stale.
+        """
+        return self._smoothed
+
+    @property
+    def detected(self) -> np.ndarray:
+        """
+        Whether every finger is detected, as a boolean array indexed by `Finger.index`.
+        """
+        return self._valid
+
+    @property
+    def states(self) -> np.ndarray:
+        """
+        The (x, y, velocity_y, acceleration_y) of every finger, as a (10, 4) array
+        indexed by `Finger.index`, with the velocity and acceleration of its tracker in
+        pixels per frame. The rows of the fingers that aren't detected are NaN.
+        """
+        states = np.hstack((self._positions, self._motion))
+        states[~self._valid] = np.nan
+        return states
+
     @property
     def finger_coordinates(self) -> List[Point]:
         """
@@ -186,21 +370,7 @@ class DetectedFingersAndThumbs:
             List[Point]: A list of Point objects representing the coordinates of the
                 detected fingers.
         """
-        retval = [
-            x
-            for x in [
-                self[Fingers.LEFT_PINKY],
-                self[Fingers.LEFT_RING],
-                self[Fingers.LEFT_MIDDLE],
-                self[Fingers.LEFT_INDEX],
-                self[Fingers.RIGHT_INDEX],
-                self[Fingers.RIGHT_MIDDLE],
-                self[Fingers.RIGHT_RING],
-                self[Fingers.RIGHT_PINKY],
-            ]
-            if x is not None
-        ]
-        return retval
+        return [self._views[row] for row in FINGER_ROWS if self._valid[row]]
 
     @property
     def thumb_coordinates(self) -> List[Point]:
@@ -210,18 +380,14 @@ class DetectedFingersAndThumbs:
         Returns:
             A list of Point objects representing the coordinates of the detected thumbs.
         """
-        return [
-            x
-            for x in [self[Fingers.LEFT_THUMB], self[Fingers.RIGHT_THUMB]]
-            if x is not None
-        ]
+        return [self._views[row] for row in THUMB_ROWS if self._valid[row]]
 
     @property
     def average_finger_width(self) -> float:
         """
         The average width of the detected fingers
         """
-        return sum(box[2] for box in self.raw_finger_boxes) / len(self.raw_finger_boxes)
+        return float(self.raw_finger_boxes[:, 2].mean())
 
     @property
     def average_finger_height(self) -> float:
@@ -230,39 +396,51 @@ class DetectedFingersAndThumbs:
         """
         if len(self.raw_finger_boxes) == 0:
             return 0
-        return sum(box[3] for box in self.raw_finger_boxes) / len(self.raw_finger_boxes)
+        return float(self.raw_finger_boxes[:, 3].mean())
 
     def _identify_fingers(self) -> None:
-        for finger in Fingers.values():
-            finger_index = finger.index if finger.index < 5 else finger.index - 2
-
-            if len(self.raw_finger_boxes) <= finger_index:
-                continue
-
-            new_coordinates = Point(
-                self.raw_finger_boxes[finger_index][0],
-                self.raw_finger_boxes[finger_index][1]
-                + self.raw_finger_boxes[finger_index][3] / 3,
-            )
-
-            current_coordinates = self[finger]
-            self[finger] = (
-                current_coordinates.pupdate(new_coordinates)
-                if current_coordinates
-                else new_coordinates
-            )
+        # The boxes are sorted by x, so they are the fingers from left to right. The
+        # fingers that aren't detected keep their last position.
+        boxes = self.raw_finger_boxes[: len(FINGER_ROWS)]
+        rows = FINGER_ROWS[: len(boxes)]
+        xy = np.stack((boxes[:, 0], boxes[:, 1] + boxes[:, 3] / 3), axis=1)
+        self._write(rows, xy)
+        self._track(rows, xy)
 
     def _identify_thumbs(self) -> None:
-        if len(self.raw_thumb_boxes) > 0:
-            self[Fingers.LEFT_THUMB] = Point(
-                self.raw_thumb_boxes[0][0],
-                self.raw_thumb_boxes[0][1] + self.raw_thumb_boxes[0][3] / 2,
-            )
-            self[Fingers.RIGHT_THUMB] = (
-                Point(
-                    self.raw_thumb_boxes[1][0],
-                    self.raw_thumb_boxes[1][1] + self.raw_thumb_boxes[1][3] / 2,
-                )
-                if len(self.raw_thumb_boxes) > 1
-                else None
+        # Like the fingers, the thumbs keep their last positions when none of them is
+        # detected. A single detected thumb is the left one, and the right one is lost.
+        if len(self.raw_thumb_boxes) == 0:
+            return
+
+        boxes = self.raw_thumb_boxes[: len(THUMB_ROWS)]
+        rows = THUMB_ROWS[: len(boxes)]
+        xy = np.stack((boxes[:, 0], boxes[:, 1] + boxes[:, 3] / 2), axis=1)
+        self._write(rows, xy)
+        self._track(rows, xy)
+
+        missing = THUMB_ROWS[len(boxes) :]
+        self._valid[missing] = False
+        for row in missing:
+            self._trackers.pop(FINGERS_BY_INDEX[row].name, None)
+
+    def _write(self, rows: np.ndarray, xy: np.ndarray) -> None:
+        self._positions[rows] = xy
+        self._valid[rows] = True
+
+    def _track(self, rows: np.ndarray, xy: np.ndarray) -> None:
+        states = []
+        for row, (x, y) in zip(rows, xy.tolist()):
+            name = FINGERS_BY_INDEX[row].name
+            tracker = self._trackers.get(name)
+            if tracker:
+                tracker.update(x, y)
+            else:
+                tracker = self._trackers[name] = KalmanTracker(x, y)
+            states.append(
+                (*tracker.position, tracker.velocity[1], tracker.acceleration_y)
             )
+        if states:
+            states = np.array(states)
+            self._smoothed[rows] = states[:, :2]
+            self._motion[rows] = states[:, 2:]
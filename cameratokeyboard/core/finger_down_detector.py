@@ -1,17 +1,38 @@
+import numpy as np
+
 from cameratokeyboard.core.detected_objects import DetectedFingersAndThumbs
-from cameratokeyboard.types import Finger, Fingers
+from cameratokeyboard.types import Finger
 from cameratokeyboard.interfaces import ICalibrationStrategy
 
+# A finger moving down faster than this, in pixels per frame, hasn't landed on a key yet.
+MAX_DOWN_VELOCITY = 5.0
+
 
 class FingerDownDetector:
     """
     Detects whether a finger is down or not based on the given finger coordinates and the
     calibration values.
+
+    A finger that is still moving down isn't down yet, unless it is slowing down enough
+    to come to rest within `prediction_frames`: then it is considered down right away,
+    instead of a frame or two later, when its velocity catches up.
+
+    Args:
+        calibration (ICalibrationStrategy): The calibration of the fingers.
+        sensitivity (float): The sensitivity for the key down action, from 0 to 1.
+        prediction_frames (int, optional): How many frames ahead the contact of a
+            finger with a key can be predicted. 0 disables the prediction.
     """
 
-    def __init__(self, calibration: ICalibrationStrategy, sensitivity: float) -> None:
+    def __init__(
+        self,
+        calibration: ICalibrationStrategy,
+        sensitivity: float,
+        prediction_frames: int = 0,
+    ) -> None:
         self._calibration = calibration
         self._sensitivity = sensitivity
+        self._prediction_frames = prediction_frames
 
     def is_finger_down(
         self, fingers_and_thumbs: DetectedFingersAndThumbs, finger: Finger
@@ -27,32 +48,74 @@ class FingerDownDetector:
         Returns:
             bool: True if the finger is considered to be down, False otherwise.
         """
-        coordinates = fingers_and_thumbs[finger]
-        if not coordinates:
-            return False
+        return bool(self.down_fingers(fingers_and_thumbs)[finger.index])
+
+    def down_fingers(self, fingers_and_thumbs: DetectedFingersAndThumbs) -> np.ndarray:
+        """
+        Determines which fingers are considered to be down, all at once.
 
-        velocity_y = coordinates.velocity_y(window=3)
-        if velocity_y > 5.0:  # TODO: Unhardcode this value
-            return False
+        Args:
+            fingers_and_thumbs (FingersAndThumbs): The fingers and thumbs coordinates.
 
-        calibration_value = self._calibration.get_calibration_for(finger)
-        current_value = self._calibration.calculate_calibration_value(
-            fingers_and_thumbs, finger
+        Returns:
+            np.ndarray: Whether every finger is down, indexed by `Finger.index`.
+        """
+        return self.down_mask(
+            fingers_and_thumbs.states,
+            self._calibration.calibration_values,
+            fingers_and_thumbs.average_finger_height,
         )
 
-        if current_value is None or calibration_value is None:
-            return False
+    def down_mask(
+        self, states: np.ndarray, calibration_values: np.ndarray, finger_height: float
+    ) -> np.ndarray:
+        """
+        Determines which fingers are considered to be down from their coordinates and
+        velocities and the calibration values, in one pass over all of them.
+
+        Args:
+            states (np.ndarray): The (x, y, velocity_y, acceleration_y) of every finger,
+                indexed by `Finger.index`, with NaN rows for the fingers that aren't
+                detected. See `DetectedFingersAndThumbs.states`.
+            calibration_values (np.ndarray): The calibration value of every finger,
+                indexed by `Finger.index`. NaN for the ones without.
+            finger_height (float): The average height of the fingers.
+
+        Returns:
+            np.ndarray: Whether every finger is down, indexed by `Finger.index`.
+        """
+        y = states[:, 1]
+        velocity_y = states[:, 2]
+        detected = ~np.isnan(y)
 
-        delta = current_value - calibration_value
+        moving_down = (velocity_y > MAX_DOWN_VELOCITY) & ~self._lands_soon(states)
 
-        threshold = (
-            fingers_and_thumbs.average_finger_height * 2 * (1 - self._sensitivity)
-        )
-        other_coordinates = [
-            fingers_and_thumbs[f] for f in Fingers.values() if f != finger
-        ]
-        lower_than_all_other = all(
-            c.y < coordinates.y for c in other_coordinates if c is not None
+        delta = self._calibration.calculate_calibration_values(states)
+        delta = delta - calibration_values
+        threshold = finger_height * 2 * (1 - self._sensitivity)
+
+        return detected & ~moving_down & (delta > threshold) & _is_lowest(y)
+
+    def _lands_soon(self, states: np.ndarray) -> np.ndarray:
+        if self._prediction_frames == 0:
+            return np.zeros(len(states), dtype=bool)
+
+        deceleration = -states[:, 3]
+        slowing_down = deceleration > 0
+        frames_to_land = (states[:, 2] - MAX_DOWN_VELOCITY) / np.where(
+            slowing_down, deceleration, 1.0
         )
+        return slowing_down & (frames_to_land <= self._prediction_frames)
+
+
+def _is_lowest(y: np.ndarray) -> np.ndarray:
+    """
+    Whether every finger is lower in the frame than all of the other detected fingers
+    and thumbs. None is on a tie, or if none is detected (NaN).
+    """
+    y = np.where(np.isnan(y), -np.inf, y)
+    lowest = np.argmax(y)
+    is_lowest = np.zeros(len(y), dtype=bool)
+    is_lowest[lowest] = y[lowest] > -np.inf and np.count_nonzero(y == y[lowest]) == 1
 
-        return lower_than_all_other and delta > threshold
+    return is_lowest
@@ -0,0 +1,130 @@
+from typing import Tuple
+
+# In pixels per frame squared and pixels squared. The fingers stop abruptly when they
+# land on a key, so the filter has to follow the detections closely to notice it
+# within a frame, which leaves most of the jitter in the position.
+DEFAULT_PROCESS_NOISE = 30.0
+DEFAULT_MEASUREMENT_NOISE = 10.0
+INITIAL_VELOCITY_VARIANCE = 100.0
+
+
+class _AxisFilter:  # pylint: disable=too-many-instance-attributes
+    """
+    A constant velocity Kalman filter along one axis. The state is the position and
+    the velocity, and the time step is one frame, so the matrices are small enough to
+    be written out by hand.
+    """
+
+    __slots__ = [
+        "position",
+        "velocity",
+        "previous_velocity",
+        "_p00",
+        "_p01",
+        "_p11",
+        "_process_noise",
+        "_measurement_noise",
+    ]
+
+    def __init__(
+        self, position: float, process_noise: float, measurement_noise: float
+    ) -> None:
+        self.position = float(position)
+        self.velocity = 0.0
+        self.previous_velocity = 0.0
+        self._p00 = measurement_noise
+        self._p01 = 0.0
+        self._p11 = INITIAL_VELOCITY_VARIANCE
+        self._process_noise = process_noise
+        self._measurement_noise = measurement_noise
+
+    def update(self, measurement: float) -> None:
+        """
+        Moves the state one frame forward and corrects it with the measurement.
+        """
+        # Predict, with the acceleration as white noise: Q = q * [[1/4, 1/2], [1/2, 1]]
+        q = self._process_noise
+        position = self.position + self.velocity
+        p00 = self._p00 + 2 * self._p01 + self._p11 + q / 4
+        p01 = self._p01 + self._p11 + q / 2
+        p11 = self._p11 + q
+
+        # Correct
+        gain_position = p00 / (p00 + self._measurement_noise)
+        gain_velocity = p01 / (p00 + self._measurement_noise)
+        innovation = measurement - position
+
+        self.previous_velocity = self.velocity
+        self.position = position + gain_position * innovation
+        self.velocity = self.velocity + gain_velocity * innovation
+        self._p00 = (1 - gain_position) * p00
+        self._p01 = (1 - gain_position) * p01
+        self._p11 = p11 - gain_velocity * p01
+
+
+class KalmanTracker:
+    """
+    Tracks a point with a constant velocity Kalman filter per axis, to smooth out the
+    jitter of the detections and estimate the velocity of the point.
+
+    Args:
+        x (float): The initial X coordinate.
+        y (float): The initial Y coordinate.
+        process_noise (float, optional): The variance of the acceleration, in pixels
+            per frame squared.
+        measurement_noise (float, optional): The variance of the detected coordinates,
+            in pixels squared.
+    """
+
+    __slots__ = ["_x", "_y"]
+
+    def __init__(
+        self,
+        x: float,
+        y: float,
+        process_noise: float = DEFAULT_PROCESS_NOISE,
+        measurement_noise: float = DEFAULT_MEASUREMENT_NOISE,
+    ) -> None:
+        self._x = _AxisFilter(x, process_noise, measurement_noise)
+        self._y = _AxisFilter(y, process_noise, measurement_noise)
+
+    def update(self, x: float, y: float) -> "KalmanTracker":
+        """
+        Moves the state one frame forward and corrects it with the detected
+        coordinates.
+        """
+        self._x.update(x)
+        self._y.update(y)
+
+        return self
+
+    @property
+    def position(self) -> Tuple[float, float]:
+        """
+        The smoothed (x, y) coordinates.
+        """
+        return self._x.position, self._y.position
+
+    @property
+    def velocity(self) -> Tuple[float, float]:
+        """
+        The (x, y) velocity, in pixels per frame.
+        """
+        return self._x.velocity, self._y.velocity
+
+    @property
+    def acceleration_y(self) -> float:
+        """
+        The change of the Y velocity in the last frame, in pixels per frame squared.
+        """
+        return self._y.velocity - self._y.previous_velocity
+
+    def predict(self, frames: float) -> Tuple[float, float]:
+        """
+        Predicts the (x, y) coordinates the given number of frames ahead, assuming
+        a constant velocity.
+        """
+        return (
+            self._x.position + self._x.velocity * frames,
+            self._y.position + self._y.velocity * frames,
+        )
@@ -1,11 +1,13 @@
 # pylint: disable=too-many-arguments
 
+import bisect
 import os
 import pathlib
+from typing import List
 
+import numpy as np
 import yaml
 
-
 KEY_MAPS = {
     "backtick": "`",
     "one": "1",
@@ -78,6 +80,13 @@ class Key:
             and self._y <= y <= self._y + self._height
         )
 
+    @property
+    def center(self) -> tuple:
+        """
+        The (x, y) coordinates of the center of the key.
+        """
+        return (self._x + self._width / 2, self._y + self._height / 2)
+
 
 class KeyboardLayout:
     """
@@ -93,12 +102,18 @@ class KeyboardLayout:
 
     Methods:
         convert_coordinates_to_key: Converts the given coordinates to a key on the keyboard layout.
+        convert_coordinates_to_keys: Converts many coordinates to keys at once.
     """
 
     def __init__(self, layout: str = "qwerty") -> None:
         self._layout_name = layout
         self._layout = None
         self._flat_layout = None
+        # The keys are looked up by row first, with a bisection of the tops of the
+        # rows, and then by a bisection of the boundaries of the keys in the row.
+        self._row_tops = None
+        self._row_boundaries = None
+        self._row_keys = None
 
         self._load_layout()
         self._calculate_key_coordinates()
@@ -123,15 +138,83 @@ class KeyboardLayout:
             relative_y (float): A Y coordinate (0.0 - 1.0) relative to the top markers
 
         Returns:
-            str: The key on the keyboard layout.
+            str: The key on the keyboard layout, or an empty string if there is none.
         """
+        last_row = bisect.bisect_right(self._row_tops, relative_y)
+
+        # On the boundary between two rows, the key can be in either of them.
+        for row in range(max(last_row - 2, 0), last_row):
+            if not relative_y <= self._row_tops[row] + self._layout["key_height"]:
+                continue
 
-        for key in self._flat_layout:
-            if key.contains(relative_x, relative_y):
-                return key.name
+            boundaries = self._row_boundaries[row]
+            index = bisect.bisect_left(boundaries, relative_x)
+            if relative_x == boundaries[0]:
+                index = 1
+            if 0 < index < len(boundaries):
+                return self._flat_layout[self._row_keys[row][index - 1]].name
 
         return ""
 
+    def convert_coordinates_to_keys(self, coordinates: np.ndarray) -> List[str]:
+        """
+        Converts many coordinates to keys on the keyboard layout at once, like
+        `convert_coordinates_to_key`.
+
+        Args:
+            coordinates (np.ndarray): The (x, y) coordinates (0.0 - 1.0), as an (n, 2)
+                array or a list of pairs.
+
+        Returns:
+            List[str]: The keys on the keyboard layout, an empty string for the
+                coordinates that aren't on a key.
+        """
+        coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        x, y = coordinates[:, 0], coordinates[:, 1]
+        tops = np.array(self._row_tops)
+        last_row = np.searchsorted(tops, y, side="right")
+        keys = np.full(len(coordinates), -1)
+
+        for offset in (2, 1):
+            row = last_row - offset
+            candidates = (
+                (keys < 0)
+                & (row >= 0)
+                & (y <= tops[np.maximum(row, 0)] + self._layout["key_height"])
+            )
+            for r in np.unique(row[candidates]):
+                in_row = candidates & (row == r)
+                keys[in_row] = self._keys_in_row(r, x[in_row])
+
+        return [self._flat_layout[k].name if k >= 0 else "" for k in keys.tolist()]
+
+    def _keys_in_row(self, row: int, x: np.ndarray) -> np.ndarray:
+        boundaries = np.array(self._row_boundaries[row])
+        index = np.searchsorted(boundaries, x, side="left")
+        index[x == boundaries[0]] = 1
+        found = (index > 0) & (index < len(boundaries))
+        keys = np.array(self._row_keys[row])[np.where(found, index, 1) - 1]
+
+        return np.where(found, keys, -1)
+
+    def get_key_center(self, key: str) -> tuple:
+        """
+        Finds where the given key is on the keyboard layout, i.e. the reverse of
+        `convert_coordinates_to_key`.
+
+        Args:
+            key (str): The name of the key. For a list of key names see qwerty.yaml.
+
+        Returns:
+            tuple: The (x, y) coordinates (0.0 - 1.0) of the center of the key, or None
+                if the key isn't on the layout.
+        """
+        for k in self._flat_layout:
+            if k.name == key:
+                return k.center
+
+        return None
+
     def get_key_value(self, key: str) -> str:
         """
         Retrieves the corresponding value for the given key from the KEY_MAPS dictionary.
@@ -167,9 +250,11 @@ class KeyboardLayout:
 
     def _calculate_key_coordinates(self) -> None:
         self._flat_layout = []
+        rows = {}
 
         for row, keys in self._layout["keys"].items():
             row_index = int(row.split("_")[-1]) - 1
+            boundaries, row_keys = rows.setdefault(row_index, ([0.0], []))
 
             x = 0.0
             for key in keys:
@@ -196,3 +281,9 @@ class KeyboardLayout:
                 )
 
                 x += key["width"]
+                row_keys.append(len(self._flat_layout) - 1)
+                boundaries.append(x)
+
+        self._row_tops = [i * self._layout["key_height"] for i in sorted(rows)]
+        self._row_boundaries = [rows[i][0] for i in sorted(rows)]
+        self._row_keys = [rows[i][1] for i in sorted(rows)]
@@ -1,9 +1,11 @@
 import math
-from typing import Tuple
+from typing import List, Tuple
 
 import cv2
 import numpy as np
 
+from cameratokeyboard.types import Point
+
 
 def calculate_box_width_without_perspective_distortion(box, reference_box_pos):
     """
@@ -14,7 +16,7 @@ def calculate_box_width_without_perspective_distortion(box, reference_box_pos):
         reference_box (Tuple[float]): The bounding box of another object below or above to
             calculate distortion angles.
     """
-    if not box or not reference_box_pos:
+    if box is None or reference_box_pos is None or len(box) == 0:
         raise ValueError("Invalid box or reference_box_pos")
 
     tangent = abs(box[0] - reference_box_pos[0]) / abs(box[1] - reference_box_pos[1])
@@ -24,9 +26,94 @@ def calculate_box_width_without_perspective_distortion(box, reference_box_pos):
     return box[2] / (1 + angle * 1.5)
 
 
+KEYBOARD_BOUNDARY = np.float32(
+    [
+        [0, 0],
+        [0, 1],
+        [1, 0],
+        [1, 1],
+    ]
+)
+
+
+def keyboard_perspective_matrix(markers) -> np.ndarray:
+    """
+    Calculates the homography that maps the frame coordinates to fractional coordinates
+    relative to the edges of the keyboard.
+
+    Args:
+        markers (Markers): The 4 marker coordinates.
+
+    Returns:
+        np.ndarray: The 3x3 perspective transformation matrix.
+
+    Raises:
+        ValueError: If any of the markers are missing.
+    """
+    if (
+        not markers.bottom_left_marker
+        or not markers.top_left_marker
+        or not markers.bottom_right_marker
+        or not markers.top_right_marker
+    ):
+        raise ValueError("Missing required markers")
+
+    perspective_boundry = np.float32(
+        [
+            markers.bottom_left_marker.xy,
+            markers.top_left_marker.xy,
+            markers.bottom_right_marker.xy,
+            markers.top_right_marker.xy,
+        ]
+    )
+
+    return cv2.getPerspectiveTransform(perspective_boundry, KEYBOARD_BOUNDARY)
+
+
+def fingers_to_keyboard_fractional_coordinates(
+    markers,
+    finger_coordinates: List[Point],
+    x_offset: float = 0.0,
+    y_offset: float = 0.0,
+) -> List[Tuple[float, float]]:
+    """
+    Converts the given finger coordinates to fractional coordinates relative to the
+    edges of the keyboard, all in one go.
+
+    Args:
+        markers (Markers): The 4 marker coordinates. If it has a `perspective_matrix`
+            (e.g. `DetectedMarkers`), that is used instead of calculating it again.
+        finger_coordinates (List[Point]): The finger coordinates.
+        x_offset (float, optional): An offset to add to the x-coordinates.
+        y_offset (float, optional): An offset to add to the y-coordinates.
+
+    Returns:
+        List[Tuple[float, float]]: The finger coordinates on the keyboard layout
+            relative to its edges (0.0 to 1.0), in the same order.
+
+    Raises:
+        ValueError: If any of the finger coordinates is None or any of the markers are
+            missing.
+    """
+    if not all(finger_coordinates):
+        raise ValueError("Invalid finger coordinates.")
+
+    matrix = getattr(markers, "perspective_matrix", None)
+    if matrix is None:
+        matrix = keyboard_perspective_matrix(markers)
+
+    if not finger_coordinates:
+        return []
+
+    points = np.array([[p.xy for p in finger_coordinates]], dtype=np.float64)
+    transformed = cv2.perspectiveTransform(points, matrix)[0]
+
+    return [(x + x_offset, y + y_offset) for x, y in transformed.tolist()]
+
+
 def finger_to_keyboard_fractional_coordinates(
     markers,
-    finger_coordinates,
+    finger_coordinates: Point,
     x_offset: float = 0.0,
     y_offset: float = 0.0,
 ) -> Tuple[float, float]:
@@ -36,8 +123,7 @@ def finger_to_keyboard_fractional_coordinates(
 
     Args:
         markers (Markers): The 4 marker coordinates.
-        finger_coordinates (Point): The finger coordinates. Bottom left, top left and
-            bottom right markers are required.
+        finger_coordinates (Point): The finger coordinates.
         x_offset (float, optional): An offset to add to the x-coordinate. It most
             likely will be the fractional distance from the center of the markers to
             the edge of the keyboard.
@@ -55,31 +141,6 @@ def finger_to_keyboard_fractional_coordinates(
     if not finger_coordinates:
         raise ValueError("Invalid finger coordinates.")
 
-    if (
-        not markers.bottom_left_marker
-        or not markers.top_left_marker
-        or not markers.bottom_right_marker
-    ):
-        raise ValueError("Missing required markers")
-
-    perspective_boundry = np.float32(
-        [
-            markers.bottom_left_marker.xy,
-            markers.top_left_marker.xy,
-            markers.bottom_right_marker.xy,
-            markers.top_right_marker.xy,
-        ]
-    )
-    target_boundry = np.float32(
-        [
-            [0, 0],
-            [0, 1],
-            [1, 0],
-            [1, 1],
-        ]
-    )
-    matrix = cv2.getPerspectiveTransform(perspective_boundry, target_boundry)
-    transformed = np.dot(matrix, [*finger_coordinates.xy, 1])
-    transformed /= transformed[2]
-
-    return transformed[0] + x_offset, transformed[1] + y_offset
+    return fingers_to_keyboard_fractional_coordinates(
+        markers, [finger_coordinates], x_offset=x_offset, y_offset=y_offset
+    )[0]
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 from cameratokeyboard.types import Finger
 from cameratokeyboard.core.detected_objects import DetectedFingersAndThumbs
 
@@ -70,3 +72,26 @@ class ICalibrationStrategy(ABC):
         calibrating and while trying to determine if a finger is down by comparing
         the calibration time and detection time values.
         """
+
+    @property
+    @abstractmethod
+    def calibration_values(self) -> np.ndarray:
+        """
+        The calibration values of all of the fingers, as an array indexed by
+        `Finger.index`.
+        """
+
+    @abstractmethod
+    def calculate_calibration_values(self, states: np.ndarray) -> np.ndarray:
+        """
+        Calculates the calibration values of all of the fingers at once, like
+        `calculate_calibration_value` does for one.
+
+        Args:
+            states (np.ndarray): The (x, y, ...) of every finger, indexed by
+                `Finger.index`, with NaN rows for the fingers that aren't detected.
+
+        Returns:
+            np.ndarray: The calibration values, indexed by `Finger.index`. NaN where
+                it can't be calculated.
+        """
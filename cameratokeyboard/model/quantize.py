@@ -0,0 +1,343 @@
+import os
+import random
+import time
+from typing import Dict, Iterator, List, Tuple
+
+import cv2
+import numpy as np
+from ultralytics.utils.metrics import ap_per_class
+
+from cameratokeyboard.app.onnx_backend import (
+    OnnxModel,
+    export_to_onnx,
+    letterbox,
+    quantized_model_path,
+    to_input_tensor,
+)
+from cameratokeyboard.config import Config
+from cameratokeyboard.logger import get_logger
+from cameratokeyboard.model.model_downloader import ModelDownloader
+from cameratokeyboard.model.partitioner import DataPartitioner
+from cameratokeyboard.types import ModelEvaluation
+
+LOGGER = get_logger()
+# The confidence and IoU thresholds ultralytics validates with.
+EVALUATION_CONFIDENCE = 0.001
+EVALUATION_IOU = 0.7
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+WARMUP_RUNS = 3
+SEED = 0
+
+
+class Quantizer:
+    """
+    Quantizes the latest model to INT8 for faster inference on the CPU, then compares
+    the latency and the mAP of both models on the test split.
+
+    The model is exported to ONNX (see `export_to_onnx`) and statically quantized with
+    ONNX Runtime: weights per channel, activations per tensor, with their ranges
+    calibrated on a random sample of the train split, so neither model is evaluated on
+    the calibration images. The quantized model is saved next to the float one, in
+    `models_dir`, and can be run with `--inference_backend onnx_int8`.
+
+    Args:
+        config (Config): The application configuration.
+    """
+
+    def __init__(self, config: Config) -> None:
+        self._config = config
+        self._image_size = max(config.training_image_size)
+
+    def run(self) -> List[ModelEvaluation]:
+        """
+        Quantizes the model and evaluates both the float and the quantized models.
+
+        Returns:
+            List[ModelEvaluation]: The evaluations of the float and quantized models.
+        """
+        model_path = ModelDownloader(self._config).local_path_to_latest_model
+        onnx_path = export_to_onnx(model_path)
+        int8_path = quantized_model_path(onnx_path)
+
+        self.quantize(onnx_path, int8_path)
+        LOGGER.info("Quantized model saved to %s", int8_path)
+
+        test_set = self._load_test_set()
+        evaluations = [
+            self.evaluate("float32", onnx_path, test_set),
+            self.evaluate("int8", int8_path, test_set),
+        ]
+        self._report(evaluations)
+
+        return evaluations
+
+    def quantize(self, onnx_path: str, int8_path: str) -> None:
+        """
+        Statically quantizes an ONNX model, calibrated on the train split.
+
+        Args:
+            onnx_path (str): The path to the float model.
+            int8_path (str): Where to save the quantized model.
+
+        Raises:
+            ImportError: If onnxruntime isn't installed.
+        """
+        try:
+            # pylint: disable=import-outside-toplevel
+            import onnx
+            from onnxruntime import quantization
+        except ImportError as e:
+            raise ImportError(
+                "Quantization requires onnx and onnxruntime: "
+                "pip install onnx onnxruntime"
+            ) from e
+
+        images = self._calibration_images()
+        LOGGER.info("Calibrating on %d images...", len(images))
+
+        preprocessed_path = f"{os.path.splitext(int8_path)[0]}.preprocessed.onnx"
+        quantization.quant_pre_process(
+            onnx_path, preprocessed_path, skip_symbolic_shape=True
+        )
+        try:
+            quantization.quantize_static(
+                preprocessed_path,
+                int8_path,
+                CalibrationReader(
+                    images, OnnxModel(onnx_path).input_name, self._image_size
+                ),
+                quant_format=quantization.QuantFormat.QDQ,
+                activation_type=quantization.QuantType.QUInt8,
+                weight_type=quantization.QuantType.QInt8,
+                per_channel=True,
+            )
+        finally:
+            os.remove(preprocessed_path)
+
+        # The names and the input size are needed to run the model, see `OnnxModel`.
+        float_model = onnx.load(onnx_path, load_external_data=False)
+        int8_model = onnx.load(int8_path)
+        del int8_model.metadata_props[:]
+        int8_model.metadata_props.extend(float_model.metadata_props)
+        onnx.save(int8_model, int8_path)
+
+    def evaluate(
+        self, name: str, onnx_path: str, test_set: List[Tuple[str, np.ndarray]]
+    ) -> ModelEvaluation:
+        """
+        Measures the latency and the mAP of a model on the test set, with the same pre
+        and post processing as the app.
+
+        Args:
+            name (str): The name of the model in the report.
+            onnx_path (str): The path to the model.
+            test_set (List[Tuple[str, np.ndarray]]): The image paths along with their
+                (class, center x, center y, width, height) normalized labels.
+
+        Returns:
+            ModelEvaluation: The latency and the mAP of the model.
+        """
+        LOGGER.info("Evaluating %s on %d images...", name, len(test_set))
+        model = OnnxModel(onnx_path, confidence=EVALUATION_CONFIDENCE)
+        latencies = []
+        stats = []
+
+        for i, (image_path, labels) in enumerate(test_set):
+            image = cv2.imread(image_path)
+            if i == 0:
+                for _ in range(WARMUP_RUNS):
+                    model(image, iou=EVALUATION_IOU, imgsz=self._image_size)
+
+            started_at = time.perf_counter()
+            results = model(image, iou=EVALUATION_IOU, imgsz=self._image_size)[0]
+            latencies.append(time.perf_counter() - started_at)
+
+            predictions = results.boxes.cpu().numpy().data
+            stats.append(
+                (
+                    match_predictions(predictions, to_pixel_boxes(labels, image.shape)),
+                    predictions[:, 4],
+                    predictions[:, 5],
+                    labels[:, 0],
+                )
+            )
+
+        average_precisions = average_precision(stats, model.names)
+        latencies = np.array(latencies) * 1000
+
+        return ModelEvaluation(
+            name=name,
+            path=onnx_path,
+            size_mb=os.path.getsize(onnx_path) / 2**20,
+            latency_ms=float(np.mean(latencies)),
+            p95_latency_ms=float(np.percentile(latencies, 95)),
+            map50=float(average_precisions[:, 0].mean()),
+            map50_95=float(average_precisions.mean()),
+        )
+
+    def _calibration_images(self) -> List[str]:
+        images_path = self._split_images_path(self._config.split_paths[0])
+        extension = f".{self._config.image_extension}"
+        images = sorted(
+            os.path.join(images_path, file)
+            for file in os.listdir(images_path)
+            if file.endswith(extension)
+        )
+        if not images:
+            raise ValueError(f"No images found in {images_path}.")
+
+        count = min(self._config.quantization_calibration_images, len(images))
+        return random.Random(SEED).sample(images, count)
+
+    def _load_test_set(self) -> List[Tuple[str, np.ndarray]]:
+        test_split = self._config.split_paths[1]
+        images_path = self._split_images_path(test_split)
+        labels_path = os.path.join(self._config.dataset_path, "labels", test_split)
+
+        test_set = []
+        for file in sorted(os.listdir(images_path)):
+            label_path = os.path.join(labels_path, f"{os.path.splitext(file)[0]}.txt")
+            labels = np.loadtxt(label_path, ndmin=2).reshape(-1, 5)
+            test_set.append((os.path.join(images_path, file), labels))
+
+        return test_set
+
+    def _split_images_path(self, split: str) -> str:
+        images_path = os.path.join(self._config.dataset_path, "images", split)
+
+        if not os.path.exists(images_path) or not os.listdir(images_path):
+            LOGGER.info("No %s split found, partitioning the raw dataset.", split)
+            DataPartitioner(self._config).partition()
+
+        return images_path
+
+    @staticmethod
+    def _report(evaluations: List[ModelEvaluation]) -> None:
+        for evaluation in evaluations:
+            LOGGER.info(
+                "%-8s size: %6.1fMiB  latency: %7.1fms (p95: %7.1fms)  "
+                "mAP50: %.3f  mAP50-95: %.3f",
+                evaluation.name,
+                evaluation.size_mb,
+                evaluation.latency_ms,
+                evaluation.p95_latency_ms,
+                evaluation.map50,
+                evaluation.map50_95,
+            )
+
+
+class CalibrationReader:
+    """
+    Feeds the calibration images to the ONNX Runtime calibrator, preprocessed the same
+    way as for inference. Implements `onnxruntime.quantization.CalibrationDataReader`.
+
+    Args:
+        images (List[str]): The paths to the images.
+        input_name (str): The name of the model's input.
+        image_size (int): The input size of the model.
+    """
+
+    def __init__(self, images: List[str], input_name: str, image_size: int) -> None:
+        self._images = images
+        self._input_name = input_name
+        self._image_size = image_size
+        self._inputs = self._generate_inputs()
+
+    def get_next(self) -> Dict[str, np.ndarray]:
+        """
+        Returns the next input, or None when there are no more.
+        """
+        return next(self._inputs, None)
+
+    def _generate_inputs(self) -> Iterator[Dict[str, np.ndarray]]:
+        for image_path in self._images:
+            image, _, _ = letterbox(cv2.imread(image_path), self._image_size)
+            yield {self._input_name: to_input_tensor(image)}
+
+
+def average_precision(stats: List[Tuple], names: Dict[int, str]) -> np.ndarray:
+    """
+    Calculates the average precision of each class at each IoU threshold.
+
+    Args:
+        stats (List[Tuple]): For each image, whether each prediction is correct (see
+            `match_predictions`), the confidences and the classes of the predictions
+            and the classes of the targets.
+        names (Dict[int, str]): The class names.
+
+    Returns:
+        np.ndarray: A (classes, 10) array.
+    """
+    correct, confidences, predicted_classes, target_classes = (
+        np.concatenate(x, axis=0) for x in zip(*stats)
+    )
+    if len(correct) == 0:
+        return np.zeros((1, len(IOU_THRESHOLDS)))
+
+    return ap_per_class(
+        correct, confidences, predicted_classes, target_classes, names=names
+    )[5]
+
+
+def to_pixel_boxes(labels: np.ndarray, image_shape: Tuple[int, int]) -> np.ndarray:
+    """
+    Converts YOLO labels, i.e. (class, center x, center y, width, height) normalized
+    rows, to (class, x1, y1, x2, y2) rows in pixels.
+    """
+    height, width = image_shape[:2]
+    boxes = labels.copy()
+    boxes[:, [1, 3]] *= width
+    boxes[:, [2, 4]] *= height
+    boxes[:, 1:3] = boxes[:, 1:3] - boxes[:, 3:5] / 2
+    boxes[:, 3:5] = boxes[:, 1:3] + boxes[:, 3:5]
+
+    return boxes
+
+
+def box_iou(boxes1: np.ndarray, boxes2: np.ndarray) -> np.ndarray:
+    """
+    Calculates the IoU of every pair of (x1, y1, x2, y2) boxes.
+
+    Returns:
+        np.ndarray: A (len(boxes1), len(boxes2)) array.
+    """
+    top_left = np.maximum(boxes1[:, None, :2], boxes2[None, :, :2])
+    bottom_right = np.minimum(boxes1[:, None, 2:], boxes2[None, :, 2:])
+    intersection = (bottom_right - top_left).clip(0).prod(axis=2)
+    area1 = (boxes1[:, 2:] - boxes1[:, :2]).prod(axis=1)
+    area2 = (boxes2[:, 2:] - boxes2[:, :2]).prod(axis=1)
+
+    return intersection / (area1[:, None] + area2[None, :] - intersection + 1e-9)
+
+
+def match_predictions(predictions: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    Matches the predictions of an image to its targets, greedily by IoU, the same way
+    ultralytics does.
+
+    Args:
+        predictions (np.ndarray): (x1, y1, x2, y2, confidence, class) rows.
+        targets (np.ndarray): (class, x1, y1, x2, y2) rows.
+
+    Returns:
+        np.ndarray: A (len(predictions), 10) boolean array, whether each prediction is
+            correct at each IoU threshold from 0.5 to 0.95.
+    """
+    correct = np.zeros((len(predictions), len(IOU_THRESHOLDS)), dtype=bool)
+    if len(predictions) == 0 or len(targets) == 0:
+        return correct
+
+    iou = box_iou(targets[:, 1:], predictions[:, :4])
+    iou *= targets[:, :1] == predictions[None, :, 5]
+
+    for i, threshold in enumerate(IOU_THRESHOLDS):
+        matches = np.argwhere(iou >= threshold)
+        if len(matches) == 0:
+            continue
+
+        matches = matches[iou[matches[:, 0], matches[:, 1]].argsort()[::-1]]
+        matches = matches[np.unique(matches[:, 1], return_index=True)[1]]
+        matches = matches[np.unique(matches[:, 0], return_index=True)[1]]
+        correct[matches[:, 1], i] = True
+
+    return correct
@@ -1,12 +1,17 @@
+from array import array
 from collections import namedtuple
 from enum import Enum
 import math
+import time
 from typing import List
 
 import numpy as np
 
 RawImage = np.ndarray
 
+# How many positions a `Point` remembers.
+POINT_HISTORY_SIZE = 10
+
 
 class FrameState(Enum):
     """
@@ -20,17 +25,61 @@ class FrameState(Enum):
     MISSING_THUMBS = "missing_thumbs"
 
 
+class DropPolicy(Enum):
+    """
+    What a bounded pipeline queue does with a new item when it's full.
+    """
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+
+
+class FramePacing(Enum):
+    """
+    How fast a frame source replays its frames.
+    """
+
+    REALTIME = "realtime"
+    MAX_SPEED = "max"
+
+
+class InferenceBackend(Enum):
+    """
+    What runs the model.
+    """
+
+    ULTRALYTICS = "ultralytics"
+    ONNX = "onnx"
+    ONNX_INT8 = "onnx_int8"
+
+
 class Point:
     """
-    A simple named tuple to represent a point in 2D space.
+    A point in 2D space, which remembers its last `history_size` positions and when
+    they were captured.
+
+    The positions are kept in a fixed-size ring buffer of floats, so updating a point
+    doesn't allocate anything. The buffer is only allocated when the point first
+    moves: most points, like the marker corners, never do.
+
+    Args:
+        x (float): The X coordinate.
+        y (float): The Y coordinate.
+        timestamp (float, optional): When the position was captured, in seconds.
+            Defaults to now, from `time.monotonic`.
+        history_size (int, optional): How many positions are remembered.
     """
 
-    __slots__ = ["_x_history", "_y_history", "_window_length"]
+    __slots__ = ["_x", "_y", "_timestamp", "_history_size", "_history", "_cursor"]
 
-    def __init__(self, x, y):
-        self._x_history = [int(x)]
-        self._y_history = [int(y)]
-        self._window_length = 10
+    def __init__(self, x, y, timestamp=None, history_size=POINT_HISTORY_SIZE):
+        self._x = x
+        self._y = y
+        self._timestamp = time.monotonic() if timestamp is None else timestamp
+        self._history_size = history_size
+        self._history = None
+        self._cursor = 0
 
     def __eq__(self, other):
         return self.x == other.x and self.y == other.y
@@ -49,22 +98,26 @@ class Point:
         """
         The X coordinate.
         """
-        return self._x_history[-1]
+        return self._x
 
     @property
     def y(self):
         """
         The Y coordinate.
         """
-        return self._y_history[-1]
+        return self._y
 
     @x.setter
     def x(self, value):
-        self._x_history[-1] = int(value)
+        self._x = value
+        if self._history is not None:
+            self._history[self._cursor] = value
 
     @y.setter
     def y(self, value):
-        self._y_history[-1] = int(value)
+        self._y = value
+        if self._history is not None:
+            self._history[self._cursor + 1] = value
 
     @property
     def xy(self):
@@ -73,14 +126,30 @@ class Point:
         """
         return (self.x, self.y)
 
-    def update(self, x, y) -> "Point":
+    def update(self, x, y, timestamp=None) -> "Point":
         """
-        Updates the coordinates with x,y.
+        Updates the coordinates with x,y, captured at `timestamp` (defaults to now).
         """
-        self._x_history.append(int(x))
-        self._y_history.append(int(y))
-        self._x_history = self._x_history[-self._window_length :]
-        self._y_history = self._y_history[-self._window_length :]
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        history = self._history
+        if history is None:
+            # (x, y, timestamp) of each position, the cursor is the offset of the
+            # latest. The slots not written yet hold copies of the first position, so
+            # looking back past it changes nothing.
+            history = self._history = (
+                array("d", (self._x, self._y, self._timestamp)) * self._history_size
+            )
+
+        cursor = (self._cursor + 3) % len(history)
+        history[cursor] = x
+        history[cursor + 1] = y
+        history[cursor + 2] = timestamp
+        self._cursor = cursor
+        self._x = x
+        self._y = y
+        self._timestamp = timestamp
 
         return self
 
@@ -90,14 +159,30 @@ class Point:
         """
         return self.update(p.x, p.y)
 
-    def velocity_y(self, window: int) -> float:
+    def velocity_y(self, window: float) -> float:
         """
-        Returns the velocity of the point in the last `window` frames.
+        Returns the vertical velocity of the point, in pixels per second, between its
+        current position and the oldest one captured at most `window` seconds before.
+        0 if there is no such position.
         """
-        if len(self._y_history) < window:
-            return 0
+        history = self._history
+        if history is None:
+            return 0.0
 
-        return (self._y_history[-1] - self._y_history[-window]) / window
+        latest = self._cursor
+        oldest = latest
+
+        for age in range(1, len(history) // 3):
+            i = (latest - age * 3) % len(history)
+            if history[latest + 2] - history[i + 2] > window:
+                break
+            oldest = i
+
+        elapsed = history[latest + 2] - history[oldest + 2]
+        if elapsed <= 0:
+            return 0.0
+
+        return (history[latest + 1] - history[oldest + 1]) / elapsed
 
 
 Finger = namedtuple("Finger", ["index", "name"])
@@ -139,3 +224,57 @@ class Fingers:
 
 
 S3ContentsItem = namedtuple("S3ContentsItem", ["key", "last_modified"])
+
+CapturedFrame = namedtuple("CapturedFrame", ["image", "timestamp", "sequence"])
+
+StageStats = namedtuple(
+    "StageStats",
+    ["name", "queue_depth", "queue_size", "processed", "dropped", "service_time"],
+)
+
+LatencySummary = namedtuple("LatencySummary", ["stage", "count", "p50", "p95", "p99"])
+
+CameraStats = namedtuple("CameraStats", ["camera", "frames", "fps", "p50", "p95"])
+
+ServerStats = namedtuple(
+    "ServerStats",
+    [
+        "frames",
+        "batches",
+        "mean_batch_size",
+        "batch_sizes",
+        "throughput",
+        "mean_inference_ms",
+    ],
+)
+
+BenchmarkResult = namedtuple(
+    "BenchmarkResult", ["name", "calls", "mean_us", "median_us", "p95_us", "peak_bytes"]
+)
+
+ModelEvaluation = namedtuple(
+    "ModelEvaluation",
+    [
+        "name",
+        "path",
+        "size_mb",
+        "latency_ms",
+        "p95_latency_ms",
+        "map50",
+        "map50_95",
+    ],
+)
+
+SimulatedFrame = namedtuple("SimulatedFrame", ["results", "pressed_key"])
+
+LoadTestResult = namedtuple(
+    "LoadTestResult",
+    [
+        "frames",
+        "frames_per_second",
+        "p99_us",
+        "expected_text",
+        "typed_text",
+        "accuracy",
+    ],
+)
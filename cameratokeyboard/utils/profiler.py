@@ -0,0 +1,155 @@
+from collections import deque
+import contextlib
+import json
+import os
+import threading
+import time
+
+MAX_EVENTS = 1_000_000
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class _Span:
+    __slots__ = ["_profiler", "_name", "_category", "_started_at"]
+
+    def __init__(self, profiler: "Profiler", name: str, category: str) -> None:
+        self._profiler = profiler
+        self._name = name
+        self._category = category
+        self._started_at = None
+
+    def __enter__(self) -> "_Span":
+        self._started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self._profiler.add_span(
+            self._name, self._category, self._started_at, time.perf_counter()
+        )
+
+
+class Profiler:
+    """
+    Records spans (a name, a start and a duration) from any thread and writes them as a
+    Chrome trace JSON file, which can be opened in chrome://tracing or
+    https://ui.perfetto.dev.
+
+    Recording is off by default, in which case spans cost next to nothing.
+
+    Args:
+        max_events (int, optional): The number of spans to keep. The oldest ones are
+            dropped first.
+    """
+
+    def __init__(self, max_events: int = MAX_EVENTS) -> None:
+        self._enabled = False
+        self._events = deque(maxlen=max_events)
+        self._thread_names = {}
+        self._origin = time.perf_counter()
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether spans are being recorded or not.
+        """
+        return self._enabled
+
+    def enable(self) -> None:
+        """
+        Discards the recorded spans and starts recording.
+        """
+        self._events.clear()
+        self._thread_names = {}
+        self._origin = time.perf_counter()
+        self._enabled = True
+
+    def disable(self) -> None:
+        """
+        Stops recording. The recorded spans are kept until `enable` is called again.
+        """
+        self._enabled = False
+
+    def span(self, name: str, category: str = "app"):
+        """
+        Returns a context manager that records the time spent in its block, e.g.:
+
+            with profiler.span("inference"):
+                ...
+
+        Args:
+            name (str): The name of the span.
+            category (str, optional): Used to filter the spans in the viewer.
+        """
+        if not self._enabled:
+            return _NULL_SPAN
+
+        return _Span(self, name, category)
+
+    def add_span(
+        self, name: str, category: str, started_at: float, ended_at: float
+    ) -> None:
+        """
+        Records a span that has already ended.
+
+        Args:
+            name (str): The name of the span.
+            category (str): Used to filter the spans in the viewer.
+            started_at (float): The `time.perf_counter` at the start of the span.
+            ended_at (float): The `time.perf_counter` at the end of the span.
+        """
+        if not self._enabled:
+            return
+
+        thread = threading.current_thread()
+        if thread.ident not in self._thread_names:
+            self._thread_names[thread.ident] = thread.name
+
+        # deque.append is thread-safe.
+        self._events.append(
+            (name, category, started_at, ended_at - started_at, thread.ident)
+        )
+
+    def save(self, path: str) -> None:
+        """
+        Writes the recorded spans to a Chrome trace JSON file.
+
+        Args:
+            path (str): The path to the file.
+        """
+        pid = os.getpid()
+        trace_events = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in list(self._thread_names.items())
+        ]
+        trace_events += [
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (started_at - self._origin) * 1e6,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": tid,
+            }
+            for name, category, started_at, duration, tid in list(self._events)
+        ]
+
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, file)
+
+
+_PROFILER = Profiler()
+
+
+def get_profiler() -> Profiler:
+    """
+    Gets the application wide profiler.
+    """
+    return _PROFILER
@@ -1,5 +1,6 @@
 # pylint: disable=missing-function-docstring,redefined-outer-name,protected-access,unused-argument
 import asyncio
+import json
 import time
 from unittest.mock import MagicMock, patch
 
@@ -7,6 +8,9 @@ import pytest
 
 from cameratokeyboard.config import Config
 from cameratokeyboard.app.app import App, RepeatingKeysThrottler
+from cameratokeyboard.app.headless import HeadlessUI
+from cameratokeyboard.types import DropPolicy
+from cameratokeyboard.utils.profiler import get_profiler
 
 
 @pytest.fixture
@@ -25,7 +29,7 @@ def mock_cap_failed():
 
 @pytest.fixture
 def mock_ui_class():
-    with patch("cameratokeyboard.app.app.UI") as mock_ui:
+    with patch("cameratokeyboard.app.ui.UI") as mock_ui:
         yield mock_ui
 
 
@@ -47,6 +51,7 @@ def mock_detected_frame():
     mock = MagicMock()
 
     mock.down_keys = ["a"]
+    mock.snapshot.return_value = mock
 
     return mock
 
@@ -56,13 +61,36 @@ def config():
     return Config()
 
 
+@pytest.fixture(autouse=True)
+def mock_model_downloader():
+    with patch("cameratokeyboard.app.app.ModelDownloader") as mock:
+        yield mock
+
+
 @pytest.fixture
 @patch("cameratokeyboard.app.app.Detector")
 def app(mock_detector, config, mock_ui_class, mock_detected_frame):
-    mock_detector.return_value.detect.return_value = mock_detected_frame
+    mock_detector.return_value.infer_captured.side_effect = lambda captured: (
+        captured,
+        MagicMock(),
+    )
+    mock_detector.return_value.process.return_value = mock_detected_frame
     return App(config)
 
 
+def test_startup(app, mock_model_downloader):
+    mock_model_downloader.return_value.run.assert_called_once()
+    app._detector.warm_up.assert_called_once_with((720, 1280, 3))
+    assert set(app.startup_timings) == {
+        "model_download",
+        "model_load",
+        "warm_up",
+        "camera",
+        "ui",
+    }
+    assert all(seconds >= 0 for seconds in app.startup_timings.values())
+
+
 def test_app_initialization(app, config, mock_ui_class):
     assert app._config == config
     assert app._ui is mock_ui_class.return_value
@@ -70,6 +98,27 @@ def test_app_initialization(app, config, mock_ui_class):
     assert app._detected_frame is None
 
 
+@pytest.mark.parametrize(
+    "video_input_path,replay_pacing,drop_policy,expected",
+    [
+        (None, "max", "drop_oldest", DropPolicy.DROP_OLDEST),  # the camera
+        ("video.mp4", "realtime", "drop_oldest", DropPolicy.DROP_OLDEST),
+        ("video.mp4", "realtime", "drop_newest", DropPolicy.DROP_NEWEST),
+        ("video.mp4", "max", "drop_oldest", DropPolicy.BLOCK),
+        ("video.mp4", "max", "drop_newest", DropPolicy.BLOCK),
+        ("video.mp4", "max", "block", DropPolicy.BLOCK),
+    ],
+)
+def test_pipeline_drop_policy(video_input_path, replay_pacing, drop_policy, expected):
+    config = Config(
+        video_input_path=video_input_path,
+        replay_pacing=replay_pacing,
+        pipeline_drop_policy=drop_policy,
+    )
+
+    assert App._pipeline_drop_policy(MagicMock(_config=config)) == expected
+
+
 @pytest.mark.asyncio
 async def test_app_run(mock_cap, app, mock_ui_run, mock_detected_frame):
     await app.run()
@@ -79,6 +128,62 @@ async def test_app_run(mock_cap, app, mock_ui_run, mock_detected_frame):
     app._ui.update_text.assert_called()
 
 
+@pytest.mark.asyncio
+async def test_app_run_records_latencies(
+    mock_cap, app, mock_ui_run, mock_detected_frame, tmp_path
+):
+    app._config.latency_report_path = str(tmp_path / "latency.json")
+
+    await app.run()
+
+    stages = [summary.stage for summary in app.latency_summary()]
+    assert stages == ["inference", "detected_frame", "dispatch", "throttler", "output"]
+    assert all(summary.count > 0 for summary in app.latency_summary())
+    assert (tmp_path / "latency.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_app_run_with_profile(
+    mock_cap, app, mock_ui_run, mock_detected_frame, tmp_path
+):
+    path = tmp_path / "trace.json"
+    app._config.profile = str(path)
+    get_profiler().enable()
+
+    await app.run()
+
+    events = json.loads(path.read_text(encoding="utf-8"))["traceEvents"]
+    assert "capture" in [e["name"] for e in events]
+    assert not get_profiler().enabled
+
+
+@pytest.mark.asyncio
+@patch("cameratokeyboard.app.app.Detector")
+async def test_app_run_with_several_cameras(
+    mock_detector, mock_cap, mock_ui_class, mock_ui_run
+):
+    detected_frames = [MagicMock(down_keys=["a"]), MagicMock(down_keys=["b"])]
+    for detected_frame in detected_frames:
+        detected_frame.snapshot.return_value = detected_frame
+    detector = mock_detector.return_value
+    detector.infer_batch.side_effect = lambda frames: [MagicMock() for _ in frames]
+    detector.process.side_effect = lambda results, camera, timestamp: detected_frames[
+        camera
+    ]
+    app = App(Config(video_input_devices=[0, 1], repeating_keys_delay=10))
+
+    await app.run()
+
+    assert len(detector.infer_batch.call_args.args[0]) == 2
+    detector.infer_captured.assert_not_called()
+    app._ui.update_data.assert_called_with(detected_frame_data=detected_frames[0])
+    assert app._ui.update_text.call_args_list == [(("a",),), (("b",),)]
+
+    stats = app.camera_stats()
+    assert [s.camera for s in stats] == [0, 1]
+    assert all(s.frames > 0 and s.fps > 0 and s.p50 >= 0 for s in stats)
+
+
 @pytest.mark.asyncio
 async def test_app_run_failed_frame(mock_cap_failed, app, mock_ui_run):
     await app.run()
@@ -96,3 +201,16 @@ def test_key_press_allowed():
 
     with patch("time.time", return_value=time.time() + 0.6):
         assert throttler.key_press_allowed("a") is True
+
+
+@pytest.mark.asyncio
+@patch("cameratokeyboard.app.app.Detector")
+async def test_headless_app_stops_when_the_input_ends(
+    mock_detector, mock_cap_failed, mock_ui_class
+):
+    app = App(Config(headless=True, headless_output="-"))
+
+    assert isinstance(app._ui, HeadlessUI)
+    mock_ui_class.assert_not_called()
+
+    await asyncio.wait_for(app.run(), timeout=5.0)
@@ -1,8 +1,12 @@
 # pylint: disable=missing-class-docstring,missing-function-docstring,redefined-outer-name,unused-argument
 from unittest.mock import call, patch, Mock, MagicMock
+
+import numpy as np
 import pytest
+from ultralytics.engine.results import Results
 
 from cameratokeyboard.app.detector import Detector
+from cameratokeyboard.types import Point
 
 from tests.fixtures import s3_objects_response
 
@@ -24,6 +28,17 @@ class YoloMock:
 def base_config():
     return {
         "iou": 0.5,
+        "inference_backend": "ultralytics",
+        "inference_workers": 0,
+        "inference_server": None,
+        "motion_threshold": 0.0,
+        "motion_max_skipped_frames": 15,
+        "roi_inference": False,
+        "roi_image_size": 320,
+        "roi_margin": 0.25,
+        "tracking_interval": 0,
+        "tracking_max_error": 1.0,
+        "markers_min_confidence": 0.3,
         "models_dir": MODELS_DIR,
         "remote_models_bucket_name": BUCKET_NAME,
         "remote_models_bucket_region": REGION,
@@ -81,13 +96,13 @@ def test_detect(yolo_mock, config, frame, detected_frame_class):
         call(frame, int(config.processing_device), iou=config.iou)
     ]
     assert detected_frame_class.call_args_list == [
-        call(yolo_mock.instance()[0], config=config)
+        call(yolo_mock.instance()[0], config=config, timestamp=None)
     ]
 
     # second call
     detector.detect(frame)
     assert detected_frame_class.return_value.update.call_args_list == [
-        call(yolo_mock.instance()[0])
+        call(yolo_mock.instance()[0], None)
     ]
 
 
@@ -96,5 +111,314 @@ def test_detect_with_cpu(yolo_mock, config_with_cpu, frame, detected_frame_class
 
     detector.detect(frame)
     assert detected_frame_class.call_args_list == [
-        call(yolo_mock.instance()[0], config=config_with_cpu)
+        call(yolo_mock.instance()[0], config=config_with_cpu, timestamp=None)
+    ]
+
+
+@pytest.fixture
+def config_with_workers(base_config):
+    return Mock(processing_device="cpu", **{**base_config, "inference_workers": 2})
+
+
+@pytest.fixture
+def inference_pool_class():
+    with patch("cameratokeyboard.app.detector.InferencePool") as pool_class:
+        yield pool_class
+
+
+def test_inference_workers(
+    yolo_mock, config_with_workers, inference_pool_class, detected_frame_class
+):
+    detector = Detector(config_with_workers)
+
+    assert inference_pool_class.call_args.kwargs["workers"] == 2
+    assert detector._model is None  # pylint: disable=protected-access
+
+    pool = inference_pool_class.return_value
+    captured_frame = MagicMock()
+    results = MagicMock()
+    pool.next_result.return_value = ("older frame", results)
+
+    assert detector.infer_captured(captured_frame) == ("older frame", results)
+    pool.submit.assert_called_once_with(captured_frame.image, context=captured_frame)
+
+    pool.next_result.return_value = None
+    assert detector.infer_captured(captured_frame) is None
+
+    detector.close()
+    pool.close.assert_called_once()
+
+
+def test_infer_captured_without_workers(yolo_mock, config, detected_frame_class):
+    detector = Detector(config)
+    captured_frame = MagicMock()
+
+    assert detector.infer_captured(captured_frame) == (
+        captured_frame,
+        yolo_mock.instance()[0],
+    )
+
+
+def test_infer_batch(yolo_mock, config):
+    detector = Detector(config)
+    frames = [MagicMock(), MagicMock()]
+    yolo_mock.instance.return_value = ["results 0", "results 1"]
+
+    assert detector.infer_batch(frames) == ["results 0", "results 1"]
+    yolo_mock.instance.assert_called_once_with(frames, 0, iou=config.iou)
+
+
+def test_infer_batch_with_workers(yolo_mock, config_with_workers, inference_pool_class):
+    detector = Detector(config_with_workers)
+    pool = inference_pool_class.return_value
+    pool.next_result.side_effect = [(None, "results 0"), (None, "results 1")]
+
+    assert detector.infer_batch(["frame 0", "frame 1"]) == ["results 0", "results 1"]
+    assert pool.submit.call_args_list == [call("frame 0"), call("frame 1")]
+
+
+def test_process_per_camera(yolo_mock, config, detected_frame_class):
+    detected_frame_class.side_effect = lambda results, config, timestamp: MagicMock(
+        results=results, marker_coordinates=[Point(int(results[-1]), 0)]
+    )
+    detector = Detector(config)
+
+    first = detector.process("results 0")
+    second = detector.process("results 1", camera=1, timestamp=1.0)
+
+    assert first.results == "results 0"
+    assert second.results == "results 1"
+    assert detector.process("results 2", camera=1, timestamp=2.0) is second
+    second.update.assert_called_once_with("results 2", 2.0)
+    # The markers of the first camera are the ones used for the inference.
+    markers = detector._marker_coordinates  # pylint: disable=protected-access
+    assert [p.x for p in markers] == [0]
+
+
+def test_process_copies_the_markers(yolo_mock, config, detected_frame_class):
+    markers = [Point(300, 600), Point(340, 450), None, Point(980, 600)]
+    detected_frame_class.return_value.marker_coordinates = markers
+    detector = Detector(config)
+
+    detector.process("results 0")
+    detector.process("results 1", camera=1)
+    markers[0].update(310, 610)
+
+    copied = detector._marker_coordinates  # pylint: disable=protected-access
+    assert copied[0] is not markers[0]
+    assert (copied[0].x, copied[0].y) == (300, 600)
+    assert copied[2] is None
+
+
+def test_warm_up(yolo_mock, config):
+    detector = Detector(config)
+
+    detector.warm_up((720, 1280, 3))
+
+    (frame, device), kwargs = yolo_mock.instance.call_args
+    assert frame.shape == (720, 1280, 3)
+    assert device == 0
+    assert kwargs == {"iou": config.iou}
+    assert detector._last_results is None  # pylint: disable=protected-access
+
+
+def test_warm_up_with_roi_inference(yolo_mock, config_with_roi):
+    Detector(config_with_roi).warm_up((720, 1280, 3))
+
+    assert [c.kwargs.get("imgsz") for c in yolo_mock.instance.call_args_list] == [
+        None,
+        config_with_roi.roi_image_size,
     ]
+
+
+def test_warm_up_with_workers(
+    yolo_mock, config_with_workers, inference_pool_class, detected_frame_class
+):
+    Detector(config_with_workers).warm_up((720, 1280, 3))
+
+    inference_pool_class.return_value.submit.assert_not_called()
+
+
+@pytest.fixture
+def config_with_tracking(base_config):
+    return Mock(processing_device=0, **{**base_config, "tracking_interval": 3})
+
+
+def test_tracking(yolo_mock, config_with_tracking, frame):
+    with patch("cameratokeyboard.app.detector.FingertipTracker") as tracker_class:
+        detector = Detector(config_with_tracking)
+        tracker = tracker_class.return_value
+        tracked_results = MagicMock()
+        tracker.track.side_effect = [None, tracked_results]
+
+        assert detector.infer(frame) is yolo_mock.instance()[0]
+        tracker.reset.assert_called_once_with(frame, yolo_mock.instance()[0])
+
+        assert detector.infer(frame) is tracked_results
+        assert tracker.reset.call_count == 1
+        assert detector.frames_tracked is tracker.frames_tracked
+
+    assert tracker_class.call_args.kwargs == {"interval": 3, "max_error": 1.0}
+
+
+def test_no_tracking_with_workers(
+    yolo_mock, base_config, inference_pool_class, detected_frame_class
+):
+    config = Mock(
+        processing_device="cpu",
+        **{**base_config, "inference_workers": 2, "tracking_interval": 3},
+    )
+
+    assert Detector(config).frames_tracked == 0
+
+
+@pytest.fixture
+def config_with_onnx(base_config):
+    return Mock(processing_device="cpu", **{**base_config, "inference_backend": "onnx"})
+
+
+def test_onnx_backend(yolo_mock, config_with_onnx, frame, detected_frame_class):
+    with patch(
+        "cameratokeyboard.app.detector.export_to_onnx", return_value="model.onnx"
+    ) as export, patch("cameratokeyboard.app.detector.OnnxModel") as onnx_model:
+        detector = Detector(config_with_onnx)
+        detector.detect(frame)
+
+    assert export.call_args.args[0].endswith(".pt")
+    onnx_model.assert_called_once_with("model.onnx")
+    assert onnx_model.return_value.call_args_list == [
+        call(frame, "cpu", iou=config_with_onnx.iou)
+    ]
+    assert detected_frame_class.call_args_list == [
+        call(onnx_model.return_value()[0], config=config_with_onnx, timestamp=None)
+    ]
+
+
+def test_inference_server(base_config, requests_mock):
+    config = Mock(
+        processing_device="cpu", **{**base_config, "inference_server": "unix:/c2k"}
+    )
+
+    with patch("cameratokeyboard.app.detector.RemoteModel") as remote_model:
+        detector = Detector(config)
+        detector.close()
+
+    remote_model.assert_called_once_with("unix:/c2k")
+    remote_model.return_value.close.assert_called_once()
+    requests_mock.get.assert_not_called()
+
+
+def test_onnx_int8_backend_without_a_quantized_model(yolo_mock, base_config):
+    config = Mock(
+        processing_device="cpu", **{**base_config, "inference_backend": "onnx_int8"}
+    )
+
+    with patch(
+        "cameratokeyboard.app.detector.export_to_onnx", return_value="model.onnx"
+    ), pytest.raises(FileNotFoundError, match="quantize"):
+        Detector(config)
+
+
+@pytest.fixture
+def config_with_motion_gate(base_config):
+    return Mock(processing_device="cpu", **{**base_config, "motion_threshold": 2.0})
+
+
+def test_static_frames_reuse_the_last_results(
+    yolo_mock, config_with_motion_gate, detected_frame_class
+):
+    detected_frame_class.return_value.marker_coordinates = []
+    detector = Detector(config_with_motion_gate)
+    frame = np.zeros((72, 128, 3), dtype=np.uint8)
+
+    first = detector.infer(frame)
+    detector.process(first)
+    second = detector.infer(frame.copy())
+
+    assert yolo_mock.instance.call_count == 1
+    assert second is not first
+    assert second.orig_img is not frame
+    assert detector.inferences_saved == 1
+
+    detector.infer(frame + 50)
+    assert yolo_mock.instance.call_count == 2
+
+
+def results_with_markers(frame, marker_count):
+    return Results(
+        orig_img=frame,
+        path=None,
+        names={0: "finger", 1: "marker"},
+        boxes=np.array(
+            [[10, 10, 20, 20, 0.9, 1]] * marker_count + [[30, 30, 40, 40, 0.9, 0]],
+            dtype=np.float32,
+        ),
+    )
+
+
+@pytest.fixture
+def config_with_roi(base_config):
+    return Mock(processing_device="cpu", **{**base_config, "roi_inference": True})
+
+
+def test_roi_inference(yolo_mock, config_with_roi, detected_frame_class):
+    detected_frame_class.return_value.marker_coordinates = [
+        Point(300, 600),
+        Point(340, 450),
+        Point(940, 450),
+        Point(980, 600),
+    ]
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    yolo_mock.instance.side_effect = lambda image, *args, **kwargs: [
+        results_with_markers(image, 4)
+    ]
+    detector = Detector(config_with_roi)
+
+    detector.process(detector.infer(frame))
+    assert yolo_mock.instance.call_args.args[0] is frame
+
+    results = detector.infer(frame)
+
+    roi_call = yolo_mock.instance.call_args
+    assert roi_call.args[0].shape == (440, 1020, 3)
+    assert roi_call.kwargs["imgsz"] == 320
+    assert results.orig_img is frame
+    assert results.boxes.xyxy[0].tolist() == [140, 290, 150, 300]
+
+
+def test_roi_inference_falls_back_when_markers_are_lost(
+    yolo_mock, config_with_roi, detected_frame_class
+):
+    detected_frame_class.return_value.marker_coordinates = [
+        Point(300, 600),
+        Point(340, 450),
+        Point(940, 450),
+        Point(980, 600),
+    ]
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    yolo_mock.instance.side_effect = lambda image, *args, **kwargs: [
+        results_with_markers(image, 4 if image is frame else 2)
+    ]
+    detector = Detector(config_with_roi)
+    detector.process(detector.infer(frame))
+
+    results = detector.infer(frame)
+
+    assert yolo_mock.instance.call_count == 3
+    assert yolo_mock.instance.call_args.args[0] is frame
+    assert results.boxes.xyxy[0].tolist() == [10, 10, 20, 20]
+
+
+def test_roi_inference_waits_for_markers(
+    yolo_mock, config_with_roi, detected_frame_class
+):
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    yolo_mock.instance.side_effect = lambda image, *args, **kwargs: [
+        results_with_markers(image, 3)
+    ]
+    detector = Detector(config_with_roi)
+
+    detector.process(detector.infer(frame))
+    detector.infer(frame)
+
+    assert all(c.args[0] is frame for c in yolo_mock.instance.call_args_list)
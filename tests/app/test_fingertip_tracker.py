@@ -0,0 +1,89 @@
+# pylint: disable=missing-function-docstring,redefined-outer-name
+import cv2
+import numpy as np
+import pytest
+
+from cameratokeyboard.app.fingertip_tracker import FingertipTracker
+from cameratokeyboard.benchmark.typing_simulator import to_results
+
+BOXES = np.array(
+    [
+        [300, 300, 50, 60],  # finger
+        [600, 400, 50, 100],  # thumb
+        [100, 600, 40, 40],  # marker
+    ],
+    dtype=float,
+)
+CLASSES = np.array([0, 1, 2])
+
+
+@pytest.fixture
+def texture():
+    rng = np.random.default_rng(0)
+    noise = (rng.random((800, 1400)) * 255).astype(np.uint8)
+    return cv2.GaussianBlur(noise, (5, 5), 0)
+
+
+@pytest.fixture
+def frame_at(texture):
+    def frame_at(dx, dy):
+        """
+        A 720p frame of the texture, moved by (dx, dy) pixels.
+        """
+        gray = texture[40 - dy : 760 - dy, 60 - dx : 1340 - dx]
+        return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+    return frame_at
+
+
+@pytest.fixture
+def tracker(frame_at):
+    tracker = FingertipTracker(interval=3, max_error=1.0)
+    frame = frame_at(0, 0)
+    tracker.reset(frame, to_results(BOXES, CLASSES, np.full(3, 0.9), frame))
+    return tracker
+
+
+def test_nothing_to_track_before_the_first_detection(frame_at):
+    assert FingertipTracker(interval=3, max_error=1.0).track(frame_at(0, 0)) is None
+
+
+def test_fingers_and_thumbs_move_with_the_flow(tracker, frame_at):
+    frame = frame_at(4, 3)
+
+    results = tracker.track(frame)
+
+    assert results.orig_img is frame
+    np.testing.assert_allclose(
+        results.boxes.xywh,
+        [[304, 303, 50, 60], [604, 403, 50, 100], [100, 600, 40, 40]],
+        atol=0.1,
+    )
+    np.testing.assert_array_equal(results.boxes.cls, CLASSES)
+    assert tracker.frames_tracked == 1
+
+
+def test_tracks_from_the_last_tracked_frame(tracker, frame_at):
+    tracker.track(frame_at(4, 3))
+    results = tracker.track(frame_at(8, 6))
+
+    np.testing.assert_allclose(results.boxes.xywh[0], [308, 306, 50, 60], atol=0.1)
+
+
+def test_the_model_runs_every_interval(tracker, frame_at):
+    assert tracker.track(frame_at(1, 0)) is not None
+    assert tracker.track(frame_at(2, 0)) is not None
+    assert tracker.track(frame_at(3, 0)) is None
+
+
+def test_the_model_runs_when_the_tracking_is_lost(tracker, frame_at):
+    assert tracker.track(np.zeros_like(frame_at(0, 0))) is None
+    assert tracker.frames_tracked == 0
+
+
+def test_the_model_runs_without_fingers(frame_at):
+    tracker = FingertipTracker(interval=3, max_error=1.0)
+    frame = frame_at(0, 0)
+    tracker.reset(frame, to_results(BOXES[2:], CLASSES[2:], np.full(1, 0.9), frame))
+
+    assert tracker.track(frame_at(1, 0)) is None
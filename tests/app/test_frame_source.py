@@ -0,0 +1,215 @@
+# pylint: disable=missing-function-docstring,redefined-outer-name,protected-access,unused-argument
+import threading
+from unittest.mock import MagicMock, patch
+
+import cv2
+import numpy as np
+import pytest
+
+from cameratokeyboard.app.frame_source import (
+    CameraFrameSource,
+    ImageDirectoryFrameSource,
+    VideoFileFrameSource,
+    create_frame_source,
+    create_frame_sources,
+)
+from cameratokeyboard.config import Config
+from cameratokeyboard.types import FramePacing
+
+
+@pytest.fixture
+def frames():
+    return [MagicMock(name=f"frame_{i}") for i in range(5)]
+
+
+@pytest.fixture
+def mock_cap(frames):
+    # Every read waits for the test to allow it, so the test controls the pace of the
+    # grabbing thread.
+    allowed_reads = threading.Semaphore(0)
+    remaining = iter(frames)
+
+    def read():
+        allowed_reads.acquire()  # pylint: disable=consider-using-with
+        frame = next(remaining, None)
+        return (frame is not None, frame)
+
+    with patch("cv2.flip", side_effect=lambda frame, _: frame), patch(
+        "cv2.VideoCapture"
+    ) as mock_cap:
+        mock_cap.return_value.read.side_effect = read
+        mock_cap.allowed_reads = allowed_reads
+        yield mock_cap
+
+
+@pytest.fixture
+def frame_source(mock_cap):
+    source = CameraFrameSource(0, (1280, 720))
+    yield source
+    mock_cap.allowed_reads.release(100)
+    source.stop()
+
+
+def wait_for_grabs(frame_source, count):
+    with frame_source._condition:
+        frame_source._condition.wait_for(
+            lambda: frame_source._next_sequence >= count, timeout=1.0
+        )
+
+
+def test_initialization(mock_cap):
+    CameraFrameSource(2, (640, 480))
+
+    mock_cap.assert_called_once_with(2)
+    assert mock_cap.return_value.set.call_count == 2
+
+
+def test_read_returns_newest_frame(frame_source, mock_cap, frames):
+    frame_source.start()
+    mock_cap.allowed_reads.release(3)
+    wait_for_grabs(frame_source, 3)
+
+    captured = frame_source.read(timeout=1.0)
+
+    assert captured.image is frames[2]
+    assert captured.sequence == 2
+    assert captured.timestamp > 0
+    assert frame_source.dropped_frames == 2
+
+
+def test_read_waits_for_a_new_frame(frame_source, mock_cap, frames):
+    frame_source.start()
+    mock_cap.allowed_reads.release(1)
+    assert frame_source.read(timeout=1.0).image is frames[0]
+
+    assert frame_source.read(timeout=0.05) is None
+
+    mock_cap.allowed_reads.release(1)
+    assert frame_source.read(timeout=1.0).image is frames[1]
+    assert frame_source.dropped_frames == 0
+
+
+def test_read_after_source_is_exhausted(frame_source, mock_cap, frames):
+    frame_source.start()
+    mock_cap.allowed_reads.release(len(frames) + 1)
+
+    assert frame_source.read(timeout=1.0) is not None
+    frame_source._thread.join(timeout=1.0)
+
+    last = frame_source.read(timeout=1.0)
+    assert last is None or last.image is frames[-1]
+    assert frame_source.read(timeout=1.0) is None
+
+
+def test_stop(frame_source, mock_cap):
+    frame_source.start()
+    assert frame_source.is_running
+
+    mock_cap.allowed_reads.release(100)
+    frame_source.stop()
+
+    assert not frame_source.is_running
+    mock_cap.return_value.release.assert_called_once()
+
+
+@pytest.fixture
+def image_directory(tmp_path):
+    for i in range(5):
+        cv2.imwrite(
+            str(tmp_path / f"{i:05d}.jpg"), np.full((8, 8, 3), i * 50, np.uint8)
+        )
+    (tmp_path / "00000.txt").write_text("labels are ignored")
+
+    return tmp_path
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    path = str(tmp_path / "video.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10.0, (8, 8))
+    for i in range(3):
+        writer.write(np.full((8, 8, 3), i * 100, np.uint8))
+    writer.release()
+
+    return path
+
+
+def read_all(frame_source):
+    frames = []
+    while (frame := frame_source.read(timeout=1.0)) is not None:
+        frames.append(frame)
+
+    return frames
+
+
+def test_image_directory_at_max_speed_drops_nothing(image_directory):
+    source = ImageDirectoryFrameSource(
+        str(image_directory), extension="jpg", pacing=FramePacing.MAX_SPEED
+    )
+    source.start()
+
+    frames = read_all(source)
+    source.stop()
+
+    assert [f.sequence for f in frames] == list(range(5))
+    assert [int(f.image[0, 0, 0]) // 50 for f in frames] == list(range(5))
+    assert source.dropped_frames == 0
+
+
+def test_image_directory_realtime_pacing(image_directory):
+    source = ImageDirectoryFrameSource(
+        str(image_directory), extension="jpg", pacing=FramePacing.REALTIME, fps=100.0
+    )
+    source.start()
+    source._thread.join(timeout=1.0)
+
+    frames = read_all(source)
+    source.stop()
+
+    assert [f.sequence for f in frames] == [4]
+    assert source.dropped_frames == 4
+
+
+def test_image_directory_without_images(tmp_path):
+    with pytest.raises(ValueError):
+        ImageDirectoryFrameSource(str(tmp_path), extension="jpg")
+
+
+def test_video_file(video_file):
+    source = VideoFileFrameSource(video_file, pacing=FramePacing.MAX_SPEED)
+    source.start()
+
+    frames = read_all(source)
+    source.stop()
+
+    assert [f.sequence for f in frames] == [0, 1, 2]
+    assert source._fps == 10.0
+
+
+def test_video_file_not_found(tmp_path):
+    with pytest.raises(ValueError):
+        VideoFileFrameSource(str(tmp_path / "missing.avi"))
+
+
+def test_create_frame_source(mock_cap, image_directory, video_file):
+    assert isinstance(create_frame_source(Config()), CameraFrameSource)
+
+    source = create_frame_source(
+        Config(video_input_path=str(image_directory), replay_pacing="max")
+    )
+    assert isinstance(source, ImageDirectoryFrameSource)
+    assert source._pacing == FramePacing.MAX_SPEED
+
+    with patch("cameratokeyboard.app.frame_source.VideoFileFrameSource") as video:
+        create_frame_source(Config(video_input_path=video_file))
+        video.assert_called_once_with(video_file, pacing=FramePacing.REALTIME)
+
+
+def test_create_frame_sources(mock_cap):
+    assert [type(s) for s in create_frame_sources(Config())] == [CameraFrameSource]
+
+    sources = create_frame_sources(Config(video_input_devices=[0, 2]))
+
+    assert len(sources) == 2
+    assert all(isinstance(source, CameraFrameSource) for source in sources)
+    assert [c.args[0] for c in mock_cap.call_args_list[-2:]] == [0, 2]
@@ -0,0 +1,108 @@
+# pylint: disable=missing-function-docstring,redefined-outer-name,protected-access
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from cameratokeyboard.app.headless import HeadlessUI
+from cameratokeyboard.types import FrameState, Point
+
+
+@pytest.fixture
+def detected_frame_data():
+    return MagicMock(
+        state=FrameState.VALID,
+        down_keys=["a"],
+        marker_coordinates=[Point(1, 2), None],
+        finger_coordinates=[Point(3, 4)],
+        thumb_coordinates=[],
+        down_finger_coordinates=[Point(3, 4)],
+        requires_calibration=False,
+        is_calibration_in_progress=False,
+    )
+
+
+@pytest.fixture
+def output_path(tmp_path):
+    return str(tmp_path / "output.jsonl")
+
+
+def read_records(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_update_data(output_path, detected_frame_data):
+    ui = HeadlessUI(output=output_path)
+
+    ui.update_data(detected_frame_data)
+
+    [record] = read_records(output_path)
+    assert record["event"] == "frame"
+    assert record["state"] == "valid"
+    assert record["down_keys"] == ["a"]
+    assert record["markers"] == [[1.0, 2.0], None]
+    assert record["fingers"] == [[3.0, 4.0]]
+    assert record["thumbs"] == []
+    assert record["down_fingers"] == [[3.0, 4.0]]
+
+
+def test_update_text(output_path):
+    ui = HeadlessUI(output=output_path)
+
+    ui.update_text("a")
+    ui.update_text(" ")
+
+    assert read_records(output_path) == [
+        {"event": "key", "key": "a"},
+        {"event": "key", "key": " "},
+    ]
+
+
+def test_writes_to_stdout_by_default(capsys):
+    HeadlessUI().update_text("z")
+
+    assert json.loads(capsys.readouterr().out) == {"event": "key", "key": "z"}
+
+
+def test_calibration_starts_after_delay(output_path, detected_frame_data):
+    detected_frame_data.requires_calibration = True
+    ui = HeadlessUI(output=output_path, calibration_delay=1.0)
+
+    with patch("time.monotonic", return_value=100.0):
+        ui.update_data(detected_frame_data)
+    detected_frame_data.start_calibration.assert_not_called()
+
+    with patch("time.monotonic", return_value=101.5):
+        ui.update_data(detected_frame_data)
+    detected_frame_data.start_calibration.assert_called_once_with(
+        ui._on_calibration_complete
+    )
+
+    ui._on_calibration_complete()
+    assert [r for r in read_records(output_path) if r["event"] == "calibration"] == [
+        {"event": "calibration", "status": "started"},
+        {"event": "calibration", "status": "done"},
+    ]
+
+
+def test_calibration_waits_for_a_valid_frame(output_path, detected_frame_data):
+    detected_frame_data.requires_calibration = True
+    detected_frame_data.state = FrameState.MISSING_FINGERS
+    ui = HeadlessUI(output=output_path, calibration_delay=0.0)
+
+    ui.update_data(detected_frame_data)
+
+    detected_frame_data.start_calibration.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_until_stopped():
+    ui = HeadlessUI()
+    run_task = asyncio.create_task(ui.run())
+    await asyncio.sleep(0.01)
+    assert not run_task.done()
+
+    ui.stop()
+    await asyncio.wait_for(run_task, timeout=1.0)
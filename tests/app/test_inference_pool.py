@@ -0,0 +1,98 @@
+# pylint: disable=missing-function-docstring,redefined-outer-name
+import numpy as np
+import pytest
+
+from cameratokeyboard.app.inference_pool import InferencePool, ReorderBuffer
+from tests.helpers import crashing_inference_worker, fake_inference_worker
+
+
+@pytest.fixture
+def pool():
+    inference_pool = InferencePool(
+        "model.pt",
+        device="cpu",
+        iou=0.5,
+        workers=2,
+        worker_target=fake_inference_worker,
+    )
+    yield inference_pool
+    inference_pool.close()
+
+
+def frame_filled_with(value):
+    return np.full((4, 6, 3), value, dtype=np.uint8)
+
+
+def test_reorder_buffer():
+    buffer = ReorderBuffer()
+    buffer.add(1, "b")
+    assert buffer.pop() == (False, None)
+
+    buffer.add(0, "a")
+    assert len(buffer) == 2
+    assert buffer.pop() == (True, "a")
+    assert buffer.pop() == (True, "b")
+    assert buffer.pop() == (False, None)
+
+
+def test_results_are_returned_in_submission_order(pool):
+    for i in range(3):
+        assert pool.submit(frame_filled_with(i), context=f"frame {i}") == i
+
+    results = [pool.next_result() for _ in range(3)]
+
+    assert [context for context, _ in results] == ["frame 0", "frame 1", "frame 2"]
+    assert [float(r.boxes.conf[0]) for _, r in results] == [0.0, 1.0, 2.0]
+    assert results[1][1].orig_img[0, 0, 0] == 1
+    assert results[1][1].names == {0: "marker"}
+    assert pool.in_flight == 0
+
+
+def test_next_result_without_blocking(pool):
+    assert pool.next_result(block=False) is None
+
+    pool.submit(frame_filled_with(7))
+    assert pool.is_busy is False
+    pool.submit(frame_filled_with(8))
+    assert pool.is_busy is True
+
+    assert pool.next_result()[1].boxes.conf[0] == 7
+    assert pool.next_result()[1].boxes.conf[0] == 8
+    assert pool.next_result() is None
+
+
+def test_submit_blocks_until_a_slot_is_freed(pool):
+    for i in range(5):
+        pool.submit(frame_filled_with(i))
+
+    assert pool.in_flight == 5
+    assert [pool.next_result()[1].boxes.conf[0] for _ in range(5)] == list(range(5))
+
+
+def test_frame_larger_than_slot(pool):
+    pool.submit(frame_filled_with(0))
+
+    with pytest.raises(ValueError):
+        pool.submit(np.zeros((100, 100, 3), dtype=np.uint8))
+
+
+def test_dead_worker_is_restarted():
+    pool = InferencePool(
+        "model.pt",
+        device="cpu",
+        iou=0.5,
+        workers=1,
+        worker_target=crashing_inference_worker,
+    )
+    try:
+        pool.submit(frame_filled_with(255), context="crash")
+        pool.submit(frame_filled_with(1), context="lost")
+
+        assert pool.next_result() == ("crash", None)
+        assert pool.next_result() == ("lost", None)
+        assert pool.in_flight == 0
+
+        pool.submit(frame_filled_with(3))
+        assert pool.next_result()[1].boxes.conf[0] == 3
+    finally:
+        pool.close()
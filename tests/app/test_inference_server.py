@@ -0,0 +1,152 @@
+# pylint: disable=missing-function-docstring,redefined-outer-name,protected-access
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from cameratokeyboard.app.inference_server import InferenceServer
+from cameratokeyboard.app.remote_model import RemoteModel
+from cameratokeyboard.benchmark.typing_simulator import to_results
+from cameratokeyboard.config import Config
+
+
+class FakeDetector:
+    """
+    Detects a single finger, whose x is the value of the first pixel of the frame.
+    The first batch waits for the test to let it run, so the requests queue up.
+    """
+
+    def __init__(self):
+        self.batches = []
+        self.first_batch_started = threading.Event()
+        self.first_batch_allowed = threading.Event()
+
+    def infer_batch(self, frames):
+        self.first_batch_started.set()
+        self.first_batch_allowed.wait()
+        self.batches.append(len(frames))
+
+        return [
+            to_results(
+                np.array([[float(frame[0, 0, 0]), 20, 10, 10]]),
+                [0],
+                [0.9],
+                frame,
+            )
+            for frame in frames
+        ]
+
+
+@pytest.fixture
+def detector():
+    return FakeDetector()
+
+
+def start_server(detector, address, **config):
+    server = InferenceServer(
+        Config(serve_address=address, serve_max_wait_ms=50, **config)
+    )
+    server.start(detector)
+    return server
+
+
+def detect(address, value):
+    model = RemoteModel(address)
+    try:
+        frame = np.full((8, 8, 3), value, dtype=np.uint8)
+        return model(frame)[0].boxes.xywh[0, 0]
+    finally:
+        model.close()
+
+
+def test_batches_concurrent_requests(detector):
+    server = start_server(detector, "127.0.0.1:0", serve_max_batch_size=4)
+    address = f"127.0.0.1:{server.address[1]}"
+
+    try:
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            # The first request is stuck in the first batch, the others queue up.
+            futures = [executor.submit(detect, address, 10)]
+            detector.first_batch_started.wait(timeout=5)
+            futures += [executor.submit(detect, address, x) for x in range(20, 70, 10)]
+            while server._requests.qsize() < 5:
+                threading.Event().wait(0.01)
+            detector.first_batch_allowed.set()
+
+            xs = [future.result(timeout=5) for future in futures]
+
+        client = RemoteModel(address)
+        stats = client.stats()
+        client.close()
+    finally:
+        server.stop()
+
+    assert xs == [10, 20, 30, 40, 50, 60]
+    assert detector.batches == [1, 4, 1]
+    assert stats.frames == 6
+    assert stats.batches == 3
+    assert stats.mean_batch_size == 2
+    assert stats.batch_sizes == {1: 2, 4: 1}
+    assert stats.throughput > 0
+
+
+def test_frames_of_one_request_are_batched_together(detector):
+    detector.first_batch_allowed.set()
+    server = start_server(detector, "127.0.0.1:0")
+
+    model = RemoteModel(f"127.0.0.1:{server.address[1]}")
+    try:
+        frames = [np.full((8, 8, 3), x, dtype=np.uint8) for x in (10, 20, 30)]
+        results = model(frames)
+    finally:
+        model.close()
+        server.stop()
+
+    assert [result.boxes.xywh[0, 0] for result in results] == [10, 20, 30]
+    assert detector.batches == [3]
+
+
+def test_unix_socket(detector, tmp_path):
+    path = tmp_path / "c2k.sock"
+    detector.first_batch_allowed.set()
+    server = start_server(detector, f"unix:{path}")
+
+    try:
+        assert detect(f"unix:{path}", 42) == 42
+    finally:
+        server.stop()
+
+    assert not path.exists()
+
+
+def test_inference_errors_are_sent_back(detector):
+    detector.infer_batch = MagicMock(side_effect=ValueError("bad frame"))
+    server = start_server(detector, "127.0.0.1:0")
+
+    try:
+        with pytest.raises(RuntimeError, match="bad frame"):
+            detect(f"127.0.0.1:{server.address[1]}", 0)
+    finally:
+        server.stop()
+
+
+def test_run():
+    server = InferenceServer(Config(serve_address="127.0.0.1:0"))
+
+    with patch(
+        "cameratokeyboard.app.inference_server.ModelDownloader"
+    ) as downloader, patch(
+        "cameratokeyboard.app.inference_server.Detector"
+    ) as detector_class, patch.object(
+        server._stopped,
+        "wait",
+        side_effect=KeyboardInterrupt,
+    ):
+        server.run()
+
+    downloader.return_value.run.assert_called_once()
+    detector_class.return_value.warm_up.assert_called_once_with((720, 1280, 3))
+    detector_class.return_value.close.assert_called_once()
+    assert server.address is None
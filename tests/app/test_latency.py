@@ -0,0 +1,77 @@
+# pylint: disable=missing-function-docstring
+import json
+import math
+from unittest.mock import patch
+
+import pytest
+
+from cameratokeyboard.app.latency import FrameTrace, LatencyHistogram, LatencyTracker
+
+
+def trace_with_latencies(**latencies):
+    trace = FrameTrace(capture_timestamp=100.0, sequence=0)
+
+    for stage, latency in latencies.items():
+        with patch("time.monotonic", return_value=100.0 + latency):
+            trace.mark(stage)
+
+    return trace
+
+
+def test_frame_trace():
+    trace = trace_with_latencies(inference=0.02, output=0.05)
+
+    assert trace.latencies() == pytest.approx({"inference": 0.02, "output": 0.05})
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram()
+
+    assert all(math.isnan(p) for p in histogram.percentiles(50, 99))
+
+    for i in range(1, 101):
+        histogram.add(i / 1000)
+
+    p50, p95, p99 = histogram.percentiles(50, 95, 99)
+    assert p50 == pytest.approx(0.0505)
+    assert p95 == pytest.approx(0.09505)
+    assert p99 == pytest.approx(0.09901)
+    assert histogram.count == 100
+
+
+def test_latency_histogram_window():
+    histogram = LatencyHistogram(window_size=10)
+
+    for i in range(100):
+        histogram.add(i)
+
+    assert histogram.percentiles(0) == [90]
+    assert histogram.count == 100
+
+
+def test_latency_tracker():
+    tracker = LatencyTracker()
+    tracker.record(trace_with_latencies(inference=0.01, output=0.04))
+    tracker.record(trace_with_latencies(inference=0.03))
+
+    inference, output = tracker.summary()
+
+    assert inference.stage == "inference"
+    assert inference.count == 2
+    assert inference.p50 == pytest.approx(0.02)
+    assert output.stage == "output"
+    assert output.count == 1
+    assert output.p99 == pytest.approx(0.04)
+
+
+def test_latency_tracker_dump(tmp_path):
+    tracker = LatencyTracker()
+    tracker.record(trace_with_latencies(inference=0.01))
+    path = tmp_path / "latency.json"
+
+    tracker.dump(str(path))
+
+    report = json.loads(path.read_text(encoding="utf-8"))
+    assert report["inference"]["count"] == 1
+    assert report["inference"]["p50_ms"] == pytest.approx(10)
+    assert report["inference"]["p99_ms"] == pytest.approx(10)
@@ -0,0 +1,79 @@
+# pylint: disable=missing-function-docstring,redefined-outer-name
+import numpy as np
+import pytest
+
+from cameratokeyboard.app.motion_gate import MotionGate
+from cameratokeyboard.types import Point
+
+
+@pytest.fixture
+def gate():
+    return MotionGate(threshold=2.0, max_skipped_frames=3)
+
+
+@pytest.fixture
+def frame():
+    return np.full((720, 1280, 3), 100, dtype=np.uint8)
+
+
+@pytest.fixture
+def markers():
+    return [Point(400, 600), Point(400, 450), Point(880, 450), Point(880, 600)]
+
+
+def test_first_frame_has_motion(gate, frame):
+    assert gate.has_motion(frame)
+    assert gate.frames_checked == 1
+    assert gate.inferences_saved == 0
+
+
+def test_static_frames_are_skipped(gate, frame):
+    gate.has_motion(frame)
+
+    assert not gate.has_motion(frame.copy())
+    assert not gate.has_motion(frame.copy())
+    assert gate.inferences_saved == 2
+
+
+def test_changed_frame_has_motion(gate, frame):
+    gate.has_motion(frame)
+
+    assert gate.has_motion(frame + 10)
+    assert not gate.has_motion(frame + 10)
+
+
+def test_max_skipped_frames(gate, frame):
+    gate.has_motion(frame)
+
+    assert [gate.has_motion(frame) for _ in range(5)] == [
+        False,
+        False,
+        False,
+        True,
+        False,
+    ]
+
+
+def test_motion_outside_the_keyboard_is_ignored(gate, frame, markers):
+    gate.has_motion(frame, markers)
+
+    moved = frame.copy()
+    moved[:100, :] = 255
+    assert not gate.has_motion(moved, markers)
+    assert gate.has_motion(moved)
+
+
+def test_motion_inside_the_keyboard(gate, frame, markers):
+    gate.has_motion(frame, markers)
+
+    moved = frame.copy()
+    moved[450:600, 400:880] = 150
+    assert gate.has_motion(moved, markers)
+
+
+def test_missing_markers_compare_the_whole_frame(gate, frame, markers):
+    gate.has_motion(frame, markers[:3] + [None])
+
+    moved = frame.copy()
+    moved[:100, :] = 255
+    assert gate.has_motion(moved, markers[:3] + [None])
@@ -0,0 +1,216 @@
+# pylint: disable=missing-function-docstring,redefined-outer-name
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from cameratokeyboard.app.onnx_backend import (
+    LETTERBOX_COLOR,
+    OnnxModel,
+    export_to_onnx,
+    letterbox,
+    postprocess,
+    to_input_tensor,
+)
+
+NAMES = {0: "finger", 1: "thumb", 2: "marker"}
+
+
+def raw_output(boxes):
+    """
+    Builds a (1, 4 + 3 classes, n) model output out of (cx, cy, w, h, class, score)
+    rows.
+    """
+    output = np.zeros((1, 7, len(boxes)), dtype=np.float32)
+    for i, (cx, cy, w, h, cls, score) in enumerate(boxes):
+        output[0, :4, i] = [cx, cy, w, h]
+        output[0, 4 + cls, i] = score
+    return output
+
+
+def test_letterbox_pads_to_a_multiple_of_the_stride():
+    image = np.zeros((480, 720, 3), dtype=np.uint8)
+
+    letterboxed, scale, padding = letterbox(image, 640)
+
+    # 720x480 is scaled to 640x427, then padded to 640x448.
+    assert letterboxed.shape == (448, 640, 3)
+    assert scale == pytest.approx(640 / 720)
+    assert padding == (0, 10)
+    assert tuple(letterboxed[0, 0]) == LETTERBOX_COLOR
+    assert tuple(letterboxed[224, 320]) == (0, 0, 0)
+
+
+def test_letterbox_without_resizing():
+    image = np.zeros((320, 320, 3), dtype=np.uint8)
+
+    letterboxed, scale, padding = letterbox(image, 320)
+
+    assert letterboxed.shape == (320, 320, 3)
+    assert scale == 1
+    assert padding == (0, 0)
+
+
+def test_to_input_tensor():
+    image = np.zeros((64, 32, 3), dtype=np.uint8)
+    image[..., 0] = 255  # blue
+
+    tensor = to_input_tensor(image)
+
+    assert tensor.shape == (1, 3, 64, 32)
+    assert tensor.dtype == np.float32
+    assert tensor[0, 2].max() == 1.0
+    assert tensor[0, 0].max() == 0.0
+
+
+def test_postprocess_filters_suppresses_and_undoes_the_letterbox():
+    output = raw_output(
+        [
+            (100, 110, 20, 20, 0, 0.9),
+            (101, 111, 20, 20, 0, 0.8),  # overlaps the first finger
+            (101, 111, 20, 20, 2, 0.7),  # overlaps it too, but is a marker
+            (300, 300, 40, 40, 1, 0.6),
+            (500, 500, 40, 40, 1, 0.1),  # not confident enough
+        ]
+    )
+
+    boxes = postprocess(
+        output,
+        scale=0.5,
+        padding=(0, 20),
+        image_shape=(600, 800),
+        confidence=0.25,
+        iou=0.5,
+    )
+
+    assert boxes.shape == (3, 6)
+    np.testing.assert_allclose(
+        boxes,
+        [
+            [180, 160, 220, 200, 0.9, 0],
+            [182, 162, 222, 202, 0.7, 2],
+            [560, 520, 640, 600, 0.6, 1],
+        ],
+        rtol=1e-6,
+    )
+
+
+def test_postprocess_clips_to_the_image():
+    output = raw_output([(5, 5, 20, 20, 0, 0.9)])
+
+    boxes = postprocess(output, 1.0, (0, 0), (100, 100), 0.25, 0.5)
+
+    np.testing.assert_allclose(boxes[0, :4], [0, 0, 15, 15])
+
+
+def test_postprocess_without_detections():
+    output = raw_output([(5, 5, 20, 20, 0, 0.1)])
+
+    assert postprocess(output, 1.0, (0, 0), (100, 100), 0.25, 0.5).shape == (0, 6)
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    path = tmp_path / "model.pt"
+    path.write_bytes(b"weights")
+    return str(path)
+
+
+def test_export_to_onnx_is_cached(model_path):
+    onnx_path = model_path.replace(".pt", ".onnx")
+
+    def export(**_):
+        with open(onnx_path, "wb") as file:
+            file.write(b"onnx")
+        return onnx_path
+
+    with patch("ultralytics.YOLO") as yolo:
+        yolo.return_value.export.side_effect = export
+
+        assert export_to_onnx(model_path) == onnx_path
+        assert export_to_onnx(model_path) == onnx_path
+
+    yolo.assert_called_once_with(model_path)
+
+
+def test_export_to_onnx_again_when_the_model_is_newer(model_path):
+    onnx_path = model_path.replace(".pt", ".onnx")
+    with open(onnx_path, "wb") as file:
+        file.write(b"stale")
+    os.utime(onnx_path, (0, 0))
+
+    with patch("ultralytics.YOLO") as yolo:
+        yolo.return_value.export.return_value = onnx_path
+        export_to_onnx(model_path)
+
+    yolo.return_value.export.assert_called_once()
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    session.get_inputs.return_value = [MagicMock()]
+    session.get_inputs.return_value[0].name = "images"
+    session.get_modelmeta.return_value.custom_metadata_map = {
+        "names": str(NAMES),
+        "imgsz": "[640, 640]",
+    }
+    session.run.return_value = [raw_output([(320, 240, 64, 64, 2, 0.9)])]
+    return session
+
+
+def test_onnx_model(session):
+    onnxruntime = MagicMock()
+    onnxruntime.InferenceSession.return_value = session
+    with patch.dict(sys.modules, {"onnxruntime": onnxruntime}):
+        model = OnnxModel("model.onnx")
+
+    assert onnxruntime.InferenceSession.call_args.kwargs["providers"] == [
+        "CPUExecutionProvider"
+    ]
+    assert model.names == NAMES
+
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    results = model(frame, "cpu", iou=0.5)
+
+    assert len(results) == 1
+    assert results[0].names == NAMES
+    assert results[0].orig_img is frame
+    np.testing.assert_allclose(results[0].boxes.xywh, [[320, 240, 64, 64]], rtol=1e-6)
+    np.testing.assert_allclose(results[0].boxes.cls, [2])
+    assert session.run.call_args.args[1]["images"].shape == (1, 3, 480, 640)
+
+
+def test_onnx_model_without_onnxruntime():
+    with patch.dict(sys.modules, {"onnxruntime": None}):
+        with pytest.raises(ImportError, match="pip install onnxruntime"):
+            OnnxModel("model.onnx")
+
+
+def test_onnx_model_batch(session):
+    session.run.side_effect = lambda _, inputs: [
+        np.concatenate(
+            [raw_output([(320, 240, 64, 64, 2, 0.9)])] * len(inputs["images"])
+        )
+    ]
+    onnxruntime = MagicMock()
+    onnxruntime.InferenceSession.return_value = session
+    with patch.dict(sys.modules, {"onnxruntime": onnxruntime}):
+        model = OnnxModel("model.onnx")
+
+    frames = [
+        np.zeros((480, 640, 3), dtype=np.uint8),
+        np.zeros((320, 320, 3), dtype=np.uint8),
+        np.zeros((480, 640, 3), dtype=np.uint8),
+    ]
+    results = model(frames)
+
+    # The frames of the same size are run together.
+    assert [c.args[1]["images"].shape for c in session.run.call_args_list] == [
+        (2, 3, 480, 640),
+        (1, 3, 640, 640),
+    ]
+    assert [r.orig_img is f for r, f in zip(results, frames)] == [True] * 3
+    np.testing.assert_allclose(results[1].boxes.xywh, [[160, 120, 32, 32]], rtol=1e-6)
@@ -0,0 +1,171 @@
+# pylint: disable=missing-function-docstring,redefined-outer-name,protected-access
+import threading
+
+import pytest
+
+from cameratokeyboard.app.pipeline import END_OF_STREAM, Pipeline, StageQueue
+from cameratokeyboard.types import DropPolicy
+
+
+def counting_source(count):
+    items = iter(range(count))
+
+    def source():
+        return next(items, None)
+
+    return source
+
+
+@pytest.fixture
+def stop_event():
+    return threading.Event()
+
+
+def test_stage_queue_drop_oldest(stop_event):
+    stage_queue = StageQueue(2, DropPolicy.DROP_OLDEST, stop_event)
+
+    for i in range(4):
+        stage_queue.put(i)
+
+    assert stage_queue.depth == 2
+    assert stage_queue.dropped == 2
+    assert [stage_queue.get(), stage_queue.get()] == [2, 3]
+
+
+def test_stage_queue_drop_newest(stop_event):
+    stage_queue = StageQueue(2, DropPolicy.DROP_NEWEST, stop_event)
+
+    for i in range(4):
+        stage_queue.put(i)
+
+    assert stage_queue.dropped == 2
+    assert [stage_queue.get(), stage_queue.get()] == [0, 1]
+
+
+def test_stage_queue_block_is_interrupted_by_stop(stop_event):
+    stage_queue = StageQueue(1, DropPolicy.BLOCK, stop_event)
+    stage_queue.put(0)
+
+    stop_event.set()
+    stage_queue.put(1)
+
+    assert stage_queue.dropped == 0
+    assert stage_queue.depth == 1
+
+
+def test_stage_queue_end_of_stream_is_never_dropped(stop_event):
+    stage_queue = StageQueue(1, DropPolicy.DROP_NEWEST, stop_event)
+    stage_queue.put(0)
+
+    stage_queue.put_end_of_stream()
+
+    assert stage_queue.get() is END_OF_STREAM
+
+
+def test_stage_queue_end_of_stream_waits_for_room_when_blocking(stop_event):
+    stage_queue = StageQueue(1, DropPolicy.BLOCK, stop_event)
+    stage_queue.put(0)
+
+    thread = threading.Thread(target=stage_queue.put_end_of_stream)
+    thread.start()
+    thread.join(0.2)
+    assert thread.is_alive()
+
+    assert stage_queue.get() == 0
+    thread.join()
+    assert stage_queue.get() is END_OF_STREAM
+    assert stage_queue.dropped == 0
+
+
+def test_pipeline_runs_all_stages_in_order():
+    pipeline = Pipeline(
+        source=counting_source(5),
+        stages=[("double", lambda x: x * 2), ("increment", lambda x: x + 1)],
+        queue_size=10,
+        drop_policy=DropPolicy.BLOCK,
+    )
+    pipeline.start()
+
+    results = []
+    while (item := pipeline.get(timeout=1.0)) is not None:
+        results.append(item)
+    pipeline.stop()
+
+    assert results == [1, 3, 5, 7, 9]
+
+
+def test_pipeline_handler_returning_none_drops_the_item():
+    pipeline = Pipeline(
+        source=counting_source(4),
+        stages=[("odd_only", lambda x: x if x % 2 else None)],
+        queue_size=10,
+        drop_policy=DropPolicy.BLOCK,
+    )
+    pipeline.start()
+
+    results = []
+    while (item := pipeline.get(timeout=1.0)) is not None:
+        results.append(item)
+    pipeline.stop()
+
+    assert results == [1, 3]
+
+
+def test_pipeline_keeps_going_after_a_failing_item():
+    def handler(x):
+        if x == 1:
+            raise ValueError("boom")
+        return x
+
+    pipeline = Pipeline(
+        source=counting_source(3),
+        stages=[("flaky", handler)],
+        queue_size=10,
+        drop_policy=DropPolicy.BLOCK,
+    )
+    pipeline.start()
+
+    results = []
+    while (item := pipeline.get(timeout=1.0)) is not None:
+        results.append(item)
+    pipeline.stop()
+
+    assert results == [0, 2]
+
+
+def test_pipeline_get_timeout():
+    release = threading.Event()
+
+    def source():
+        release.wait()
+
+    pipeline = Pipeline(source=source, stages=[])
+    pipeline.start()
+
+    assert pipeline.get(timeout=0.05) is None
+
+    release.set()
+    pipeline.stop()
+
+
+def test_pipeline_stats():
+    pipeline = Pipeline(
+        source=counting_source(3),
+        stages=[("identity", lambda x: x)],
+        queue_size=5,
+        drop_policy=DropPolicy.BLOCK,
+    )
+    pipeline.start()
+    while pipeline.get(timeout=1.0) is not None:
+        pass
+    pipeline.stop()
+
+    stats = {s.name: s for s in pipeline.stats()}
+
+    assert list(stats) == ["capture", "identity", "output"]
+    assert stats["capture"].processed == 3
+    assert stats["identity"].processed == 3
+    assert stats["identity"].queue_size == 5
+    assert stats["identity"].dropped == 0
+    assert stats["identity"].service_time >= 0.0
+    assert stats["output"].queue_depth == 0
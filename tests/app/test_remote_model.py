@@ -0,0 +1,115 @@
+# pylint: disable=missing-function-docstring,redefined-outer-name
+import socket
+import threading
+
+import numpy as np
+import pytest
+
+from cameratokeyboard.app.remote_model import (
+    RemoteModel,
+    parse_address,
+    receive_message,
+    send_message,
+)
+
+
+def test_parse_address():
+    assert parse_address("127.0.0.1:8765") == (socket.AF_INET, ("127.0.0.1", 8765))
+    assert parse_address("localhost:0") == (socket.AF_INET, ("localhost", 0))
+    assert parse_address("unix:/tmp/c2k.sock") == (socket.AF_UNIX, "/tmp/c2k.sock")
+
+
+@pytest.mark.parametrize("address", ["8765", "localhost", "localhost:port"])
+def test_parse_invalid_address(address):
+    with pytest.raises(ValueError):
+        parse_address(address)
+
+
+def test_messages():
+    left, right = socket.socketpair()
+    body = bytes(range(256)) * 1000
+
+    def send():
+        send_message(left, {"type": "detect", "shape": [1, 2, 3]}, body)
+        send_message(left, {"type": "stats"})
+
+    # The body is larger than the socket buffers, so it's sent as it's received.
+    thread = threading.Thread(target=send)
+    thread.start()
+
+    assert receive_message(right) == ({"type": "detect", "shape": [1, 2, 3]}, body)
+    assert receive_message(right) == ({"type": "stats"}, b"")
+    thread.join()
+
+    left.close()
+    assert receive_message(right) is None
+    right.close()
+
+
+def serve_once(server_socket, response):
+    connection, _ = server_socket.accept()
+    with connection:
+        header, body = receive_message(connection)
+        send_message(connection, *response(header, body))
+
+
+@pytest.fixture
+def server_socket():
+    server_socket = socket.socket()
+    server_socket.bind(("127.0.0.1", 0))
+    server_socket.listen()
+    yield server_socket
+    server_socket.close()
+
+
+def test_remote_model(server_socket):
+    received = {}
+
+    def response(header, body):
+        received.update(header=header, frames=body)
+        boxes = np.array([[1, 2, 3, 4, 0.9, 2], [5, 6, 7, 8, 0.8, 0]], dtype="<f4")
+        return {
+            "names": {"0": "finger", "2": "marker"},
+            "shapes": [[1, 6], [0, 6], [1, 6]],
+        }, boxes.tobytes()
+
+    thread = threading.Thread(target=serve_once, args=(server_socket, response))
+    thread.start()
+
+    model = RemoteModel(f"127.0.0.1:{server_socket.getsockname()[1]}")
+    frames = [
+        np.arange(24, dtype=np.uint8).reshape(2, 4, 3),
+        np.zeros((1, 1, 3), dtype=np.uint8),
+        np.ones((3, 2, 3), dtype=np.uint8),
+    ]
+    results = model(frames, "cpu", iou=0.5)
+    model.close()
+    thread.join()
+
+    assert received["header"] == {
+        "type": "detect",
+        "shapes": [[2, 4, 3], [1, 1, 3], [3, 2, 3]],
+    }
+    assert received["frames"] == b"".join(frame.tobytes() for frame in frames)
+    assert model.names == {0: "finger", 2: "marker"}
+    assert len(results) == 3
+    assert [result.orig_img for result in results] == frames
+    np.testing.assert_allclose(results[0].boxes.data, [[1, 2, 3, 4, 0.9, 2]])
+    assert len(results[1].boxes) == 0
+    np.testing.assert_allclose(results[2].boxes.data, [[5, 6, 7, 8, 0.8, 0]])
+
+
+def test_remote_model_inference_error(server_socket):
+    thread = threading.Thread(
+        target=serve_once,
+        args=(server_socket, lambda *_: ({"error": "out of memory"}, b"")),
+    )
+    thread.start()
+
+    model = RemoteModel(f"127.0.0.1:{server_socket.getsockname()[1]}")
+    with pytest.raises(RuntimeError, match="out of memory"):
+        model(np.zeros((2, 2, 3), dtype=np.uint8))
+    thread.join()
+
+    with pytest.raises(ConnectionError):
+        model(np.zeros((2, 2, 3), dtype=np.uint8))
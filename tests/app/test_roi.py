@@ -0,0 +1,79 @@
+# pylint: disable=missing-function-docstring,redefined-outer-name
+import numpy as np
+import pytest
+from ultralytics.engine.results import Results
+
+from cameratokeyboard.app import roi
+from cameratokeyboard.types import Point
+
+NAMES = {0: "finger", 1: "marker"}
+
+
+@pytest.fixture
+def markers():
+    return [Point(300, 600), Point(340, 450), Point(940, 450), Point(980, 600)]
+
+
+@pytest.fixture
+def frame():
+    return np.zeros((720, 1280, 3), dtype=np.uint8)
+
+
+def test_keyboard_region(markers, frame):
+    assert roi.keyboard_region(markers, frame.shape, margin=0.1) == (
+        232,
+        382,
+        1048,
+        668,
+    )
+
+
+def test_keyboard_region_is_clipped_to_the_frame(markers, frame):
+    assert roi.keyboard_region(markers, frame.shape, margin=0.5) == (0, 110, 1280, 720)
+
+
+def test_keyboard_region_with_missing_markers(markers, frame):
+    assert roi.keyboard_region(markers[:3] + [None], frame.shape, margin=0.1) is None
+    assert roi.keyboard_region([], frame.shape, margin=0.1) is None
+
+
+def test_crop(frame):
+    assert roi.crop(frame, (10, 20, 110, 70)).shape == (50, 100, 3)
+
+
+def test_to_full_frame_results(frame):
+    roi_frame = roi.crop(frame, (100, 200, 500, 400))
+    roi_results = Results(
+        orig_img=roi_frame,
+        path=None,
+        names=NAMES,
+        boxes=np.array([[10, 20, 30, 40, 0.9, 1]], dtype=np.float32),
+    )
+
+    results = roi.to_full_frame_results(roi_results, frame, (100, 200, 500, 400))
+
+    assert results.orig_img is frame
+    assert results.names == NAMES
+    assert results.boxes.xyxy.tolist() == [[110, 220, 130, 240]]
+    assert results.boxes.conf.tolist() == pytest.approx([0.9])
+    assert results.boxes.cls.tolist() == [1]
+    assert roi_results.boxes.xyxy.tolist() == [[10, 20, 30, 40]]
+
+
+def test_count_confident_detections(frame):
+    results = Results(
+        orig_img=frame,
+        path=None,
+        names=NAMES,
+        boxes=np.array(
+            [
+                [0, 0, 1, 1, 0.9, 1],
+                [0, 0, 1, 1, 0.2, 1],
+                [0, 0, 1, 1, 0.9, 0],
+            ],
+            dtype=np.float32,
+        ),
+    )
+
+    assert roi.count_confident_detections(results, "marker", 0.3) == 1
+    assert roi.count_confident_detections(results, "thumb", 0.3) == 0
@@ -0,0 +1,23 @@
+# pylint: disable=missing-function-docstring
+import numpy as np
+
+from cameratokeyboard.benchmark.detections import DetectionRecorder, load_detections
+from cameratokeyboard.benchmark.typing_simulator import synthetic_detections
+
+
+def test_record_and_load(tmp_path):
+    detections = synthetic_detections(3)
+    path = str(tmp_path / "detections.jsonl")
+
+    recorder = DetectionRecorder(path)
+    for results in detections:
+        recorder.write(results)
+    recorder.close()
+
+    loaded = load_detections(path)
+
+    assert len(loaded) == 3
+    for original, results in zip(detections, loaded):
+        assert results.names == original.names
+        assert results.orig_img.shape == original.orig_img.shape
+        assert np.allclose(results.boxes.data, original.boxes.data)
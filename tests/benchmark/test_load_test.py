@@ -0,0 +1,29 @@
+# pylint: disable=missing-function-docstring
+from cameratokeyboard.benchmark import LoadTest
+from cameratokeyboard.config import Config
+
+
+def test_run():
+    result = LoadTest(Config(load_test_text="hello", load_test_repeat=2)).run()
+
+    assert result.frames == 120 + 11 * 18
+    assert result.frames_per_second > 0
+    assert result.p99_us > 0
+    assert result.expected_text == "hello hello"
+    assert result.typed_text == "hello hello"
+    assert result.accuracy == 1.0
+
+
+def test_run_with_noisy_detections():
+    result = LoadTest(
+        Config(
+            load_test_text="hello",
+            load_test_repeat=2,
+            load_test_jitter=3.0,
+            load_test_miss_rate=0.05,
+            load_test_false_positive_rate=0.2,
+        )
+    ).run()
+
+    assert result.expected_text == "hello hello"
+    assert 0 <= result.accuracy <= 1
@@ -0,0 +1,62 @@
+# pylint: disable=missing-function-docstring,redefined-outer-name
+import pytest
+
+from cameratokeyboard.benchmark import Benchmark
+from cameratokeyboard.benchmark.cases import CASES
+from cameratokeyboard.benchmark.runner import load_results, save_results
+from cameratokeyboard.config import Config
+from cameratokeyboard.types import BenchmarkResult
+
+
+@pytest.fixture
+def config():
+    return Config(benchmark_iterations=20)
+
+
+def test_run(config):
+    results = Benchmark(config).run()
+
+    assert [r.name for r in results] == list(CASES)
+    for result in results:
+        assert result.calls == 20
+        assert 0 < result.median_us <= result.p95_us
+        assert result.mean_us > 0
+        assert result.peak_bytes >= 0
+
+
+def test_run_with_recorded_detections(config, tmp_path):
+    calls = []
+
+    def case(detections, _):
+        return lambda i: calls.append(detections[i % len(detections)])
+
+    path = tmp_path / "detections.jsonl"
+    path.write_text(
+        '{"shape": [4, 4, 3], "names": {"0": "finger"}, '
+        '"boxes": [[0, 0, 1, 1, 0.9, 0]]}\n',
+        encoding="utf-8",
+    )
+    config.benchmark_detections_path = str(path)
+
+    Benchmark(config, cases={"case": case}).run()
+
+    assert calls[0].boxes.data.tolist() == [[0, 0, 1, 1, pytest.approx(0.9), 0]]
+
+
+def test_save_and_compare_with_baseline(config, tmp_path, caplog):
+    baseline_path = str(tmp_path / "baseline.json")
+    save_results(
+        [
+            BenchmarkResult("slow", 1, 1e-6, 1e-6, 1e-6, 0),
+            BenchmarkResult("fast", 1, 1e6, 1e6, 1e6, 0),
+        ],
+        baseline_path,
+    )
+    config.benchmark_baseline_path = baseline_path
+    config.benchmark_output_path = str(tmp_path / "results.json")
+    cases = {"slow": lambda *_: lambda i: None, "fast": lambda *_: lambda i: None}
+
+    results = Benchmark(config, cases=cases).run()
+
+    assert load_results(config.benchmark_output_path) == results
+    assert "Slower than the baseline by more than 10%: slow" in caplog.text
@@ -0,0 +1,76 @@
+# pylint: disable=missing-function-docstring
+import numpy as np
+import pytest
+
+from cameratokeyboard.benchmark.typing_simulator import (
+    TypingSimulator,
+    synthetic_detections,
+)
+from cameratokeyboard.config import Config
+from cameratokeyboard.core.detected_frame import DetectedFrame
+
+
+def type_with(simulator):
+    frames = list(simulator.frames())
+    detected_frame = DetectedFrame(frames[0].results, Config())
+    detected_frame.start_calibration(None)
+
+    typed = []
+    for frame in frames:
+        was_down = set(detected_frame.down_keys)
+        detected_frame.update(frame.results)
+        typed += [key for key in detected_frame.down_keys if key not in was_down]
+
+    return "".join(typed)
+
+
+def test_frames():
+    simulator = TypingSimulator(text="ab", jitter=0.0, rest_frames=5)
+    frames = list(simulator.frames())
+
+    assert len(frames) == 5 + 2 * 18
+    assert [f.pressed_key for f in frames[:5]] == [None] * 5
+    assert [f.pressed_key for f in frames if f.pressed_key] == ["a"] * 4 + ["b"] * 4
+
+    for frame in frames:
+        classes = frame.results.boxes.cls.tolist()
+        assert classes.count(0) == 8
+        assert classes.count(1) == 2
+        assert classes.count(2) == 4
+
+
+def test_typed_keys_are_detected():
+    simulator = TypingSimulator(text="hello world; qaz", jitter=0.5)
+
+    assert type_with(simulator) == "hello world; qaz"
+
+
+def test_frames_are_repeatable():
+    def boxes(seed):
+        simulator = TypingSimulator(
+            text="a", miss_rate=0.1, false_positive_rate=0.5, seed=seed
+        )
+        return [f.results.boxes.data for f in simulator.frames()]
+
+    assert all(np.array_equal(a, b) for a, b in zip(boxes(1), boxes(1)))
+    assert not all(np.array_equal(a, b) for a, b in zip(boxes(1), boxes(2)))
+
+
+def test_missed_detections_and_false_positives():
+    missing = TypingSimulator(text="", miss_rate=1.0, rest_frames=3)
+    assert all(len(f.results.boxes) == 0 for f in missing.frames())
+
+    spurious = TypingSimulator(text="", false_positive_rate=1.0, rest_frames=3)
+    assert all(len(f.results.boxes) == 15 for f in spurious.frames())
+
+
+def test_unsupported_characters():
+    with pytest.raises(ValueError):
+        TypingSimulator(text="Hello!")
+
+
+def test_synthetic_detections():
+    detections = synthetic_detections(1000)
+
+    assert len(detections) == 1000
+    assert all(len(results.boxes) == 14 for results in detections)
@@ -1,4 +1,5 @@
 # pylint: disable=missing-function-docstring,protected-access
+import numpy as np
 import pytest
 
 from cameratokeyboard.core.detected_objects import DetectedFingersAndThumbs
@@ -44,16 +45,36 @@ def test_get_calibration_for():
     for finger_boxes, thumb_boxes in boxes:
         strategy.append(DetectedFingersAndThumbs(finger_boxes, thumb_boxes))
 
-    assert strategy.get_calibration_for(Fingers.LEFT_PINKY) == -28.4
-    assert strategy.get_calibration_for(Fingers.LEFT_RING) == -16.6
-    assert strategy.get_calibration_for(Fingers.LEFT_MIDDLE) == 11.6
-    assert strategy.get_calibration_for(Fingers.LEFT_INDEX) == -11.6
-    assert strategy.get_calibration_for(Fingers.LEFT_THUMB) == 27.0
-    assert strategy.get_calibration_for(Fingers.RIGHT_THUMB) == 31.6
-    assert strategy.get_calibration_for(Fingers.RIGHT_INDEX) == -15.6
-    assert strategy.get_calibration_for(Fingers.RIGHT_MIDDLE) == 15.6
-    assert strategy.get_calibration_for(Fingers.RIGHT_RING) == 1.0
-    assert strategy.get_calibration_for(Fingers.RIGHT_PINKY) == -26.0
+    assert strategy.get_calibration_for(Fingers.LEFT_PINKY) == pytest.approx(
+        -28.24, abs=0.01
+    )
+    assert strategy.get_calibration_for(Fingers.LEFT_RING) == pytest.approx(
+        -16.96, abs=0.01
+    )
+    assert strategy.get_calibration_for(Fingers.LEFT_MIDDLE) == pytest.approx(
+        11.84, abs=0.01
+    )
+    assert strategy.get_calibration_for(Fingers.LEFT_INDEX) == pytest.approx(
+        -11.84, abs=0.01
+    )
+    assert strategy.get_calibration_for(Fingers.LEFT_THUMB) == pytest.approx(
+        27.15, abs=0.01
+    )
+    assert strategy.get_calibration_for(Fingers.RIGHT_THUMB) == pytest.approx(
+        31.95, abs=0.01
+    )
+    assert strategy.get_calibration_for(Fingers.RIGHT_INDEX) == pytest.approx(
+        -15.76, abs=0.01
+    )
+    assert strategy.get_calibration_for(Fingers.RIGHT_MIDDLE) == pytest.approx(
+        15.76, abs=0.01
+    )
+    assert strategy.get_calibration_for(Fingers.RIGHT_RING) == pytest.approx(
+        0.84, abs=0.01
+    )
+    assert strategy.get_calibration_for(Fingers.RIGHT_PINKY) == pytest.approx(
+        -25.78, abs=0.01
+    )
 
 
 def test_calibration_progress():
@@ -66,3 +87,30 @@ def test_calibration_progress():
         strategy.append(DetectedFingersAndThumbs(finger_boxes, thumb_boxes))
 
     assert strategy.calibration_progress == 1.0
+
+
+def test_calibration_values():
+    strategy = AdjacentNeighborCalibrationStrategy(history_size=5)
+
+    for finger_boxes, thumb_boxes in mock_data_for_fingers_and_thumbs(5):
+        strategy.append(DetectedFingersAndThumbs(finger_boxes, thumb_boxes))
+
+    np.testing.assert_allclose(
+        strategy.calibration_values,
+        [strategy.get_calibration_for(Fingers.by_index(i)) for i in range(10)],
+    )
+
+
+def test_calculate_calibration_values():
+    strategy = AdjacentNeighborCalibrationStrategy(history_size=5)
+    finger_boxes, thumb_boxes = mock_data_for_fingers_and_thumbs()[0]
+    fingers_and_thumbs = DetectedFingersAndThumbs(finger_boxes, thumb_boxes[:1])
+
+    values = strategy.calculate_calibration_values(fingers_and_thumbs.states)
+
+    for finger in Fingers.values():
+        value = strategy.calculate_calibration_value(fingers_and_thumbs, finger)
+        if value is None:
+            assert np.isnan(values[finger.index])
+        else:
+            assert values[finger.index] == pytest.approx(value)
@@ -1,10 +1,12 @@
 # pylint: disable=missing-function-docstring,redefined-outer-name
 
+import numpy as np
 import pytest
 from cameratokeyboard.core.detected_objects import (
     DetectedFingersAndThumbs,
     Point,
 )
+from cameratokeyboard.types import Fingers
 
 
 @pytest.fixture
@@ -26,10 +28,10 @@ def detected_fingers_and_thumbs():
 def test_finger_coordinates(detected_fingers_and_thumbs):
     finger_coordinates = detected_fingers_and_thumbs.finger_coordinates
     assert len(finger_coordinates) == 8
-    assert finger_coordinates[0] == Point(0, 3)
+    assert finger_coordinates[0].xy == pytest.approx((0, 10 / 3))
     assert finger_coordinates[1] == Point(20, 30)
-    assert finger_coordinates[2] == Point(40, 56)
-    assert finger_coordinates[3] == Point(60, 83)
+    assert finger_coordinates[2].xy == pytest.approx((40, 40 + 50 / 3))
+    assert finger_coordinates[3].xy == pytest.approx((60, 60 + 70 / 3))
     assert finger_coordinates[4] == Point(80, 110)
 
 
@@ -48,3 +50,64 @@ def test_average_finger_width(detected_fingers_and_thumbs):
 def test_average_finger_height(detected_fingers_and_thumbs):
     average_finger_height = detected_fingers_and_thumbs.average_finger_height
     assert int(average_finger_height) == 80
+
+
+def test_trackers(detected_fingers_and_thumbs):
+    tracker = detected_fingers_and_thumbs.tracker(Fingers.LEFT_RING)
+    assert tracker.position == (20, 30)
+    assert tracker.velocity == (0, 0)
+
+    finger_boxes = [
+        [x, y + 10, w, h] for x, y, w, h in detected_fingers_and_thumbs.raw_finger_boxes
+    ]
+    detected_fingers_and_thumbs.update(finger_boxes, [[100, 100, 110, 110]])
+
+    assert detected_fingers_and_thumbs.tracker(Fingers.LEFT_RING) is tracker
+    assert 30 < tracker.position[1] <= 40
+    assert 0 < tracker.velocity[1] <= 10
+    np.testing.assert_array_equal(
+        detected_fingers_and_thumbs.smoothed_positions[Fingers.LEFT_RING.index],
+        tracker.position,
+    )
+    assert detected_fingers_and_thumbs.tracker(Fingers.LEFT_THUMB) is not None
+
+
+def test_missing_thumbs(detected_fingers_and_thumbs):
+    thumbs = detected_fingers_and_thumbs.thumb_coordinates
+    left_thumb = detected_fingers_and_thumbs.tracker(Fingers.LEFT_THUMB)
+    right_thumb = detected_fingers_and_thumbs.tracker(Fingers.RIGHT_THUMB)
+    detected_fingers_and_thumbs.update(detected_fingers_and_thumbs.raw_finger_boxes, [])
+
+    # None detected, both keep their last positions.
+    assert detected_fingers_and_thumbs.thumb_coordinates == thumbs
+    assert [p.xy for p in thumbs] == [(100, 155), (120, 185)]
+    assert detected_fingers_and_thumbs.tracker(Fingers.LEFT_THUMB) is left_thumb
+    assert detected_fingers_and_thumbs.tracker(Fingers.RIGHT_THUMB) is right_thumb
+
+    detected_fingers_and_thumbs.update(
+        detected_fingers_and_thumbs.raw_finger_boxes, [[140, 140, 10, 10]]
+    )
+
+    # A single one is the left thumb.
+    assert [p.xy for p in detected_fingers_and_thumbs.thumb_coordinates] == [(140, 145)]
+    assert detected_fingers_and_thumbs.tracker(Fingers.LEFT_THUMB) is left_thumb
+    assert detected_fingers_and_thumbs.tracker(Fingers.RIGHT_THUMB) is None
+
+
+def test_views_follow_the_fingers(detected_fingers_and_thumbs):
+    left_ring = detected_fingers_and_thumbs[Fingers.LEFT_RING]
+    finger_boxes = detected_fingers_and_thumbs.raw_finger_boxes + [0, 10, 0, 0]
+    detected_fingers_and_thumbs.update(finger_boxes, [])
+
+    assert detected_fingers_and_thumbs[Fingers.LEFT_RING] is left_ring
+    assert left_ring == Point(20, 40)
+    assert detected_fingers_and_thumbs.positions[Fingers.LEFT_RING.index].tolist() == [
+        20,
+        40,
+    ]
+    assert detected_fingers_and_thumbs.detected.tolist() == [True] * 10
+
+
+def test_views_have_no_history(detected_fingers_and_thumbs):
+    with pytest.raises(NotImplementedError):
+        detected_fingers_and_thumbs[Fingers.LEFT_RING].velocity_y(1.0)
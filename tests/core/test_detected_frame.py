@@ -1,6 +1,7 @@
 # pylint: disable=missing-function-docstring,protected-access,redefined-outer-name,unused-argument
 from unittest.mock import call, patch, MagicMock
 
+import numpy as np
 import pytest
 
 from cameratokeyboard.core.detected_frame import DetectedFrame
@@ -14,14 +15,14 @@ def detection_results():
     detection_results = MagicMock()
     detection_results.orig_img = MagicMock()
     detection_results.boxes = MagicMock()
-    detection_results.boxes.cls = [1] * 8 + [2] * 2 + [3] * 4
-    detection_results.boxes.conf = [1.0] * 14
 
-    boxes = []
-    for i in range(14):
-        boxes.append([i, i, 2, 2])
-
-    detection_results.boxes.xywh = boxes
+    # (x1, y1, x2, y2, confidence, class) of 2x2 boxes centered on (i, i).
+    classes = [1] * 8 + [2] * 2 + [3] * 4
+    data = np.array(
+        [[i - 1, i - 1, i + 1, i + 1, 1.0, c] for i, c in enumerate(classes)],
+        dtype=np.float32,
+    )
+    detection_results.boxes.cpu.return_value.numpy.return_value.data = data
 
     detection_results.names = {1: "finger", 2: "thumb", 3: "marker"}
 
@@ -49,21 +50,21 @@ def mock_calibration_strategy():
 
 @pytest.fixture
 def mock_down_detector():
-    def mock_is_finger_down(_, finger):
-        return finger in [Fingers.LEFT_PINKY, Fingers.LEFT_THUMB]
+    down = np.zeros(10, dtype=bool)
+    down[[Fingers.LEFT_PINKY.index, Fingers.LEFT_THUMB.index]] = True
 
     with patch("cameratokeyboard.core.detected_frame.FingerDownDetector") as mock:
-        mock.return_value.is_finger_down = mock_is_finger_down
+        mock.return_value.down_fingers.return_value = down
         yield mock
 
 
 @pytest.fixture
 def mock_finger_to_keyboard_coordinates():
     with patch(
-        "cameratokeyboard.core.detected_frame.finger_to_keyboard_fractional_coordinates"
+        "cameratokeyboard.core.detected_frame.fingers_to_keyboard_fractional_coordinates"
     ) as mock:
         a_key_coordinates = (0.118 + 0.05, 0.2 * 2 + 0.1)
-        mock.return_value = a_key_coordinates
+        mock.side_effect = lambda _, coordinates: [a_key_coordinates] * len(coordinates)
 
         yield mock
 
@@ -109,6 +110,9 @@ def detected_fingers_and_thumbs(finger_coordinates, thumb_coordinates):
     with patch("cameratokeyboard.core.detected_frame.DetectedFingersAndThumbs") as mock:
         mock.return_value.finger_coordinates = finger_coordinates
         mock.return_value.thumb_coordinates = thumb_coordinates
+        mock.return_value.smoothed_positions = np.array(
+            [[p.x, p.y] for p in finger_coordinates + thumb_coordinates]
+        )
         yield mock
 
 
@@ -181,31 +185,21 @@ def detected_frame_missing_thumbs(
 
 def test_update(detected_frame, detection_results):
     detected_frame.update(detection_results)
-    assert detected_frame._markers.update.call_args_list == [
-        call(
-            [
-                [10.0, 10.0, 2.0, 2.0],
-                [11.0, 11.0, 2.0, 2.0],
-                [12.0, 12.0, 2.0, 2.0],
-                [13.0, 13.0, 2.0, 2.0],
-            ]
-        )
-    ]
-    assert detected_frame._fingers_and_thumbs.update.call_args_list == [
-        call(
-            [
-                [0.0, 0.0, 2.0, 2.0],
-                [1.0, 1.0, 2.0, 2.0],
-                [2.0, 2.0, 2.0, 2.0],
-                [3.0, 3.0, 2.0, 2.0],
-                [4.0, 4.0, 2.0, 2.0],
-                [5.0, 5.0, 2.0, 2.0],
-                [6.0, 6.0, 2.0, 2.0],
-                [7.0, 7.0, 2.0, 2.0],
-            ],
-            [[8.0, 8.0, 2.0, 2.0], [9.0, 9.0, 2.0, 2.0]],
-        )
-    ]
+    (marker_boxes, _), _ = detected_frame._markers.update.call_args
+    np.testing.assert_array_equal(
+        marker_boxes,
+        [
+            [10.0, 10.0, 2.0, 2.0],
+            [11.0, 11.0, 2.0, 2.0],
+            [12.0, 12.0, 2.0, 2.0],
+            [13.0, 13.0, 2.0, 2.0],
+        ],
+    )
+    (finger_boxes, thumb_boxes), _ = detected_frame._fingers_and_thumbs.update.call_args
+    np.testing.assert_array_equal(finger_boxes, [[i, i, 2.0, 2.0] for i in range(8)])
+    np.testing.assert_array_equal(
+        thumb_boxes, [[8.0, 8.0, 2.0, 2.0], [9.0, 9.0, 2.0, 2.0]]
+    )
     assert detected_frame._down_keys == DOWN_KEYS
 
 
@@ -312,3 +306,47 @@ def test_start_calibrating(
     detected_frame.update(detection_results)
     assert not detected_frame._is_calibrating
     assert on_calibration_complete.called
+
+
+def test_snapshot(detected_frame, detection_results, finger_coordinates):
+    snapshot = detected_frame.snapshot()
+
+    assert snapshot.current_frame == detection_results.orig_img
+    assert snapshot.state == FrameState.VALID
+    assert snapshot.down_keys == DOWN_KEYS
+    assert [p.xy for p in snapshot.finger_coordinates] == [
+        (p.x, p.y) for p in finger_coordinates
+    ]
+
+    detected_frame._down_keys = []
+    detected_frame._state = FrameState.MISSING_FINGERS
+    assert snapshot.down_keys == DOWN_KEYS
+    assert snapshot.state == FrameState.VALID
+
+
+def test_snapshot_start_calibration(detected_frame):
+    snapshot = detected_frame.snapshot()
+    on_calibration_complete = MagicMock()
+
+    snapshot.start_calibration(on_calibration_complete)
+
+    assert snapshot.is_calibration_in_progress
+    assert detected_frame._is_calibrating
+    assert detected_frame._on_calibration_complete == on_calibration_complete
+
+
+def test_calibration_complete_is_called_outside_of_the_lock(
+    detection_results,
+    detected_frame,
+    mock_calibration_strategy,
+    detected_fingers_and_thumbs,
+):
+    # The callback may start another calibration, which takes the lock again.
+    def on_calibration_complete():
+        assert not detected_frame._calibration_lock.locked()
+
+    detected_frame.start_calibration(on_calibration_complete)
+    mock_calibration_strategy.is_calibrated = True
+    detected_frame.update(detection_results)
+
+    assert not detected_frame._is_calibrating
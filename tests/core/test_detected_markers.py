@@ -1,16 +1,21 @@
 # pylint: disable=missing-function-docstring,redefined-outer-name,protected-access
 
+import numpy as np
 import pytest
-from cameratokeyboard.core.detected_objects import DetectedMarkers, Point
+from cameratokeyboard.core.detected_objects import DetectedMarkers
 
 EXPECTED_MARKER_COORDINATES = [
-    Point(3, 6),
-    Point(33, 88),
-    Point(115, 142),
-    Point(164, 84),
+    (3.11, 6),
+    (33.93, 88),
+    (115.25, 142),
+    (164.43, 84),
 ]
 
 
+def assert_coordinates(points, expected):
+    assert [p.xy for p in points] == [pytest.approx(xy, abs=0.01) for xy in expected]
+
+
 @pytest.fixture
 def detected_markers():
     # Create a sample list of bounding box coordinates
@@ -24,35 +29,45 @@ def detected_markers():
 
 
 def test_bottom_left_marker(detected_markers):
-    assert detected_markers.bottom_left_marker == EXPECTED_MARKER_COORDINATES[0]
+    assert_coordinates(
+        [detected_markers.bottom_left_marker], [EXPECTED_MARKER_COORDINATES[0]]
+    )
 
     detected_markers._bl = None
     assert detected_markers.bottom_left_marker is None
 
 
 def test_top_left_marker(detected_markers):
-    assert detected_markers.top_left_marker == EXPECTED_MARKER_COORDINATES[1]
+    assert_coordinates(
+        [detected_markers.top_left_marker], [EXPECTED_MARKER_COORDINATES[1]]
+    )
 
     detected_markers._tl = None
     assert detected_markers.top_left_marker is None
 
 
 def test_top_right_marker(detected_markers):
-    assert detected_markers.top_right_marker == EXPECTED_MARKER_COORDINATES[2]
+    assert_coordinates(
+        [detected_markers.top_right_marker], [EXPECTED_MARKER_COORDINATES[2]]
+    )
 
     detected_markers._tr = None
     assert detected_markers.top_right_marker is None
 
 
 def test_bottom_right_marker(detected_markers):
-    assert detected_markers.bottom_right_marker == EXPECTED_MARKER_COORDINATES[3]
+    assert_coordinates(
+        [detected_markers.bottom_right_marker], [EXPECTED_MARKER_COORDINATES[3]]
+    )
 
     detected_markers._br = None
     assert detected_markers.bottom_right_marker is None
 
 
 def test_all_marker_coordinates(detected_markers):
-    assert detected_markers.all_marker_coordinates == EXPECTED_MARKER_COORDINATES
+    assert_coordinates(
+        detected_markers.all_marker_coordinates, EXPECTED_MARKER_COORDINATES
+    )
 
 
 def test_any_markers_missing(detected_markers):
@@ -61,3 +76,59 @@ def test_any_markers_missing(detected_markers):
 
 def test_all_markers_present(detected_markers):
     assert detected_markers.all_markers_present
+
+
+def test_perspective_matrix_is_cached(detected_markers):
+    matrix = detected_markers.perspective_matrix
+
+    assert matrix.shape == (3, 3)
+    assert detected_markers.perspective_matrix is matrix
+
+    # Jitter within the tolerance
+    detected_markers.update(
+        [
+            [11, 21, 30, 40],
+            [50, 60, 70, 80],
+            [90, 101, 110, 120],
+            [130, 140, 150, 160],
+        ]
+    )
+    assert detected_markers.perspective_matrix is matrix
+
+
+def test_perspective_matrix_is_recalculated_on_drift(detected_markers):
+    matrix = detected_markers.perspective_matrix
+
+    detected_markers.update(
+        [
+            [10, 20, 30, 40],
+            [50, 60, 70, 80],
+            [90, 100, 110, 120],
+            [140, 140, 150, 160],
+        ]
+    )
+
+    assert detected_markers.perspective_matrix is not matrix
+    assert not (detected_markers.perspective_matrix == matrix).all()
+
+
+def test_perspective_matrix_with_missing_markers():
+    assert DetectedMarkers([[10, 20, 30, 40]]).perspective_matrix is None
+
+
+def test_update_with_unsorted_array(detected_markers):
+    boxes = np.array(
+        [
+            [130, 140, 150, 160],
+            [10, 20, 30, 40],
+            [90, 100, 110, 120],
+            [50, 60, 70, 80],
+        ],
+        dtype=np.float32,
+    )
+    detected_markers.update(boxes)
+
+    assert detected_markers.raw_boxes[:, 0].tolist() == [10, 50, 90, 130]
+    assert_coordinates(
+        detected_markers.all_marker_coordinates, EXPECTED_MARKER_COORDINATES
+    )
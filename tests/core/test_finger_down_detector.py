@@ -1,80 +1,133 @@
 # pylint: disable=missing-function-docstring,redefined-outer-name
 from unittest.mock import MagicMock
 
+import numpy as np
 import pytest
+from cameratokeyboard.core.calibration import AdjacentNeighborCalibrationStrategy
+from cameratokeyboard.core.detected_objects import DetectedFingersAndThumbs
 from cameratokeyboard.core.finger_down_detector import FingerDownDetector
 from cameratokeyboard.types import Fingers
 
 TEST_FINGER = Fingers.LEFT_PINKY
-FINGERS_AND_THUMBS_WITH_NO_COORDINATES = {TEST_FINGER: None}
-FINGERS_AND_THUMBS_WITH_POSITIVE_ACCELERATING_VELOCITY = {
-    TEST_FINGER: MagicMock(velocity_y=lambda window: 10.0),
-}
-FINGERS_AND_THUMBS_WITH_VALID_VALUES = {
-    TEST_FINGER: MagicMock(
-        y=10.0,
-        velocity_y=lambda window: -10.0,
-    ),
-    Fingers.LEFT_RING: MagicMock(y=5.0),
-    Fingers.LEFT_MIDDLE: MagicMock(y=3.0),
-    Fingers.LEFT_INDEX: MagicMock(y=3.0),
-    Fingers.LEFT_THUMB: MagicMock(y=3.0),
-    Fingers.RIGHT_THUMB: MagicMock(y=3.0),
-    Fingers.RIGHT_INDEX: MagicMock(y=3.0),
-    Fingers.RIGHT_MIDDLE: MagicMock(y=3.0),
-    Fingers.RIGHT_RING: MagicMock(y=3.0),
-    Fingers.RIGHT_PINKY: MagicMock(y=3.0),
-}
+FINGER_HEIGHT = 5.0
+
+
+def get_states(velocity_y, acceleration_y=0.0):
+    # The test finger is the lowest, the others are detected and still.
+    states = np.zeros((10, 4))
+    states[:, 1] = 3.0
+    states[TEST_FINGER.index] = (0.0, 10.0, velocity_y, acceleration_y)
+    states[Fingers.LEFT_RING.index, 1] = 5.0
+
+    return states
 
 
 @pytest.fixture
-def fingers_and_thumbs_with_valid_values():
-    mock = MagicMock()
-    mock.__getitem__.side_effect = lambda key: FINGERS_AND_THUMBS_WITH_VALID_VALUES[key]
-    mock.average_finger_height = 5.0
+def calibration():
+    return MagicMock(
+        calibration_values=np.zeros(10),
+        calculate_calibration_values=lambda states: np.full(len(states), 10.0),
+    )
 
-    yield mock
 
+def get_down_detector(calibration, sensitivity, prediction_frames=0):
+    return FingerDownDetector(calibration, sensitivity, prediction_frames)
 
-def get_down_detector(calibration, sensitivity):
-    return FingerDownDetector(calibration, sensitivity)
 
+def is_down(down_detector, states, calibration_values=np.zeros(10)):
+    mask = down_detector.down_mask(states, calibration_values, FINGER_HEIGHT)
+    return mask[TEST_FINGER.index]
 
-def test_with_no_coordinates():
-    down_detector = get_down_detector(FINGERS_AND_THUMBS_WITH_NO_COORDINATES, 0.5)
 
-    assert not down_detector.is_finger_down(
-        FINGERS_AND_THUMBS_WITH_NO_COORDINATES, TEST_FINGER
-    )
+def test_with_no_coordinates(calibration):
+    down_detector = get_down_detector(calibration, 0.5)
+    states = get_states(velocity_y=-10.0)
+    states[TEST_FINGER.index] = np.nan
 
+    assert not is_down(down_detector, states)
 
-def test_with_positive_accelerating_velocity():
-    down_detector = get_down_detector(FINGERS_AND_THUMBS_WITH_NO_COORDINATES, 0.5)
 
-    assert not down_detector.is_finger_down(
-        FINGERS_AND_THUMBS_WITH_POSITIVE_ACCELERATING_VELOCITY, TEST_FINGER
-    )
+def test_with_positive_accelerating_velocity(calibration):
+    down_detector = get_down_detector(calibration, 0.5)
 
+    assert not is_down(down_detector, get_states(velocity_y=10.0, acceleration_y=1.0))
 
-def test_with_no_calibration_value():
-    calibration = MagicMock(
-        get_calibration_for=lambda finger: None,
-        calculate_calibration_value=lambda fingers_and_thumbs, finger: 0,
-    )
+
+def test_with_no_calibration_value(calibration):
     down_detector = get_down_detector(calibration, 0.5)
 
-    assert not down_detector.is_finger_down(
-        FINGERS_AND_THUMBS_WITH_VALID_VALUES, TEST_FINGER
-    )
+    assert not is_down(down_detector, get_states(velocity_y=-10.0), np.full(10, np.nan))
 
 
-def test_with_valid_values(fingers_and_thumbs_with_valid_values):
-    calibration = MagicMock(
-        get_calibration_for=lambda finger: 0.0,
-        calculate_calibration_value=lambda fingers_and_thumbs, finger: 10,
-    )
+def test_with_valid_values(calibration):
+    down_detector = get_down_detector(calibration, 0.5)
+
+    assert is_down(down_detector, get_states(velocity_y=-10.0))
+
+
+def test_below_threshold(calibration):
+    down_detector = get_down_detector(calibration, 0.5)
+
+    assert not is_down(down_detector, get_states(velocity_y=-10.0), np.full(10, 6.0))
+
+
+@pytest.mark.parametrize(
+    "finger,y",
+    [
+        (Fingers.RIGHT_PINKY, 10.0),  # as low
+        (Fingers.RIGHT_PINKY, 12.0),  # lower
+        (Fingers.LEFT_THUMB, 12.0),
+    ],
+)
+def test_not_the_lowest(calibration, finger, y):
     down_detector = get_down_detector(calibration, 0.5)
+    states = get_states(velocity_y=-10.0)
+    states[finger.index, 1] = y
+
+    assert not is_down(down_detector, states)
+
 
-    assert down_detector.is_finger_down(
-        fingers_and_thumbs_with_valid_values, TEST_FINGER
+def test_down_mask(calibration):
+    down_detector = get_down_detector(calibration, 0.5)
+
+    mask = down_detector.down_mask(
+        get_states(velocity_y=-10.0), np.zeros(10), FINGER_HEIGHT
     )
+
+    np.testing.assert_array_equal(mask, np.arange(10) == TEST_FINGER.index)
+
+
+@pytest.mark.parametrize(
+    "prediction_frames,velocity_y,acceleration_y,expected",
+    [
+        (0, 15.0, -10.0, False),  # the prediction is disabled
+        (1, 15.0, -10.0, True),  # slow enough in a frame
+        (1, 25.0, -10.0, False),  # slow enough in 2 frames
+        (2, 25.0, -10.0, True),
+        (2, 25.0, 0.0, False),  # not slowing down
+    ],
+)
+def test_predicted_contact(
+    calibration, prediction_frames, velocity_y, acceleration_y, expected
+):
+    down_detector = get_down_detector(calibration, 0.5, prediction_frames)
+
+    assert is_down(down_detector, get_states(velocity_y, acceleration_y)) == expected
+
+
+def test_is_finger_down_matches_down_fingers():
+    calibration = AdjacentNeighborCalibrationStrategy(history_size=1)
+    fingers = [[x * 10.0, 50.0, 4.0, 12.0] for x in range(8)]
+    thumbs = [[35.0, 40.0, 4.0, 12.0], [45.0, 40.0, 4.0, 12.0]]
+    calibration.append(DetectedFingersAndThumbs(fingers, thumbs))
+
+    fingers[1][1] = 75.0
+    fingers_and_thumbs = DetectedFingersAndThumbs(fingers, thumbs)
+    down_detector = get_down_detector(calibration, 0.5)
+
+    down = down_detector.down_fingers(fingers_and_thumbs)
+
+    assert [f for f in Fingers.values() if down[f.index]] == [Fingers.LEFT_RING]
+    assert [
+        down_detector.is_finger_down(fingers_and_thumbs, f) for f in Fingers.values()
+    ] == down.tolist()
@@ -0,0 +1,54 @@
+# pylint: disable=missing-function-docstring
+import numpy as np
+import pytest
+
+from cameratokeyboard.core.kalman_tracker import KalmanTracker
+
+
+def test_starts_still():
+    tracker = KalmanTracker(10, 20)
+
+    assert tracker.position == (10, 20)
+    assert tracker.velocity == (0, 0)
+    assert tracker.predict(3) == (10, 20)
+
+
+def test_follows_a_constant_velocity():
+    tracker = KalmanTracker(0, 0)
+
+    for frame in range(1, 30):
+        tracker.update(2 * frame, -frame)
+
+    assert tracker.position == pytest.approx((58, -29), abs=0.01)
+    assert tracker.velocity == pytest.approx((2, -1), abs=0.01)
+    assert tracker.predict(2) == pytest.approx((62, -31), abs=0.05)
+
+
+def test_smooths_the_jitter():
+    rng = np.random.default_rng(0)
+    tracker = KalmanTracker(100, 100)
+    errors = []
+
+    for _ in range(200):
+        measurement = 100 + rng.normal(0, 3, size=2)
+        tracker.update(*measurement)
+        errors.append(
+            (
+                np.abs(measurement - 100).mean(),
+                np.abs(np.array(tracker.position) - 100).mean(),
+            )
+        )
+
+    measurement_error, position_error = np.mean(errors[20:], axis=0)
+    assert position_error < measurement_error * 0.9
+
+
+def test_acceleration_y():
+    tracker = KalmanTracker(0, 0)
+    for frame in range(1, 10):
+        tracker.update(0, 20 * frame)
+
+    tracker.update(0, 180)  # stops
+
+    assert tracker.velocity[1] < 20
+    assert tracker.acceleration_y < 0
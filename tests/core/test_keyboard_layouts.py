@@ -1,5 +1,8 @@
 # pylint: disable=missing-function-docstring
 
+import numpy as np
+import pytest
+
 from cameratokeyboard.core.keyboard_layouts import KeyboardLayout
 
 key_center_test_cases = {
@@ -76,6 +79,41 @@ def test_convert_coordinates_to_key():
         assert actual == expected, f"Expected {expected}, got {actual}"
 
 
+@pytest.mark.parametrize(
+    "x,y,expected",
+    [
+        (0.0, 0.0, "backtick"),  # the top left corner
+        (0.067, 0.1, "backtick"),  # the boundary between two keys is the left one's
+        (0.5, 0.2, "seven"),  # the boundary between two rows is the upper one's
+        (0.5, 1.0, "space"),
+        (-0.01, 0.5, ""),
+        (0.5, -0.01, ""),
+        (1.01, 0.5, ""),
+        (0.5, 1.01, ""),
+        (np.nan, 0.5, ""),
+        (0.5, np.nan, ""),
+    ],
+)
+def test_convert_coordinates_to_key_edges(x, y, expected):
+    layout = KeyboardLayout()
+
+    assert layout.convert_coordinates_to_key(x, y) == expected
+    assert layout.convert_coordinates_to_keys([(x, y)]) == [expected]
+
+
+def test_convert_coordinates_to_keys():
+    layout = KeyboardLayout()
+    coordinates = np.random.default_rng(0).uniform(-0.1, 1.1, (1000, 2))
+
+    assert layout.convert_coordinates_to_keys(list(key_center_test_cases.values())) == (
+        list(key_center_test_cases)
+    )
+    assert layout.convert_coordinates_to_keys(coordinates) == [
+        layout.convert_coordinates_to_key(x, y) for x, y in coordinates
+    ]
+    assert layout.convert_coordinates_to_keys(np.empty((0, 2))) == []
+
+
 def test_get_key_value():
     layout = KeyboardLayout()
 
@@ -88,3 +126,14 @@ def test_get_key_value():
     expected = "a"
     actual = layout.get_key_value(key)
     assert actual == expected
+
+
+def test_get_key_center():
+    layout = KeyboardLayout()
+
+    for key in key_center_test_cases:
+        x, y = layout.get_key_center(key)
+        assert layout.convert_coordinates_to_key(x, y) == key
+
+    assert layout.get_key_center("a") == pytest.approx((0.1515, 0.5))
+    assert layout.get_key_center("not_a_key") is None
@@ -6,6 +6,8 @@ from cameratokeyboard.core.detected_objects import DetectedMarkers
 from cameratokeyboard.core.math import (
     calculate_box_width_without_perspective_distortion,
     finger_to_keyboard_fractional_coordinates,
+    fingers_to_keyboard_fractional_coordinates,
+    keyboard_perspective_matrix,
 )
 
 from tests.helpers import assert_within_tolerance
@@ -85,3 +87,40 @@ def test_finger_to_keyboard_fractional_coordinates():
             and actual[1] > expected_bounding_box[1]
             and actual[1] < expected_bounding_box[1] + expected_bounding_box[3]
         )
+
+
+def test_fingers_to_keyboard_fractional_coordinates():
+    keys = ["a", "g", "p", "z"]
+    finger_coordinates = [mock_data_for_finger_coordinates_down_on(key) for key in keys]
+    markers = DetectedMarkers(mock_data_for_marker_boxes())
+
+    # sad
+    with pytest.raises(ValueError):
+        fingers_to_keyboard_fractional_coordinates(markers, [None])
+
+    with pytest.raises(ValueError):
+        fingers_to_keyboard_fractional_coordinates(
+            DetectedMarkers(mock_data_for_marker_boxes()[:-1]), finger_coordinates
+        )
+
+    # happy
+    assert not fingers_to_keyboard_fractional_coordinates(markers, [])
+
+    actual = fingers_to_keyboard_fractional_coordinates(markers, finger_coordinates)
+    expected = [
+        finger_to_keyboard_fractional_coordinates(markers, coordinates)
+        for coordinates in finger_coordinates
+    ]
+    for (actual_x, actual_y), (expected_x, expected_y) in zip(actual, expected):
+        assert actual_x == pytest.approx(expected_x)
+        assert actual_y == pytest.approx(expected_y)
+
+
+def test_keyboard_perspective_matrix():
+    markers = DetectedMarkers(mock_data_for_marker_boxes())
+    matrix = keyboard_perspective_matrix(markers)
+
+    assert matrix.shape == (3, 3)
+
+    with pytest.raises(ValueError):
+        keyboard_perspective_matrix(DetectedMarkers(mock_data_for_marker_boxes()[:-1]))
@@ -5,3 +5,50 @@ def assert_within_tolerance(actual, expected, tolerance):
     assert (
         abs(actual - expected) < tolerance
     ), f"Expected {expected}, got {actual}; tolerance: {tolerance}"
+
+
+def fake_inference_worker(model_path, device, iou, task_queue, result_queue):
+    """
+    Stands in for `run_inference_worker` without loading a model. Reports the first
+    pixel of each frame as the confidence of a single box, and answers the even frames
+    late so that results arrive out of order.
+    """
+    import time
+    from multiprocessing import shared_memory
+
+    import numpy as np
+
+    while (task := task_queue.get()) is not None:
+        sequence, shm_name, shape, dtype = task
+        shm = shared_memory.SharedMemory(name=shm_name)
+        frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        data = np.array([[0, 0, 10, 10, float(frame[0, 0, 0]), 0]], dtype=np.float32)
+        shm.close()
+
+        if sequence % 2 == 0:
+            time.sleep(0.2)
+
+        result_queue.put((sequence, {0: "marker"}, data))
+
+
+def crashing_inference_worker(model_path, device, iou, task_queue, result_queue):
+    """
+    Like `fake_inference_worker`, but the process dies on the frames whose first pixel
+    is 255.
+    """
+    import os
+    from multiprocessing import shared_memory
+
+    import numpy as np
+
+    while (task := task_queue.get()) is not None:
+        sequence, shm_name, shape, dtype = task
+        shm = shared_memory.SharedMemory(name=shm_name)
+        value = float(np.ndarray(shape, dtype=dtype, buffer=shm.buf)[0, 0, 0])
+        shm.close()
+
+        if value == 255:
+            os._exit(1)
+
+        data = np.array([[0, 0, 10, 10, value, 0]], dtype=np.float32)
+        result_queue.put((sequence, {0: "marker"}, data))
@@ -0,0 +1,169 @@
+# pylint: disable=missing-function-docstring,redefined-outer-name,unused-argument
+import os
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+import pytest
+from ultralytics.engine.results import Results
+
+from cameratokeyboard.config import Config
+from cameratokeyboard.model.quantize import (
+    CalibrationReader,
+    Quantizer,
+    box_iou,
+    match_predictions,
+    to_pixel_boxes,
+)
+from cameratokeyboard.types import ModelEvaluation
+
+NAMES = {0: "finger", 1: "thumb", 2: "marker"}
+LABELS = np.array([[0, 0.5, 0.5, 0.2, 0.4], [2, 0.25, 0.75, 0.1, 0.1]])
+
+
+def test_to_pixel_boxes():
+    boxes = to_pixel_boxes(LABELS, (100, 200, 3))
+
+    np.testing.assert_allclose(boxes, [[0, 80, 30, 120, 70], [2, 40, 70, 60, 80]])
+
+
+def test_box_iou():
+    iou = box_iou(
+        np.array([[0, 0, 10, 10]], dtype=float),
+        np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]], dtype=float),
+    )
+
+    np.testing.assert_allclose(iou, [[1, 1 / 3, 0]], atol=1e-6)
+
+
+def test_match_predictions():
+    targets = np.array([[0, 0, 0, 10, 10], [1, 50, 50, 60, 60]], dtype=float)
+    predictions = np.array(
+        [
+            [0, 0, 10, 10, 0.9, 0],  # exact
+            [0, 0, 10, 10, 0.8, 0],  # duplicate, the target is already matched
+            [50, 50, 60, 61, 0.7, 1],  # IoU ~0.91
+            [50, 50, 60, 60, 0.6, 0],  # wrong class
+        ]
+    )
+
+    correct = match_predictions(predictions, targets)
+
+    assert correct.shape == (4, 10)
+    assert correct[0].all()
+    assert not correct[1].any()
+    assert correct[2, :9].all() and not correct[2, 9]
+    assert not correct[3].any()
+
+
+def test_match_predictions_without_targets():
+    predictions = np.array([[0, 0, 10, 10, 0.9, 0]])
+
+    assert not match_predictions(predictions, np.zeros((0, 5))).any()
+
+
+@pytest.fixture
+def raw_dataset(tmp_path):
+    path = tmp_path / "raw_dataset"
+    path.mkdir()
+    for i in range(5):
+        cv2.imwrite(str(path / f"{i:05d}.jpg"), np.zeros((100, 200, 3), np.uint8))
+        np.savetxt(path / f"{i:05d}.txt", LABELS, fmt="%g")
+    return str(path)
+
+
+@pytest.fixture
+def config(raw_dataset, tmp_path):
+    return Config(
+        raw_dataset_path=raw_dataset,
+        dataset_path=str(tmp_path / "datasets" / "c2k"),
+        split_ratios=(0.2, 0.6, 0.2),
+        quantization_calibration_images=3,
+    )
+
+
+def test_calibration_reader(raw_dataset):
+    images = [os.path.join(raw_dataset, f"0000{i}.jpg") for i in range(2)]
+    reader = CalibrationReader(images, "images", 320)
+
+    first = reader.get_next()
+    assert first["images"].shape == (1, 3, 160, 320)
+    assert reader.get_next() is not None
+    assert reader.get_next() is None
+
+
+class PerfectModel:
+    """
+    Predicts exactly the labels of the image being evaluated.
+    """
+
+    names = NAMES
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __call__(self, image, **kwargs):
+        targets = to_pixel_boxes(LABELS, image.shape)
+        data = np.concatenate(
+            [targets[:, 1:], np.full((len(targets), 1), 0.9), targets[:, :1]], axis=1
+        )
+        return [Results(orig_img=image, path=None, names=NAMES, boxes=data)]
+
+
+def test_evaluate(config, tmp_path):
+    quantizer = Quantizer(config)
+    model_path = tmp_path / "model.onnx"
+    model_path.write_bytes(b"0" * 1024)
+
+    with patch("cameratokeyboard.model.quantize.OnnxModel", PerfectModel):
+        test_set = quantizer._load_test_set()  # pylint: disable=protected-access
+        evaluation = quantizer.evaluate("float32", str(model_path), test_set)
+
+    assert len(test_set) == 3
+    assert evaluation.name == "float32"
+    assert evaluation.size_mb == pytest.approx(1 / 1024)
+    assert evaluation.latency_ms > 0
+    assert evaluation.map50 == pytest.approx(1, abs=0.01)
+    assert evaluation.map50_95 == pytest.approx(1, abs=0.01)
+
+
+def test_run(config):
+    evaluation = ModelEvaluation("", "", 0, 0, 0, 0, 0)
+
+    with patch("cameratokeyboard.model.quantize.ModelDownloader") as downloader, patch(
+        "cameratokeyboard.model.quantize.export_to_onnx",
+        return_value="/models/model.onnx",
+    ), patch.object(Quantizer, "quantize") as quantize, patch.object(
+        Quantizer, "evaluate", return_value=evaluation
+    ) as evaluate:
+        downloader.return_value.local_path_to_latest_model = "/models/model.pt"
+        evaluations = Quantizer(config).run()
+
+    quantize.assert_called_once_with("/models/model.onnx", "/models/model.int8.onnx")
+    assert [c.args[:2] for c in evaluate.call_args_list] == [
+        ("float32", "/models/model.onnx"),
+        ("int8", "/models/model.int8.onnx"),
+    ]
+    assert evaluations == [evaluation, evaluation]
+
+
+def test_calibration_images_are_a_fixed_sample(config):
+    config.split_ratios = (0.6, 0.2, 0.2)
+    quantizer = Quantizer(config)
+
+    images = quantizer._calibration_images()  # pylint: disable=protected-access
+
+    assert len(images) == 3
+    assert all(image.endswith(".jpg") for image in images)
+    assert images == quantizer._calibration_images()  # pylint: disable=protected-access
+
+
+def test_calibration_images_are_not_in_the_test_set(config):
+    quantizer = Quantizer(config)
+
+    images = quantizer._calibration_images()  # pylint: disable=protected-access
+    test_set = quantizer._load_test_set()  # pylint: disable=protected-access
+
+    train_path = os.path.join(config.dataset_path, "images", "train")
+    assert images and all(os.path.dirname(image) == train_path for image in images)
+    assert not set(images) & {image for image, _ in test_set}
@@ -27,6 +27,8 @@ def test_parse_args():
         "0.2",
         "-ie",
         "png",
+        "-qc",
+        "50",
         "-p",
         "custom_model.pt",
         "-r",
@@ -34,10 +36,56 @@ def test_parse_args():
         "1080",
         "-f",
         "60",
+        "-hl",
+        "-ho",
+        "keys.jsonl",
         "-i",
         "1",
+        "-is",
+        "0",
+        "2",
+        "-vp",
+        "raw_dataset",
+        "-rpc",
+        "max",
+        "-rf",
+        "15",
         "-d",
         "1",
+        "-ib",
+        "onnx",
+        "-w",
+        "2",
+        "-sv",
+        "unix:/tmp/c2k.sock",
+        "-sa",
+        "0.0.0.0:9000",
+        "-sb",
+        "4",
+        "-sw",
+        "10",
+        "-mt",
+        "2.5",
+        "-ms",
+        "10",
+        "-roi",
+        "-rs",
+        "256",
+        "-rm",
+        "0.3",
+        "-ti",
+        "5",
+        "-te",
+        "0.5",
+        "-pq",
+        "4",
+        "-pd",
+        "block",
+        "-lr",
+        "latency.json",
+        "-pf",
+        "-rdp",
+        "detections.jsonl",
         "-mc",
         "0.5",
         "-fc",
@@ -46,8 +94,30 @@ def test_parse_args():
         "0.5",
         "-s",
         "0.8",
+        "-kp",
+        "2",
         "-rd",
         "0.5",
+        "-bi",
+        "500",
+        "-bd",
+        "detections.jsonl",
+        "-bo",
+        "benchmark.json",
+        "-bb",
+        "baseline.json",
+        "-bt",
+        "0.2",
+        "-ltt",
+        "hello world",
+        "-ltr",
+        "3",
+        "-ltj",
+        "2",
+        "-ltm",
+        "0.01",
+        "-ltf",
+        "0.05",
     ]
     expected_args = {
         "command": None,
@@ -59,17 +129,53 @@ def test_parse_args():
         "split_paths": ["train", "test", "val"],
         "split_ratios": [0.6, 0.2, 0.2],
         "image_extension": "png",
+        "quantization_calibration_images": 50,
         "model_path": "custom_model.pt",
         "resolution": [1920, 1080],
         "app_fps": 60,
+        "headless": True,
+        "headless_output": "keys.jsonl",
         "video_input_device": 1,
+        "video_input_devices": [0, 2],
+        "video_input_path": "raw_dataset",
+        "replay_pacing": "max",
+        "replay_fps": 15.0,
         "processing_device": "1",
+        "inference_backend": "onnx",
+        "inference_workers": 2,
+        "inference_server": "unix:/tmp/c2k.sock",
+        "serve_address": "0.0.0.0:9000",
+        "serve_max_batch_size": 4,
+        "serve_max_wait_ms": 10.0,
+        "motion_threshold": 2.5,
+        "motion_max_skipped_frames": 10,
+        "roi_inference": True,
+        "roi_image_size": 256,
+        "roi_margin": 0.3,
+        "tracking_interval": 5,
+        "tracking_max_error": 0.5,
+        "pipeline_queue_size": 4,
+        "pipeline_drop_policy": "block",
+        "latency_report_path": "latency.json",
+        "profile": "c2k_trace.json",
+        "record_detections_path": "detections.jsonl",
         "markers_min_confidence": 0.5,
         "fingers_min_confidence": 0.5,
         "thumbs_min_confidence": 0.5,
         "key_down_sensitivity": 0.8,
+        "key_down_prediction_frames": 2,
         "keyboard_layout": "qwerty",
         "repeating_keys_delay": 0.5,
+        "benchmark_iterations": 500,
+        "benchmark_detections_path": "detections.jsonl",
+        "benchmark_output_path": "benchmark.json",
+        "benchmark_baseline_path": "baseline.json",
+        "benchmark_tolerance": 0.2,
+        "load_test_text": "hello world",
+        "load_test_repeat": 3,
+        "load_test_jitter": 2.0,
+        "load_test_miss_rate": 0.01,
+        "load_test_false_positive_rate": 0.05,
     }
 
     args = parse_args(argv)
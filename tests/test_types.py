@@ -1,6 +1,8 @@
 # pylint: disable=missing-function-docstring
 import math
 
+import pytest
+
 from cameratokeyboard.types import FrameState, Point, Finger, Fingers
 
 
@@ -38,12 +40,33 @@ def test_point_update():
     assert p.y == 4
 
 
+def test_point_keeps_sub_pixel_coordinates():
+    p = Point(1.25, 2.5)
+    p.update(3.75, 4.5)
+    assert p.xy == (3.75, 4.5)
+
+
 def test_point_velocity_y():
-    p = Point(1, 2)
-    p.update(1, 4)
-    p.update(1, 6)
-    p.update(1, 8)
-    assert p.velocity_y(3) == (8 - 4) / 3
+    p = Point(1, 2, timestamp=0.0, history_size=3)
+    assert p.velocity_y(1.0) == 0
+
+    p.update(1, 4, timestamp=0.1)
+    p.update(1, 6, timestamp=0.2)
+    p.update(1, 12, timestamp=0.3)
+    # 2 was forgotten, so from 4 at 0.1s to 12 at 0.3s.
+    assert p.velocity_y(1.0) == pytest.approx(40)
+    assert p.velocity_y(0.15) == pytest.approx(60)
+    assert p.velocity_y(0.05) == 0
+
+
+def test_point_velocity_y_before_the_history_is_full():
+    p = Point(1, 2, timestamp=0.0, history_size=4)
+    p.update(1, 4, timestamp=0.1)
+
+    assert p.velocity_y(1.0) == pytest.approx(20)
+
+    p.y = 6
+    assert p.velocity_y(1.0) == pytest.approx(40)
 
 
 def test_fingers_values():
@@ -0,0 +1,89 @@
+# pylint: disable=missing-function-docstring
+import json
+import threading
+
+from cameratokeyboard.utils.profiler import Profiler, get_profiler
+
+
+def test_spans_are_not_recorded_when_disabled(tmp_path):
+    profiler = Profiler()
+
+    with profiler.span("inference"):
+        pass
+
+    path = tmp_path / "trace.json"
+    profiler.save(str(path))
+    assert json.loads(path.read_text(encoding="utf-8"))["traceEvents"] == []
+
+
+def test_save(tmp_path):
+    profiler = Profiler()
+    profiler.enable()
+
+    with profiler.span("inference", "detection"):
+        pass
+
+    thread = threading.Thread(
+        target=profiler.add_span,
+        args=("capture", "capture", 1.0, 1.5),
+        name="c2k-frame-source",
+    )
+    thread.start()
+    thread.join()
+
+    path = tmp_path / "trace.json"
+    profiler.save(str(path))
+    events = json.loads(path.read_text(encoding="utf-8"))["traceEvents"]
+
+    spans = [e for e in events if e["ph"] == "X"]
+    assert [(s["name"], s["cat"]) for s in spans] == [
+        ("inference", "detection"),
+        ("capture", "capture"),
+    ]
+    assert spans[0]["dur"] >= 0
+    assert spans[1]["dur"] == 500000
+    assert spans[1]["tid"] != spans[0]["tid"]
+
+    thread_names = {e["tid"]: e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert thread_names[spans[1]["tid"]] == "c2k-frame-source"
+
+
+def test_max_events(tmp_path):
+    profiler = Profiler(max_events=2)
+    profiler.enable()
+
+    for name in ["a", "b", "c"]:
+        with profiler.span(name):
+            pass
+
+    path = tmp_path / "trace.json"
+    profiler.save(str(path))
+    events = json.loads(path.read_text(encoding="utf-8"))["traceEvents"]
+
+    assert [e["name"] for e in events if e["ph"] == "X"] == ["b", "c"]
+
+
+def test_enable_discards_previous_spans(tmp_path):
+    profiler = Profiler()
+    profiler.enable()
+    with profiler.span("a"):
+        pass
+
+    profiler.disable()
+    with profiler.span("b"):
+        pass
+    assert not profiler.enabled
+
+    profiler.enable()
+    with profiler.span("c"):
+        pass
+
+    path = tmp_path / "trace.json"
+    profiler.save(str(path))
+    events = json.loads(path.read_text(encoding="utf-8"))["traceEvents"]
+
+    assert [e["name"] for e in events if e["ph"] == "X"] == ["c"]
+
+
+def test_get_profiler():
+    assert get_profiler() is get_profiler()